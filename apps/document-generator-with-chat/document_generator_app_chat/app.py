@@ -10,12 +10,12 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 import gradio as gr
-import pypandoc
-from docx import Document
 from docpack_file import DocpackHandler
 from dotenv import load_dotenv
 
+from .conversions import docx_to_text, markdown_to_docx_async, markdown_to_html_async
 from .executor.runner import generate_docpack_from_prompt, generate_document
+from .jobs import Job, JobQueueFullError, JobStatus, job_queue
 from .models.outline import Outline, Resource, Section
 from .session import session_manager
 from .assistant import DocumentAssistant, create_chatbot_interface, handle_chat_message
@@ -92,20 +92,6 @@ SUPPORTED_FILE_TYPES = [
 ]
 
 
-def markdown_to_docx(markdown_content: str, output_path: str) -> str:
-    """Convert markdown content to docx file and return the output path."""
-    try:
-        pypandoc.convert_text(
-            markdown_content,
-            "docx",
-            format="md",
-            outputfile=output_path,
-        )
-        return output_path
-    except Exception as e:
-        raise Exception(f"Failed to convert markdown to docx: {str(e)}")
-
-
 def check_docx_protected(docx_path: str) -> tuple[bool, str]:
     """Check if a docx file is protected/encrypted without fully extracting text.
     Returns (is_protected, error_message)
@@ -130,27 +116,6 @@ def check_docx_protected(docx_path: str) -> tuple[bool, str]:
             return False, f"Document '{filename}' may have issues: {str(e)}"
 
 
-def docx_to_text(docx_path: str) -> str:
-    """Extract text content from a docx file."""
-    try:
-        doc = Document(docx_path)
-        paragraphs = []
-
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():  # Only add non-empty paragraphs
-                paragraphs.append(paragraph.text.strip())
-
-        return "\n\n".join(paragraphs)
-    except Exception as e:
-        error_msg = str(e).lower()
-        filename = os.path.basename(docx_path)
-        # Check for common security/encryption error messages
-        if any(term in error_msg for term in ["package not found"]):
-            raise Exception(f"Document '{filename}' may be protected or encrypted and cannot be processed.")
-        else:
-            raise Exception(f"Failed to extract text from '{filename}': {str(e)}")
-
-
 def json_to_outline(json_data: Dict[str, Any]) -> Outline:
     """Convert JSON structure to Outline dataclasses."""
     # Create outline with basic metadata
@@ -464,8 +429,8 @@ def save_inline_resources(blocks, output_dir):
     return saved_resources
 
 
-async def handle_document_generation(title, description, resources, blocks, session_id=None):
-    """Generate document using the recipe executor."""
+async def handle_document_generation(title, description, resources, blocks, session_id=None, job=None):
+    """Generate document using the recipe executor, reporting progress to job if given."""
     json_str = ""  # Initialize json_str before the try block
     try:
         # Get or create session ID
@@ -488,7 +453,7 @@ async def handle_document_generation(title, description, resources, blocks, sess
         outline = json_to_outline(json_data)
 
         # Generate the document
-        generated_content = await generate_document(outline, session_id, IS_DEV_MODE)
+        generated_content = await generate_document(outline, session_id, IS_DEV_MODE, job=job)
 
         # Save both DOCX and Markdown versions
         base_filename = title if title else "document"
@@ -496,7 +461,7 @@ async def handle_document_generation(title, description, resources, blocks, sess
         # Save as DOCX
         docx_filename = f"{base_filename}.docx"
         docx_file_path = os.path.join(temp_dir, docx_filename)
-        markdown_to_docx(generated_content, docx_file_path)
+        await markdown_to_docx_async(generated_content, docx_file_path)
         print(f"DEBUG: Created DOCX file at: {docx_file_path}")
 
         # Save as Markdown
@@ -519,6 +484,38 @@ async def handle_document_generation(title, description, resources, blocks, sess
         return json_str, error_msg, None, None
 
 
+def render_job_progress(job: Job) -> str:
+    """Render the progress panel shown while a generation job is queued or running."""
+    import html as _html_lib
+
+    if job.status is JobStatus.QUEUED:
+        headline = "Waiting for a free generator…"
+    else:
+        headline = "Generating document, please wait…"
+    details = [_html_lib.escape(job.last_message)] if job.last_message else []
+    if job.steps_completed:
+        details.append(f"{job.steps_completed} steps done")
+    details.append(f"{int(job.elapsed)}s")
+    return (
+        f"<em>{headline}</em><br>"
+        f"<span class='generation-progress'>{' · '.join(details)}</span><br>"
+        f"<button class='cancel-generation-btn' onclick='cancelGeneration(\"{job.id}\")'>Cancel</button>"
+        "<br><br>"
+    )
+
+
+async def cancel_generation_job(job_id, session_id):
+    """Cancel a queued or running generation job started from the caller's session."""
+    job = job_queue.get(job_id) if job_id else None
+    if job is None:
+        return
+    if not session_id or job.session_id != session_id:
+        logger.warning(f"Refusing to cancel generation job {job_id} from another session")
+        return
+    if job_queue.cancel(job_id):
+        logger.info(f"Cancelled generation job {job_id}")
+
+
 def generate_document_json(title, description, resources, blocks, save_inline=False, inline_dir=None):
     """Generate JSON structure from document data following the example format.
 
@@ -1952,6 +1949,10 @@ def handle_file_upload(files, current_resources, title, description, blocks, ses
                     warnings.append(error_msg)
                     continue  # Skip adding this file to resources
 
+            if not session_manager.has_room(session_id, os.path.getsize(file_path)):
+                warnings.append(f"{file_name} was not added: this session has reached its storage limit.")
+                continue
+
             # Copy file to session directory
             session_file_path = files_dir / file_name
             shutil.copy2(file_path, session_file_path)
@@ -2216,6 +2217,11 @@ def replace_resource_file_gradio(resources, old_resource_path, new_file, title,
 reset_document_module = reset_document
 
 
+def session_metrics() -> Dict[str, Any]:
+    """Session store metrics: active sessions, bytes held, evictions and trimmed bytes."""
+    return session_manager.metrics()
+
+
 def create_app():
     """Create and return the Document Builder Gradio app."""
 
@@ -3010,6 +3016,12 @@ def create_app():
                         )
                         replace_success_msg = gr.Textbox(visible=False, elem_id="replace-success-msg")
 
+                        # Hidden components for cancelling a generation job
+                        cancel_generation_job_id = gr.Textbox(visible=False, elem_id="cancel-generation-job-id")
+                        cancel_generation_trigger = gr.Button(
+                            "Cancel Generation", visible=False, elem_id="cancel-generation-trigger"
+                        )
+
                 # Generated document column: Generate and Save Document buttons (aligned right)
                 with gr.Column(scale=1, elem_classes="generate-col"):
                     with gr.Row(elem_classes="generate-btn-row"):
@@ -3411,6 +3423,10 @@ def create_app():
             outputs have their .then() updates silently dropped.  Wiring everything through
             a single .click(fn=generator) keeps every component's update path unique.
             """
+            # Jobs belong to a session, which alone may cancel them, so make sure there is one
+            if not session_id:
+                session_id = str(uuid.uuid4())
+
             # ── Step 1: loading state ────────────────────────────────────────────────
             # Yield immediately so the browser reflects the "in progress" state before
             # the (potentially long) LLM call begins.
@@ -3426,12 +3442,42 @@ def create_app():
                 gr.update(interactive=False),  # generate_doc_btn — disable
                 gr.update(),  # docx_file_path — no change
                 gr.update(),  # markdown_file_path — no change
+                session_id,  # session_state
             )
 
-            # ── Step 2: run generation ───────────────────────────────────────────────
-            json_str, content, docx_path, markdown_path = await handle_document_generation(
-                title, description, resources, blocks, session_id
-            )
+            # ── Step 2: queue the run and stream its progress ───────────────────────
+            # The recipe runs on a job worker; this handler only relays progress events,
+            # which also keeps the connection alive through proxies during long runs.
+            json_str, content, docx_path, markdown_path = gr.update(), "", None, None
+            try:
+                job = job_queue.submit(
+                    lambda job: handle_document_generation(title, description, resources, blocks, session_id, job),
+                    session_id=session_id,
+                )
+            except JobQueueFullError as e:
+                content = str(e)
+            else:
+                async for snapshot in job_queue.watch(job.id):
+                    if snapshot.status.finished:
+                        break
+                    yield (
+                        gr.update(),
+                        gr.update(),
+                        gr.update(value=render_job_progress(snapshot), visible=True),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                    )
+
+                if job.status is JobStatus.SUCCEEDED:
+                    json_str, content, docx_path, markdown_path = job.result
+                elif job.status is JobStatus.CANCELLED:
+                    content = "Generation cancelled."
+                else:
+                    content = f"Error generating document: {job.error}"
 
             # ── Step 3: final state ──────────────────────────────────────────────────
             # Render the markdown as HTML and update generated_content_html
@@ -3448,9 +3494,7 @@ def create_app():
             import asyncio
 
             try:
-                rendered_html = pypandoc.convert_text(
-                    content, "html5", format="md"
-                )
+                rendered_html = await markdown_to_html_async(content)
                 display_html = f'<div class="generated-document">{rendered_html}</div>'
             except Exception as html_err:
                 logger.warning(f"Failed to render markdown as HTML for display: {html_err}")
@@ -3491,6 +3535,7 @@ def create_app():
                 generate_btn_update,
                 docx_path,
                 markdown_path,
+                session_id,
             )
 
             # Yield the final state, then sleep and yield again.  Gradio 5.x
@@ -3519,9 +3564,14 @@ def create_app():
                 generate_doc_btn,
                 docx_file_path,
                 markdown_file_path,
+                session_state,
             ],
         )
 
+        cancel_generation_trigger.click(
+            fn=cancel_generation_job, inputs=[cancel_generation_job_id, session_state], outputs=[]
+        )
+
         # Save button is handled directly by DownloadButton with create_docpack_from_current_state
 
         # Handle download format selection
@@ -4096,6 +4146,14 @@ def create_app():
             outputs=[start_resources_state, start_resources_display],
         )
 
+        # Session store metrics for monitoring, exposed as an API endpoint only
+        metrics_trigger = gr.Textbox(visible=False)
+        metrics_output = gr.JSON(visible=False)
+        metrics_trigger.submit(fn=session_metrics, inputs=[], outputs=[metrics_output], api_name="session_metrics")
+
+    # Evict idle and over-quota sessions in the background while the app runs
+    session_manager.start_background_cleanup()
+
     return app
 
 
@@ -15,9 +15,12 @@ from recipe_executor.executor import Executor
 from recipe_executor.logger import init_logger
 
 from ..config import settings
+from ..conversions import convert_docx_files
+from ..jobs import Job
 from ..models.outline import Outline, Resource
 from ..resource_resolver import resolve_all_resources
 from ..session import session_manager
+from .progress import job_step_reporter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -25,10 +28,18 @@ logger = logging.getLogger(__name__)
 
 
 async def generate_document(
-    outline: Optional[Outline], session_id: Optional[str] = None, dev_mode: bool = False
+    outline: Optional[Outline],
+    session_id: Optional[str] = None,
+    dev_mode: bool = False,
+    section_concurrency: Optional[int] = None,
+    job: Optional[Job] = None,
 ) -> str:
     """
     Run the document-generator recipe with the given outline and return the generated Markdown.
+
+    When section_concurrency is above 1, up to that many sections of the whole outline are
+    generated concurrently and assembled in outline order. Defaults to settings.section_concurrency.
+    When a job is given, resource resolution and recipe step events are reported to it.
     """
     logger.info(f"Starting document generation for session: {session_id}")
     logger.info(f"Running in {'development' if dev_mode else 'production'} mode")
@@ -64,17 +75,27 @@ async def generate_document(
     tmpdir = str(session_dir / "execution")
     Path(tmpdir).mkdir(exist_ok=True)
     logger.info(f"Using temp directory: {tmpdir}")
+    session_manager.acquire(session_id)  # Keep the session from being evicted mid-run
 
     try:
         # Resolve all resources using the new resolver
         logger.info("Resolving resources...")
+        if job:
+            job.report("Resolving resources")
         outline_data = outline.to_dict()
-        logger.info(f"Outline data: {json.dumps(outline_data, indent=2)}")
+        logger.debug("Outline data: %s", outline_data)
 
-        resolved_resources = resolve_all_resources(outline_data, session_id)
+        resolved_resources = await resolve_all_resources(outline_data, session_id)
         logger.info(f"Resolved resources: {resolved_resources}")
 
-        # Update resource paths in outline with resolved paths, converting docx to text if needed
+        # Convert all docx resources to text at once, off the event loop
+        docx_texts = await convert_docx_files([
+            str(resolved_resources[resource.key])
+            for resource in outline.resources
+            if resource.key in resolved_resources and str(resolved_resources[resource.key]).lower().endswith(".docx")
+        ])
+
+        # Update resource paths in outline with resolved paths, using the docx conversions
         for resource in outline.resources:
             if resource.key in resolved_resources:
                 old_path = resource.path
@@ -83,12 +104,12 @@ async def generate_document(
                 # Always update the path to the resolved path (keeps original file reference)
                 resource.path = resolved_path
 
-                # If it's a docx file, convert it to text and save as .txt file
+                # If it's a docx file, save its text as a .txt file
                 if resolved_path.lower().endswith(".docx"):
                     try:
-                        from ..app import docx_to_text
-
-                        text_content = docx_to_text(resolved_path)
+                        text_content = docx_texts[resolved_path]
+                        if isinstance(text_content, Exception):
+                            raise text_content
 
                         # Create a text file version
                         txt_path = resolved_path.replace(".docx", ".txt")
@@ -128,11 +149,20 @@ async def generate_document(
             sections=outline.sections,
         )
 
+        # Hand the outline to the recipe as an object, with the text already extracted from
+        # docx resources, so the recipe does not read and parse them from disk again. The text
+        # is kept out of the outline itself, which section prompts render in full.
         data = execution_outline.to_dict()
-        outline_json = json.dumps(data, indent=2)
-        outline_path = Path(tmpdir) / "outline.json"
-        outline_path.write_text(outline_json)
-        logger.info(f"Created outline file for recipe execution: {outline_path}")
+        resource_contents = {}
+        for resource in outline.resources:
+            text_content = docx_texts.get(resource.path) if resource.txt_path else None
+            if isinstance(text_content, str):
+                resource_contents[resource.key] = text_content
+
+        if dev_mode:
+            outline_path = Path(tmpdir) / "outline.json"
+            outline_path.write_text(json.dumps(data, indent=2))
+            logger.info(f"Wrote outline for inspection: {outline_path}")
 
         recipe_logger = init_logger(log_dir=tmpdir)
 
@@ -141,20 +171,28 @@ async def generate_document(
 
         context = Context(
             artifacts={
-                "outline_file": str(outline_path),
+                "outline": data,
+                "resource_contents": resource_contents,
                 "recipe_root": str(RECIPE_ROOT),
                 "output_root": str(session_dir),  # Use session directory for output
                 "model": settings.model_id,  # Use configured model
+                "section_concurrency": section_concurrency or settings.section_concurrency,
             },
             config=config,  # Pass configuration to context
         )
-        logger.info(f"Context artifacts: {context.dict()}")
+        logger.info(f"Context artifacts: {sorted(context.keys())}")
 
-        executor = Executor(recipe_logger)
+        executor = Executor(recipe_logger, on_step=job_step_reporter(job) if job else None)
         logger.info(f"Executing recipe: {RECIPE_PATH}")
         await executor.execute(str(RECIPE_PATH), context)
         logger.info("Recipe execution completed")
 
+        peak_concurrency = context.get("written_sections__peak_concurrency")
+        if peak_concurrency is not None:
+            logger.info(
+                f"Section generation peak concurrency: {peak_concurrency} (width: {context.get('section_concurrency')})"
+            )
+
         output_root = Path(context.get("output_root", tmpdir))
         filename = context.get("document_filename")
         logger.info(f"Output root: {output_root}")
@@ -184,6 +222,8 @@ async def generate_document(
         logger.error(f"Error generating document: {str(e)}")
         logger.error(f"Full traceback: {traceback.format_exc()}")
         return f"Error generating document: {str(e)}\n\nFull traceback:\n{traceback.format_exc()}"
+    finally:
+        session_manager.release(session_id)
 
 
 async def generate_docpack_from_prompt(
@@ -232,6 +272,7 @@ async def generate_docpack_from_prompt(
     tmpdir = str(session_dir / "docpack_generation")
     Path(tmpdir).mkdir(exist_ok=True)
     logger.info(f"Using temp directory: {tmpdir}")
+    session_manager.acquire(session_id)  # Keep the session from being evicted mid-run
 
     try:
         # Extract resource paths and convert docx to text if needed
@@ -239,16 +280,21 @@ async def generate_docpack_from_prompt(
         resource_paths = []
         docx_conversion_map = {}  # Maps txt_path -> original_docx_path
 
+        # Convert all docx resources to text at once, off the event loop
+        docx_texts = await convert_docx_files([
+            resource["path"] for resource in resources if (resource.get("path") or "").lower().endswith(".docx")
+        ])
+
         for resource in resources:
             if "path" in resource and resource["path"]:
                 resource_path = resource["path"]
 
-                # If it's a docx file, convert it to text and save as .txt file
+                # If it's a docx file, save its text as a .txt file
                 if resource_path.lower().endswith(".docx"):
                     try:
-                        from ..app import docx_to_text
-
-                        text_content = docx_to_text(resource_path)
+                        text_content = docx_texts[resource_path]
+                        if isinstance(text_content, Exception):
+                            raise text_content
 
                         # Create a text file version
                         txt_path = resource_path.replace(".docx", ".txt")
@@ -355,3 +401,5 @@ async def generate_docpack_from_prompt(
         logger.error(f"Error generating docpack: {str(e)}")
         logger.error(f"Full traceback: {traceback.format_exc()}")
         raise
+    finally:
+        session_manager.release(session_id)
@@ -734,6 +734,29 @@ function deleteBlock(blockId) {
     }
 }
 
+// Cancel a queued or running document generation job
+function cancelGeneration(jobId) {
+    const jobIdInput = document.getElementById('cancel-generation-job-id');
+    const textarea = jobIdInput && (jobIdInput.querySelector('textarea') || jobIdInput.querySelector('input[type="text"]'));
+
+    if (!textarea) {
+        console.error('Cancel generation job ID input not found!');
+        return;
+    }
+
+    textarea.value = jobId;
+    textarea.dispatchEvent(new Event('input', { bubbles: true }));
+
+    setTimeout(() => {
+        const cancelBtn = document.getElementById('cancel-generation-trigger');
+        if (cancelBtn) {
+            cancelBtn.click();
+        } else {
+            console.error('Cancel generation trigger button not found!');
+        }
+    }, 100);
+}
+
 // Update block content function
 function updateBlockContent(blockId, content) {
     console.log('updateBlockContent called with blockId:', blockId, 'content:', content);
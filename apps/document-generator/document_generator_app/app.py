@@ -1,4 +1,5 @@
 import argparse
+import hashlib
 import json
 import os
 import tempfile
@@ -9,12 +10,14 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 import gradio as gr
-import pypandoc
 from docx import Document
 from docpack_file import DocpackHandler
 from dotenv import load_dotenv
 
+from .block_cache import FragmentCache, block_render_key, dumps_outline
+from .conversions import docx_to_text, markdown_to_docx_async, markdown_to_html_async
 from .executor.runner import generate_docpack_from_prompt, generate_document
+from .jobs import Job, JobQueueFullError, JobStatus, job_queue
 from .models.outline import Outline, Resource, Section
 from .session import session_manager
 
@@ -26,6 +29,9 @@ logger = logging.getLogger(__name__)
 # Global variable to track if app is running in dev mode
 IS_DEV_MODE = False
 
+# Rendered block HTML, keyed by block content
+_block_html_cache: FragmentCache[str] = FragmentCache()
+
 # Supported file types for uploads
 SUPPORTED_FILE_TYPES = [
     ".txt",
@@ -93,20 +99,6 @@ SUPPORTED_FILE_TYPES = [
 ALLOWED_TEXT_EXTENSIONS = {ext for ext in SUPPORTED_FILE_TYPES if ext != ".docx"}
 
 
-def markdown_to_docx(markdown_content: str, output_path: str) -> str:
-    """Convert markdown content to docx file and return the output path."""
-    try:
-        pypandoc.convert_text(
-            markdown_content,
-            "docx",
-            format="md",
-            outputfile=output_path,
-        )
-        return output_path
-    except Exception as e:
-        raise Exception(f"Failed to convert markdown to docx: {str(e)}")
-
-
 def check_docx_protected(docx_path: str) -> tuple[bool, str]:
     """Check if a docx file is protected/encrypted without fully extracting text.
     Returns (is_protected, error_message)
@@ -128,27 +120,6 @@ def check_docx_protected(docx_path: str) -> tuple[bool, str]:
             return False, f"Document '{filename}' may have issues: {str(e)}"
 
 
-def docx_to_text(docx_path: str) -> str:
-    """Extract text content from a docx file."""
-    try:
-        doc = Document(docx_path)
-        paragraphs = []
-
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():  # Only add non-empty paragraphs
-                paragraphs.append(paragraph.text.strip())
-
-        return "\n\n".join(paragraphs)
-    except Exception as e:
-        error_msg = str(e).lower()
-        filename = os.path.basename(docx_path)
-        # Check for common security/encryption error messages
-        if any(term in error_msg for term in ["package not found"]):
-            raise Exception(f"Document '{filename}' may be protected or encrypted and cannot be processed.")
-        else:
-            raise Exception(f"Failed to extract text from '{filename}': {str(e)}")
-
-
 def json_to_outline(json_data: Dict[str, Any]) -> Outline:
     """Convert JSON structure to Outline dataclasses."""
     # Create outline with basic metadata
@@ -395,8 +366,8 @@ def update_block_indent(blocks, block_id, direction, title, description, resourc
     return blocks, outline, json_str
 
 
-async def handle_document_generation(title, description, resources, blocks, session_id=None):
-    """Generate document using the recipe executor."""
+async def handle_document_generation(title, description, resources, blocks, session_id=None, job=None):
+    """Generate document using the recipe executor, reporting progress to job if given."""
     json_str = ""  # Initialize json_str before the try block
     try:
         # Get or create session ID
@@ -419,7 +390,7 @@ async def handle_document_generation(title, description, resources, blocks, sess
         outline = json_to_outline(json_data)
 
         # Generate the document
-        generated_content = await generate_document(outline, session_id, IS_DEV_MODE)
+        generated_content = await generate_document(outline, session_id, IS_DEV_MODE, job=job)
 
         # Save both DOCX and Markdown versions
         base_filename = title if title else "document"
@@ -427,7 +398,7 @@ async def handle_document_generation(title, description, resources, blocks, sess
         # Save as DOCX
         docx_filename = f"{base_filename}.docx"
         docx_file_path = os.path.join(temp_dir, docx_filename)
-        markdown_to_docx(generated_content, docx_file_path)
+        await markdown_to_docx_async(generated_content, docx_file_path)
         logger.debug(f"Created DOCX file at: {docx_file_path}")
 
         # Save as Markdown
@@ -450,6 +421,38 @@ async def handle_document_generation(title, description, resources, blocks, sess
         return json_str, error_msg, None, None
 
 
+def render_job_progress(job: Job) -> str:
+    """Render the progress panel shown while a generation job is queued or running."""
+    import html as _html_lib
+
+    if job.status is JobStatus.QUEUED:
+        headline = "Waiting for a free generator…"
+    else:
+        headline = "Generating document, please wait…"
+    details = [_html_lib.escape(job.last_message)] if job.last_message else []
+    if job.steps_completed:
+        details.append(f"{job.steps_completed} steps done")
+    details.append(f"{int(job.elapsed)}s")
+    return (
+        f"<em>{headline}</em><br>"
+        f"<span class='generation-progress'>{' · '.join(details)}</span><br>"
+        f"<button class='cancel-generation-btn' onclick='cancelGeneration(\"{job.id}\")'>Cancel</button>"
+        "<br><br>"
+    )
+
+
+async def cancel_generation_job(job_id, session_id):
+    """Cancel a queued or running generation job started from the caller's session."""
+    job = job_queue.get(job_id) if job_id else None
+    if job is None:
+        return
+    if not session_id or job.session_id != session_id:
+        logger.warning(f"Refusing to cancel generation job {job_id} from another session")
+        return
+    if job_queue.cancel(job_id):
+        logger.info(f"Cancelled generation job {job_id}")
+
+
 def generate_document_json(title, description, resources, blocks, save_inline=False, inline_dir=None):
     """Generate JSON structure from document data following the example format.
 
@@ -457,6 +460,11 @@ def generate_document_json(title, description, resources, blocks, save_inline=Fa
         save_inline: If True, save inline resources to inline_dir and use real paths
         inline_dir: Directory to save inline resources to (required if save_inline=True)
     """
+    return dumps_outline(build_document_dict(title, description, resources, blocks, save_inline, inline_dir))
+
+
+def build_document_dict(title, description, resources, blocks, save_inline=False, inline_dir=None):
+    """Build the outline dict serialized by generate_document_json."""
 
     # Create the base structure
     doc_json = {"title": title, "general_instruction": description, "resources": [], "sections": []}
@@ -464,6 +472,11 @@ def generate_document_json(title, description, resources, blocks, save_inline=Fa
     # Track inline resources that need to be added
     inline_resources = []
 
+    # Resource key of each path (the first resource wins, as in a linear search)
+    resource_keys = {}
+    for idx, resource in enumerate(resources):
+        resource_keys.setdefault(resource["path"], f"resource_{idx + 1}")
+
     # Process resources with their descriptions from the resources list
     for idx, resource in enumerate(resources):
         # Get description directly from the resource
@@ -510,10 +523,9 @@ def generate_document_json(title, description, resources, blocks, save_inline=Fa
                             # Find the resource keys for this block's resources
                             for block_resource in block_resources:
                                 # Find matching resource in the global resources list
-                                for idx, resource in enumerate(resources):
-                                    if resource["path"] == block_resource.get("path"):
-                                        refs.append(f"resource_{idx + 1}")
-                                        break
+                                resource_key = resource_keys.get(block_resource.get("path"))
+                                if resource_key:
+                                    refs.append(resource_key)
                         section["refs"] = refs
 
                     else:  # block['type'] == 'text'
@@ -536,13 +548,9 @@ def generate_document_json(title, description, resources, blocks, save_inline=Fa
                             block_resources = block.get("resources", [])
                             if block_resources:
                                 # For text blocks, just use the first resource as resource_key
-                                for block_resource in block_resources:
-                                    # Find matching resource in the global resources list
-                                    for idx, resource in enumerate(resources):
-                                        if resource["path"] == block_resource.get("path"):
-                                            section["resource_key"] = f"resource_{idx + 1}"
-                                            break
-                                    break  # Only use first resource for resource_key
+                                resource_key = resource_keys.get(block_resources[0].get("path"))
+                                if resource_key:
+                                    section["resource_key"] = resource_key
 
                     # Check if next blocks are indented under this one
                     next_idx = i + 1
@@ -584,12 +592,13 @@ def generate_document_json(title, description, resources, blocks, save_inline=Fa
         gradio_temp_dir.mkdir(exist_ok=True)
 
         for inline_res in inline_resources:
-            # Generate unique filename with timestamp
-
-            timestamp = str(int(time.time() * 1000000))
-            filename = f"inline_{inline_res['block_id']}_{timestamp}.txt"
+            # Name by content hash: a block whose text did not change keeps its file, so
+            # an edit elsewhere in the document does not rewrite every inline resource
+            content_hash = hashlib.sha256(inline_res["content"].encode("utf-8")).hexdigest()[:16]
+            filename = f"inline_{inline_res['block_id']}_{content_hash}.txt"
             filepath = gradio_temp_dir / filename
-            filepath.write_text(inline_res["content"], encoding="utf-8")
+            if not filepath.exists():
+                filepath.write_text(inline_res["content"], encoding="utf-8")
 
             doc_json["resources"].append({
                 "key": inline_res["key"],
@@ -599,21 +608,21 @@ def generate_document_json(title, description, resources, blocks, save_inline=Fa
                 "is_inline": True,  # Mark as inline resource
             })
 
-    return json.dumps(doc_json, indent=2)
+    return doc_json
 
 
 def regenerate_outline_from_state(title, description, resources, blocks):
     """Regenerate the outline whenever any component changes."""
     try:
-        json_str = generate_document_json(title, description, resources, blocks)
-        json_data = json.loads(json_str)
+        json_data = build_document_dict(title, description, resources, blocks)
+        json_str = dumps_outline(json_data)
         outline = json_to_outline(json_data)
 
         # Update global state whenever outline is regenerated
         global current_document_state
         current_document_state = {"title": title, "outline_json": json_str, "blocks": blocks}
         logger.debug(f"regenerate_outline_from_state called with title='{title}'")
-        logger.debug(f"Updated global current_document_state: {current_document_state}")
+        logger.debug("Updated global current_document_state: %s", current_document_state)
 
         return outline, json_str
     except Exception as e:
@@ -1341,55 +1350,38 @@ def render_block_resources(block_resources, block_type, block_id):
     return html
 
 
-def render_blocks(blocks, focused_block_id=None):
-    """Render blocks as HTML."""
-
-    timestamp = int(time.time() * 1000)
+def render_block(block, max_allowed_indent):
+    """Render a single block as HTML, reusing the cached fragment when the block is unchanged."""
+    key = block_render_key(block, max_allowed_indent)
+    return _block_html_cache.get_or_build(key, lambda: _render_block_html(block, max_allowed_indent))
 
-    logger.debug(f"render_blocks called with {len(blocks) if blocks else 0} blocks at {timestamp}")
-    if blocks:
-        for i, block in enumerate(blocks):
-            res_count = len(block.get("resources", []))
-            logger.debug(f"  Block {i} ({block['id']}): {res_count} resources")
 
-    if not blocks:
-        return "<div class='empty-blocks-message'>Click '+ Add AI' to add an AI generated section.</div><div class='empty-blocks-message'>Click '+ Add Text' to add a traditional text section.</div>"
+def _render_block_html(block, max_allowed_indent):
+    block_id = block["id"]
+    is_collapsed = block.get("collapsed", False)
+    collapsed_class = "collapsed" if is_collapsed else ""
+    content_class = "" if is_collapsed else "show"
+    heading_value = block.get("heading", "")
+    indent_level = block.get("indent_level", 0)
 
-    html = f"<!-- Rendered at {timestamp} -->\n"
-    for i, block in enumerate(blocks):
-        block_id = block["id"]
-        is_collapsed = block.get("collapsed", False)
-        collapsed_class = "collapsed" if is_collapsed else ""
-        content_class = "" if is_collapsed else "show"
-
-        if block["type"] == "ai":
-            heading_value = block.get("heading", "")
-            indent_level = block.get("indent_level", 0)
-
-            # Determine max allowed indent level based on previous block
-            max_allowed_indent = 0
-            if i > 0:
-                prev_block = blocks[i - 1]
-                prev_indent = prev_block.get("indent_level", 0)
-                max_allowed_indent = prev_indent + 1
-
-            # Build indent controls - always include both buttons, just hide if not applicable
-            indent_controls = '<div class="indent-controls">'
-            # Show indent button only if we can indent further
-            if indent_level < 5 and indent_level < max_allowed_indent:
-                indent_controls += (
-                    f"<button class=\"indent-btn indent\" onclick=\"updateBlockIndent('{block_id}', 'in')\">⇥</button>"
-                )
-            else:
-                indent_controls += '<div class="indent-btn-placeholder"></div>'
+    # Build indent controls - always include both buttons, just hide if not applicable
+    indent_controls = '<div class="indent-controls">'
+    # Show indent button only if we can indent further
+    if indent_level < 5 and indent_level < max_allowed_indent:
+        indent_controls += (
+            f"<button class=\"indent-btn indent\" onclick=\"updateBlockIndent('{block_id}', 'in')\">⇥</button>"
+        )
+    else:
+        indent_controls += '<div class="indent-btn-placeholder"></div>'
 
-            if indent_level > 0:
-                indent_controls += f"<button class=\"indent-btn outdent\" onclick=\"updateBlockIndent('{block_id}', 'out')\">⇤</button>"
-            else:
-                indent_controls += '<div class="indent-btn-placeholder"></div>'
-            indent_controls += "</div>"
+    if indent_level > 0:
+        indent_controls += f"<button class=\"indent-btn outdent\" onclick=\"updateBlockIndent('{block_id}', 'out')\">⇤</button>"
+    else:
+        indent_controls += '<div class="indent-btn-placeholder"></div>'
+    indent_controls += "</div>"
 
-            html += f"""
+    if block["type"] == "ai":
+        return f"""
             <div class='content-block ai-block {collapsed_class}' data-id='{block_id}' data-indent='{indent_level}'>
                 {indent_controls}
                 <button class='collapse-btn' onclick='toggleBlockCollapse("{block_id}")'>
@@ -1417,34 +1409,8 @@ def render_blocks(blocks, focused_block_id=None):
                 </div>
             </div>
             """
-        elif block["type"] == "text":
-            heading_value = block.get("heading", "")
-            indent_level = block.get("indent_level", 0)
-
-            # Determine max allowed indent level based on previous block
-            max_allowed_indent = 0
-            if i > 0:
-                prev_block = blocks[i - 1]
-                prev_indent = prev_block.get("indent_level", 0)
-                max_allowed_indent = prev_indent + 1
-
-            # Build indent controls - always include both buttons, just hide if not applicable
-            indent_controls = '<div class="indent-controls">'
-            # Show indent button only if we can indent further
-            if indent_level < 5 and indent_level < max_allowed_indent:
-                indent_controls += (
-                    f"<button class=\"indent-btn indent\" onclick=\"updateBlockIndent('{block_id}', 'in')\">⇥</button>"
-                )
-            else:
-                indent_controls += '<div class="indent-btn-placeholder"></div>'
-
-            if indent_level > 0:
-                indent_controls += f"<button class=\"indent-btn outdent\" onclick=\"updateBlockIndent('{block_id}', 'out')\">⇤</button>"
-            else:
-                indent_controls += '<div class="indent-btn-placeholder"></div>'
-            indent_controls += "</div>"
-
-            html += f"""
+    elif block["type"] == "text":
+        return f"""
             <div class='content-block text-block {collapsed_class}' data-id='{block_id}' data-indent='{indent_level}'>
                 {indent_controls}
                 <button class='collapse-btn' onclick='toggleBlockCollapse("{block_id}")'>
@@ -1472,8 +1438,30 @@ def render_blocks(blocks, focused_block_id=None):
                 </div>
             </div>
             """
+    return ""
 
-    return html
+
+def render_blocks(blocks, focused_block_id=None):
+    """Render blocks as HTML.
+
+    Each block's fragment is memoized by its content (and the indent its predecessor allows),
+    so after an edit only the affected blocks are rendered again.
+    """
+
+    timestamp = int(time.time() * 1000)
+
+    logger.debug(f"render_blocks called with {len(blocks) if blocks else 0} blocks at {timestamp}")
+
+    if not blocks:
+        return "<div class='empty-blocks-message'>Click '+ Add AI' to add an AI generated section.</div><div class='empty-blocks-message'>Click '+ Add Text' to add a traditional text section.</div>"
+
+    fragments = [f"<!-- Rendered at {timestamp} -->\n"]
+    for i, block in enumerate(blocks):
+        # Determine max allowed indent level based on previous block
+        max_allowed_indent = blocks[i - 1].get("indent_level", 0) + 1 if i > 0 else 0
+        fragments.append(render_block(block, max_allowed_indent))
+
+    return "".join(fragments)
 
 
 def handle_start_file_upload(files, current_resources):
@@ -1792,6 +1780,10 @@ def handle_file_upload(files, current_resources, title, description, blocks, ses
                     warnings.append(error_msg)
                     continue  # Skip adding this file to resources
 
+            if not session_manager.has_room(session_id, os.path.getsize(file_path)):
+                warnings.append(f"{file_name} was not added: this session has reached its storage limit.")
+                continue
+
             # Copy file to session directory
             session_file_path = files_dir / file_name
             shutil.copy2(file_path, session_file_path)
@@ -2052,6 +2044,11 @@ def replace_resource_file_gradio(resources, old_resource_path, new_file, title,
         return resources, None, "{}", None, gr.update(value=warning_html, visible=True)
 
 
+def session_metrics() -> Dict[str, Any]:
+    """Session store metrics: active sessions, bytes held, evictions and trimmed bytes."""
+    return session_manager.metrics()
+
+
 def create_app():
     """Create and return the Document Builder Gradio app."""
 
@@ -2829,6 +2826,12 @@ def create_app():
                         )
                         replace_success_msg = gr.Textbox(visible=False, elem_id="replace-success-msg")
 
+                        # Hidden components for cancelling a generation job
+                        cancel_generation_job_id = gr.Textbox(visible=False, elem_id="cancel-generation-job-id")
+                        cancel_generation_trigger = gr.Button(
+                            "Cancel Generation", visible=False, elem_id="cancel-generation-trigger"
+                        )
+
                 # Generated document column: Generate and Save Document buttons (aligned right)
                 with gr.Column(scale=1, elem_classes="generate-col"):
                     with gr.Row(elem_classes="generate-btn-row"):
@@ -3175,6 +3178,10 @@ def create_app():
             outputs have their .then() updates silently dropped.  Wiring everything through
             a single .click(fn=generator) keeps every component's update path unique.
             """
+            # Jobs belong to a session, which alone may cancel them, so make sure there is one
+            if not session_id:
+                session_id = str(uuid.uuid4())
+
             # ── Step 1: loading state ────────────────────────────────────────────────
             # Yield immediately so the browser reflects the "in progress" state before
             # the (potentially long) LLM call begins.
@@ -3190,12 +3197,42 @@ def create_app():
                 gr.update(interactive=False),  # generate_doc_btn — disable
                 gr.update(),  # docx_file_path — no change
                 gr.update(),  # markdown_file_path — no change
+                session_id,  # session_state
             )
 
-            # ── Step 2: run generation ───────────────────────────────────────────────
-            json_str, content, docx_path, markdown_path = await handle_document_generation(
-                title, description, resources, blocks, session_id
-            )
+            # ── Step 2: queue the run and stream its progress ───────────────────────
+            # The recipe runs on a job worker; this handler only relays progress events,
+            # which also keeps the connection alive through proxies during long runs.
+            json_str, content, docx_path, markdown_path = gr.update(), "", None, None
+            try:
+                job = job_queue.submit(
+                    lambda job: handle_document_generation(title, description, resources, blocks, session_id, job),
+                    session_id=session_id,
+                )
+            except JobQueueFullError as e:
+                content = str(e)
+            else:
+                async for snapshot in job_queue.watch(job.id):
+                    if snapshot.status.finished:
+                        break
+                    yield (
+                        gr.update(),
+                        gr.update(),
+                        gr.update(value=render_job_progress(snapshot), visible=True),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                        gr.update(),
+                    )
+
+                if job.status is JobStatus.SUCCEEDED:
+                    json_str, content, docx_path, markdown_path = job.result
+                elif job.status is JobStatus.CANCELLED:
+                    content = "Generation cancelled."
+                else:
+                    content = f"Error generating document: {job.error}"
 
             # ── Step 3: final state ──────────────────────────────────────────────────
             # Render the markdown as HTML and update generated_content_html
@@ -3212,9 +3249,7 @@ def create_app():
             import asyncio
 
             try:
-                rendered_html = pypandoc.convert_text(
-                    content, "html5", format="md"
-                )
+                rendered_html = await markdown_to_html_async(content)
                 display_html = f'<div class="generated-document">{rendered_html}</div>'
             except Exception as html_err:
                 logger.warning(f"Failed to render markdown as HTML for display: {html_err}")
@@ -3255,6 +3290,7 @@ def create_app():
                 generate_btn_update,
                 docx_path,
                 markdown_path,
+                session_id,
             )
 
             # Yield the final state, then sleep and yield again.  Gradio 5.x
@@ -3283,9 +3319,14 @@ def create_app():
                 generate_doc_btn,
                 docx_file_path,
                 markdown_file_path,
+                session_state,
             ],
         )
 
+        cancel_generation_trigger.click(
+            fn=cancel_generation_job, inputs=[cancel_generation_job_id, session_state], outputs=[]
+        )
+
         # Save button is handled directly by DownloadButton with create_docpack_from_current_state
 
         # Handle download format selection
@@ -3593,13 +3634,11 @@ def create_app():
                     else:
                         logger.debug(f"Using existing session ID: {session_id}")
 
-                    # Create a temporary directory for extraction
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        logger.debug(f"Created temp directory: {temp_dir}")
-                        # Extract the docpack - convert temp_dir to Path object
-                        logger.debug(f"Extracting docpack from {docpack_path} to {temp_dir}")
-                        json_data, extracted_files = DocpackHandler.extract_package(str(docpack_path), Path(temp_dir))
-                        logger.debug(f"Extraction successful. Found {len(extracted_files)} files")
+                    # Read the outline and only the text resources straight from the archive
+                    with DocpackHandler.open_package(docpack_path) as reader:
+                        json_data = reader.outline
+                        archive_names = {Path(name).name: name for name in reader.resource_names()}
+                        logger.debug(f"Opened docpack {docpack_path} with {len(archive_names)} files")
                         logger.debug(f"JSON data has {len(json_data.get('resources', []))} resources")
 
                         # Process resources from the docpack
@@ -3610,7 +3649,7 @@ def create_app():
                             ):
                                 continue
 
-                            # Get the actual file from extracted files
+                            # Get the actual file from the archive
                             resource_filename = Path(res_data.get("path", "")).name
                             file_ext = Path(resource_filename).suffix.lower()
 
@@ -3618,41 +3657,41 @@ def create_app():
                             if file_ext not in ALLOWED_TEXT_EXTENSIONS:
                                 continue
 
-                            for extracted_file in extracted_files:
-                                if Path(extracted_file).name == resource_filename:
-                                    # Read the file content
-                                    with open(extracted_file, "r", encoding="utf-8") as f:
-                                        content = f.read()
-
-                                    # Use the session ID created at the beginning
-                                    session_dir = session_manager.get_session_dir(session_id)
-
-                                    # Convert Path to string for os.path operations
-                                    session_dir_str = str(session_dir)
-
-                                    # Save the file to session directory
-                                    files_dir = os.path.join(session_dir_str, "files")
-                                    os.makedirs(files_dir, exist_ok=True)
-                                    target_path = os.path.join(files_dir, resource_filename)
-                                    with open(target_path, "w", encoding="utf-8") as f:
-                                        f.write(content)
-
-                                    # Calculate file size
-                                    file_size = len(content.encode("utf-8"))
-                                    if file_size < 1024:
-                                        size_str = f"{file_size} B"
-                                    elif file_size < 1024 * 1024:
-                                        size_str = f"{file_size / 1024:.1f} KB"
-                                    else:
-                                        size_str = f"{file_size / (1024 * 1024):.1f} MB"
-
-                                    # Use the same format as handle_start_file_upload
-                                    resources.append({
-                                        "path": target_path,
-                                        "name": resource_filename,
-                                        "size": size_str,
-                                    })
-                                    break
+                            archive_name = archive_names.get(resource_filename)
+                            if archive_name is None:
+                                continue
+
+                            # Read the file content
+                            content = reader.read_text(archive_name)
+
+                            # Use the session ID created at the beginning
+                            session_dir = session_manager.get_session_dir(session_id)
+
+                            # Convert Path to string for os.path operations
+                            session_dir_str = str(session_dir)
+
+                            # Save the file to session directory
+                            files_dir = os.path.join(session_dir_str, "files")
+                            os.makedirs(files_dir, exist_ok=True)
+                            target_path = os.path.join(files_dir, resource_filename)
+                            with open(target_path, "w", encoding="utf-8") as f:
+                                f.write(content)
+
+                            # Calculate file size
+                            file_size = len(content.encode("utf-8"))
+                            if file_size < 1024:
+                                size_str = f"{file_size} B"
+                            elif file_size < 1024 * 1024:
+                                size_str = f"{file_size / 1024:.1f} KB"
+                            else:
+                                size_str = f"{file_size / (1024 * 1024):.1f} MB"
+
+                            # Use the same format as handle_start_file_upload
+                            resources.append({
+                                "path": target_path,
+                                "name": resource_filename,
+                                "size": size_str,
+                            })
                 except Exception as e:
                     logger.debug(f"Error extracting resources from docpack: {e}")
 
@@ -3801,6 +3840,14 @@ def create_app():
             outputs=[start_resources_state, start_resources_display],
         )
 
+        # Session store metrics for monitoring, exposed as an API endpoint only
+        metrics_trigger = gr.Textbox(visible=False)
+        metrics_output = gr.JSON(visible=False)
+        metrics_trigger.submit(fn=session_metrics, inputs=[], outputs=[metrics_output], api_name="session_metrics")
+
+    # Evict idle and over-quota sessions in the background while the app runs
+    session_manager.start_background_cleanup()
+
     return app, custom_css, custom_js
 
 
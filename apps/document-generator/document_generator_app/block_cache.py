@@ -0,0 +1,110 @@
+"""
+Memoization for the block editor.
+
+Editor handlers re-render and re-serialize the document after every edit, but an edit only
+changes one block (and, for indent changes, what its neighbour may render). Rendered HTML
+and serialized outline sections are cached by the content they depend on, so unchanged
+blocks reuse their previous fragments and only the edited block is rendered and encoded.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+# Block fields that affect the rendered HTML
+RENDER_FIELDS = ("id", "type", "heading", "content", "indent_level", "collapsed")
+RESOURCE_RENDER_FIELDS = ("title", "name", "path")
+
+# Stand-in for the nested sections while a section's own fields are encoded
+_SECTIONS_PLACEHOLDER = "\x00sections\x00"
+_SECTIONS_PLACEHOLDER_JSON = json.dumps(_SECTIONS_PLACEHOLDER)
+
+
+class FragmentCache(Generic[T]):
+    """Thread-safe LRU cache of rendered fragments, shared by all sessions.
+
+    Keys are the content a fragment is built from, so sessions with identical blocks share
+    entries and an entry never goes stale; it is only evicted when the cache is full.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, T]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def block_render_key(block: Dict[str, Any], *extra: Any) -> tuple:
+    """Cache key of a block's HTML: the fields it is rendered from plus any extra inputs."""
+    resources = tuple(
+        tuple(resource.get(name) for name in RESOURCE_RENDER_FIELDS) for resource in block.get("resources") or []
+    )
+    return (*(block.get(name) for name in RENDER_FIELDS), resources, *extra)
+
+
+_section_json_cache: FragmentCache[str] = FragmentCache()
+
+
+def dumps_outline(doc_json: Dict[str, Any]) -> str:
+    """Serialize an outline dict exactly like json.dumps(doc_json, indent=2).
+
+    Each section's own fields are encoded once and cached; nested section lists are
+    assembled from the cached fragments, so after an edit only the changed section is
+    encoded again. Section values other than "sections" must be scalars or lists of
+    scalars, and keys after "sections" must not hold user text.
+    """
+    if "sections" not in doc_json:
+        return json.dumps(doc_json, indent=2)
+    head = json.dumps({**doc_json, "sections": _SECTIONS_PLACEHOLDER}, indent=2)
+    return _splice_sections(head, doc_json["sections"])
+
+
+def _section_json(section: Dict[str, Any]) -> str:
+    if "sections" not in section:
+        return json.dumps(section, indent=2)
+    key = tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in section.items()
+        if name != "sections"
+    )
+    head = _section_json_cache.get_or_build(
+        key, lambda: json.dumps({**section, "sections": _SECTIONS_PLACEHOLDER}, indent=2)
+    )
+    return _splice_sections(head, section["sections"])
+
+
+def _splice_sections(head: str, sections: List[Dict[str, Any]]) -> str:
+    # The placeholder is the last occurrence: only generated keys can follow "sections"
+    before, _, after = head.rpartition(_SECTIONS_PLACEHOLDER_JSON)
+    if not sections:
+        return f"{before}[]{after}"
+    items = ",\n".join(_indent(_section_json(section), "    ") for section in sections)
+    return f"{before}[\n{items}\n  ]{after}"
+
+
+def _indent(text: str, prefix: str) -> str:
+    # Encoded JSON strings never contain raw newlines, so every newline starts a new line
+    return prefix + text.replace("\n", "\n" + prefix)
@@ -14,6 +14,27 @@ class Settings:
     llm_provider: str = os.getenv("LLM_PROVIDER", "anthropic")  # "anthropic", "openai", or "azure"
     default_model: str = os.getenv("DEFAULT_MODEL", "claude-sonnet-4-20250514")
 
+    # Generation settings
+    section_concurrency: int = int(os.getenv("SECTION_CONCURRENCY", "1"))  # Sections generated at once
+    generation_workers: int = int(os.getenv("GENERATION_WORKERS", "2"))  # Documents generated at once
+    # Waiting jobs before new ones are refused (0 = no limit)
+    generation_queue_size: int = int(os.getenv("GENERATION_QUEUE_SIZE", "20"))
+    conversion_workers: int = int(os.getenv("CONVERSION_WORKERS", "4"))  # DOCX/Markdown conversions run at once
+    conversion_cache_bytes: int = int(os.getenv("CONVERSION_CACHE_BYTES", str(64 * 1024 * 1024)))  # Cached results
+
+    # URL resource downloads
+    url_download_concurrency: int = int(os.getenv("URL_DOWNLOAD_CONCURRENCY", "4"))  # Downloads at once (all sessions)
+    url_download_timeout: float = float(os.getenv("URL_DOWNLOAD_TIMEOUT", "30"))  # Seconds per request
+    url_cache_max_bytes: int = int(os.getenv("URL_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # Shared download cache
+
+    # Session storage limits (0 disables a limit)
+    session_idle_ttl: float = float(os.getenv("SESSION_IDLE_TTL", "7200"))  # Seconds before an idle session is removed
+    session_max_bytes: int = int(os.getenv("SESSION_MAX_BYTES", str(512 * 1024 * 1024)))  # Disk quota per session
+    # Disk quota of all sessions together
+    session_store_max_bytes: int = int(os.getenv("SESSION_STORE_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+    session_max_count: int = int(os.getenv("SESSION_MAX_COUNT", "500"))
+    session_cleanup_interval: float = float(os.getenv("SESSION_CLEANUP_INTERVAL", "300"))  # Seconds between passes
+
     @property
     def model_id(self) -> str:
         """Get the full model ID for recipe-executor."""
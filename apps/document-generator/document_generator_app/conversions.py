@@ -0,0 +1,181 @@
+"""
+Document format conversions with a content-addressed cache.
+
+DOCX text extraction and pandoc conversions are cached by the SHA-256 of their input, so
+generating again with the same uploads (or re-rendering the same Markdown) reuses earlier
+results. The async variants run conversions on a shared worker pool instead of the event
+loop, and convert_docx_files() converts a batch of files concurrently.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import pypandoc
+from docx import Document
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionCache:
+    """Thread-safe LRU cache of conversion results, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Union[str, bytes], int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Union[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Union[str, bytes]) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+_cache = ConversionCache(settings.conversion_cache_bytes)
+_executor = ThreadPoolExecutor(max_workers=settings.conversion_workers, thread_name_prefix="conversion")
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def docx_to_text(docx_path: str) -> str:
+    """Extract text content from a docx file."""
+    try:
+        key = ("docx_text", _file_sha256(docx_path))
+    except OSError:
+        key = None  # Let Document() report the problem below
+    if key is not None:
+        cached = _cache.get(key)
+        if cached is not None:
+            return str(cached)
+
+    try:
+        doc = Document(docx_path)
+        paragraphs = []
+
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():  # Only add non-empty paragraphs
+                paragraphs.append(paragraph.text.strip())
+
+        text = "\n\n".join(paragraphs)
+    except Exception as e:
+        error_msg = str(e).lower()
+        filename = os.path.basename(docx_path)
+        # Check for common security/encryption error messages
+        if any(term in error_msg for term in ["package not found"]):
+            raise Exception(f"Document '{filename}' may be protected or encrypted and cannot be processed.")
+        else:
+            raise Exception(f"Failed to extract text from '{filename}': {str(e)}")
+
+    if key is not None:
+        _cache.put(key, text)
+    return text
+
+
+def markdown_to_docx(markdown_content: str, output_path: str) -> str:
+    """Convert markdown content to docx file and return the output path."""
+    key = ("md_docx", _text_sha256(markdown_content))
+    cached = _cache.get(key)
+    # DOCX results are cached as bytes; anything else under this key is treated as a miss
+    if isinstance(cached, bytes):
+        with open(output_path, "wb") as f:
+            f.write(cached)
+        return output_path
+
+    try:
+        pypandoc.convert_text(
+            markdown_content,
+            "docx",
+            format="md",
+            outputfile=output_path,
+        )
+    except Exception as e:
+        raise Exception(f"Failed to convert markdown to docx: {str(e)}")
+    with open(output_path, "rb") as f:
+        _cache.put(key, f.read())
+    return output_path
+
+
+def markdown_to_html(markdown_content: str) -> str:
+    """Render markdown content as HTML5 with pandoc."""
+    key = ("md_html", _text_sha256(markdown_content))
+    cached = _cache.get(key)
+    if cached is not None:
+        return str(cached)
+    html = pypandoc.convert_text(markdown_content, "html5", format="md")
+    _cache.put(key, html)
+    return html
+
+
+async def docx_to_text_async(docx_path: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, docx_to_text, docx_path)
+
+
+async def markdown_to_docx_async(markdown_content: str, output_path: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, markdown_to_docx, markdown_content, output_path)
+
+
+async def markdown_to_html_async(markdown_content: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, markdown_to_html, markdown_content)
+
+
+async def convert_docx_files(paths: List[str]) -> Dict[str, Union[str, Exception]]:
+    """Extract the text of several docx files concurrently.
+
+    Returns the text of each distinct path, or the exception its conversion raised, so
+    callers can decide per file whether a failure is fatal.
+    """
+    unique_paths = list(dict.fromkeys(paths))
+    results = await asyncio.gather(*(docx_to_text_async(path) for path in unique_paths), return_exceptions=True)
+    converted: Dict[str, Union[str, Exception]] = {}
+    for path, result in zip(unique_paths, results):
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result  # Cancellation
+        converted[path] = result
+    return converted
+
+
+def cache_stats() -> Dict[str, int]:
+    return _cache.stats()
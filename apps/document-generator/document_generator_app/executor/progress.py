@@ -0,0 +1,28 @@
+"""
+Progress reporting for recipe runs.
+
+The recipe executor reports a step event for every recipe and step it runs, including the
+steps of sub-recipes and loops. job_step_reporter turns those events into progress on a job.
+"""
+
+from pathlib import Path
+from typing import Callable
+
+from recipe_executor.executor import StepEvent
+
+from ..jobs import Job
+
+
+def job_step_reporter(job: Job) -> Callable[[StepEvent], None]:
+    """Return an executor step-event callback that reports step and recipe progress to a job."""
+
+    def report(event: StepEvent) -> None:
+        if event.kind == "step_started":
+            job.step_started()
+        elif event.kind == "step_completed":
+            job.step_completed()
+        elif event.kind == "recipe_started" and event.recipe_path:
+            name = Path(event.recipe_path).stem.replace("_", " ")
+            job.report(f"Running {name}")
+
+    return report
@@ -0,0 +1,251 @@
+"""
+Background job queue for document generation.
+
+Recipe runs are submitted as jobs and executed by a bounded pool of asyncio workers on the
+app's event loop, so a request handler only waits for progress events instead of holding a
+worker for the whole run. Jobs record status and progress events, can be cancelled, and
+are kept for a while after they finish so clients can poll for the result.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class JobEvent:
+    time: float
+    message: str
+
+
+@dataclass
+class Job:
+    """A queued or running recipe run and its progress."""
+
+    id: str
+    session_id: Optional[str]
+    run: Callable[["Job"], Awaitable[Any]]
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[JobEvent] = field(default_factory=list)
+    steps_started: int = 0
+    steps_completed: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    _task: Optional["asyncio.Task[Any]"] = field(default=None, repr=False)
+    _cancel_requested: bool = field(default=False, repr=False)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, repr=False)
+
+    def report(self, message: str) -> None:
+        """Record a progress event and wake up watchers."""
+        self.events.append(JobEvent(time.time(), message))
+        self._notify()
+
+    def step_started(self) -> None:
+        self.steps_started += 1
+        self._notify()
+
+    def step_completed(self) -> None:
+        self.steps_completed += 1
+        self._notify()
+
+    @property
+    def last_message(self) -> str:
+        return self.events[-1].message if self.events else ""
+
+    @property
+    def elapsed(self) -> float:
+        start = self.started_at or self.created_at
+        return (self.finished_at or time.time()) - start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status.value,
+            "steps_started": self.steps_started,
+            "steps_completed": self.steps_completed,
+            "message": self.last_message,
+            "elapsed": round(self.elapsed, 1),
+            "error": self.error,
+        }
+
+    def _notify(self) -> None:
+        # Steps may report from worker threads (e.g. code running in asyncio.to_thread)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is None or running is self._loop:
+            self._changed.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+
+class JobQueue:
+    """Bounded pool of asyncio workers running jobs in submission order."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        keep_finished: int = 200,
+    ):
+        self.max_workers = max_workers or settings.generation_workers
+        self.max_queued = settings.generation_queue_size if max_queued is None else max_queued
+        self.keep_finished = keep_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._workers: List["asyncio.Task[None]"] = []
+
+    def submit(self, run: Callable[[Job], Awaitable[Any]], session_id: Optional[str] = None) -> Job:
+        """Queue a job; run(job) is awaited by a worker and its return value becomes the result.
+
+        Must be called from the event loop the workers should run on. A session can have
+        one unfinished job at a time; submitting again returns that job.
+        """
+        self._ensure_workers()
+        assert self._queue is not None
+
+        if session_id:
+            for job in self._jobs.values():
+                if job.session_id == session_id and not job.status.finished:
+                    return job
+
+        if self.max_queued and self._queue.qsize() >= self.max_queued:
+            raise JobQueueFullError("Too many documents are being generated right now. Please try again shortly.")
+
+        job = Job(id=uuid.uuid4().hex, session_id=session_id, run=run, _loop=asyncio.get_running_loop())
+        self._jobs[job.id] = job
+        self._prune()
+        ahead = self._queue.qsize()
+        self._queue.put_nowait(job)
+        job.report(f"Queued ({ahead} ahead)" if ahead else "Queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def active_job(self, session_id: str) -> Optional[Job]:
+        """The unfinished job of a session, if any."""
+        for job in reversed(self._jobs.values()):
+            if job.session_id == session_id and not job.status.finished:
+                return job
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job from the event loop. Returns False if it had already finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status.finished:
+            return False
+        if job._task is not None:
+            job._cancel_requested = True
+            job._task.cancel()
+        else:
+            # Still queued; the worker skips it
+            self._finish(job, JobStatus.CANCELLED)
+        return True
+
+    async def watch(self, job_id: str, heartbeat: float = 5.0) -> AsyncIterator[Job]:
+        """Yield the job whenever it changes (and at least every heartbeat seconds) until it finishes."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        while True:
+            job._changed.clear()
+            yield job
+            if job.status.finished:
+                return
+            try:
+                await asyncio.wait_for(job._changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                pass
+
+    def metrics(self) -> Dict[str, int]:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": self.max_workers,
+            "queued": statuses.count(JobStatus.QUEUED),
+            "running": statuses.count(JobStatus.RUNNING),
+            "finished": sum(1 for status in statuses if status.finished),
+        }
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._workers and self._workers[0].get_loop() is loop:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [loop.create_task(self._worker(index)) for index in range(self.max_workers)]
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                if job.status is JobStatus.QUEUED:
+                    await self._run(job)
+            except Exception as e:  # Never let a job take the worker down
+                logger.error(f"Job worker {index} failed on job {job.id}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.report("Started")
+        job._task = asyncio.ensure_future(job.run(job))
+        try:
+            job.result = await job._task
+        except asyncio.CancelledError:
+            if not job._cancel_requested:
+                raise  # The worker itself is being cancelled
+            self._finish(job, JobStatus.CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+        else:
+            self._finish(job, JobStatus.SUCCEEDED)
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        job._task = None
+        job.report(status.value.capitalize())
+        logger.info(f"Job {job.id} {status.value} after {job.elapsed:.1f}s")
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status.finished]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+
+# Global instance
+job_queue = JobQueue()
@@ -3,17 +3,192 @@
 Handles resolving resources at generation time:
 - Uploaded files: resolved to session files directory
 - URLs: downloaded to session temp directory
+
+URL downloads run concurrently on a bounded worker pool and go through a content cache
+shared by all sessions. Cached URLs are revalidated with ETag/Last-Modified, so unchanged
+resources are not downloaded again, and files are named by content hash so URLs with the
+same basename cannot overwrite each other.
 """
 
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
 import urllib.request
 import urllib.error
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
+from .config import settings
 from .models.outline import Resource
 from .session import session_manager
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedDownload:
+    """A downloaded URL body and the validators needed to revalidate it."""
+
+    digest: str
+    path: Path
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+class UrlCache:
+    """Content cache of downloaded URLs, shared by all sessions.
+
+    Bodies are stored once per content hash; the index maps each URL to its body and
+    validators. The least recently used URLs are dropped when the cache exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int, timeout: float):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._root: Optional[Path] = None
+        self._entries: "OrderedDict[str, CachedDownload]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-URL request locks with their number of users; dropped when the last user leaves
+        self._url_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        self.stale = 0
+        self.revalidated = 0
+        self.downloads = 0
+
+    def fetch(self, url: str) -> CachedDownload:
+        """Return the current body of url, downloading it only if the cached copy is stale."""
+        with self._lock:
+            url_lock, users = self._url_locks.get(url) or (threading.Lock(), 0)
+            self._url_locks[url] = (url_lock, users + 1)
+        try:
+            # One request per URL at a time; concurrent callers share its result
+            with url_lock:
+                return self._fetch(url)
+        finally:
+            with self._lock:
+                url_lock, users = self._url_locks[url]
+                if users > 1:
+                    self._url_locks[url] = (url_lock, users - 1)
+                else:
+                    del self._url_locks[url]
+
+    def _fetch(self, url: str) -> CachedDownload:
+        with self._lock:
+            cached = self._entries.get(url)
+        if cached is not None and not cached.path.exists():
+            cached = None  # Body removed from disk; download again
+
+        request = urllib.request.Request(url)
+        if cached is not None:
+            if cached.etag:
+                request.add_header("If-None-Match", cached.etag)
+            if cached.last_modified:
+                request.add_header("If-Modified-Since", cached.last_modified)
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                entry = self._store(url, response)
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or cached is None:
+                raise
+            with self._lock:
+                cached.fetched_at = time.time()
+                if url in self._entries:  # May have been evicted while revalidating
+                    self._entries.move_to_end(url)
+                self.revalidated += 1
+            return cached
+        except (urllib.error.URLError, OSError) as e:
+            if cached is None:
+                raise
+            logger.warning(f"Could not revalidate {url}, using cached copy: {e}")
+            with self._lock:
+                self.stale += 1
+            return cached
+
+        with self._lock:
+            self.downloads += 1
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "urls": len(self._entries),
+                "bytes": self._size(),
+                "stale": self.stale,
+                "revalidated": self.revalidated,
+                "downloads": self.downloads,
+            }
+
+    def _store(self, url: str, response: Any) -> CachedDownload:
+        root = self._ensure_root()
+        digest = hashlib.sha256()
+        size = 0
+        fd, partial = tempfile.mkstemp(dir=root, suffix=".partial")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := response.read(1024 * 1024):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            body_path = root / digest.hexdigest()
+            os.replace(partial, body_path)
+        except BaseException:
+            Path(partial).unlink(missing_ok=True)
+            raise
+
+        entry = CachedDownload(
+            digest=digest.hexdigest(),
+            path=body_path,
+            size=size,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.time(),
+        )
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            self._entries[url] = entry
+            if previous is not None:
+                self._release_body(previous)
+            self._evict()
+        return entry
+
+    def _size(self) -> int:
+        # Bodies shared by several URLs are counted once
+        return sum({entry.digest: entry.size for entry in self._entries.values()}.values())
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and self._size() > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._release_body(entry)
+
+    def _release_body(self, entry: CachedDownload) -> None:
+        if not any(other.digest == entry.digest for other in self._entries.values()):
+            entry.path.unlink(missing_ok=True)
+
+    def _ensure_root(self) -> Path:
+        with self._lock:
+            if self._root is None:
+                self._root = Path(tempfile.mkdtemp(prefix="doc-gen-url-cache-"))
+                atexit.register(shutil.rmtree, self._root, True)
+            return self._root
+
+
+url_cache = UrlCache(settings.url_cache_max_bytes, settings.url_download_timeout)
+_download_executor = ThreadPoolExecutor(
+    max_workers=settings.url_download_concurrency, thread_name_prefix="url-download"
+)
+
 
 def resolve_resource(resource: Resource, session_id: Optional[str]) -> Path:
     """Resolve a resource to a local file path for generation.
@@ -46,7 +221,7 @@ def _resolve_file_resource(resource: Resource, session_id: Optional[str]) -> Pat
 
 
 def _download_url_resource(resource: Resource, session_id: Optional[str]) -> Path:
-    """Download URL resource to temp directory."""
+    """Download URL resource (through the shared cache) to temp directory."""
     temp_dir = session_manager.get_temp_dir(session_id)
 
     # Generate filename from URL
@@ -57,19 +232,41 @@ def _download_url_resource(resource: Resource, session_id: Optional[str]) -> Pat
     if not filename or filename == "/":
         filename = f"{resource.key}.downloaded"
 
-    target_path = temp_dir / filename
-
-    # Download the file
     try:
-        urllib.request.urlretrieve(resource.path, target_path)
-        return target_path
+        entry = url_cache.fetch(resource.path)
+        try:
+            return _place_download(entry, temp_dir, filename)
+        except FileNotFoundError:
+            # Evicted from the cache before it was copied; fetch it again
+            return _place_download(url_cache.fetch(resource.path), temp_dir, filename)
     except Exception as e:
         raise urllib.error.URLError(f"Failed to download {resource.path}: {str(e)}")
 
 
-def resolve_all_resources(outline_data: Dict[str, Any], session_id: Optional[str]) -> Dict[str, Path]:
+def _place_download(entry: CachedDownload, temp_dir: Path, filename: str) -> Path:
+    """Link (or copy) a cached download into a session directory under a content-addressed name."""
+    # Prefix the content hash so different content never shares a name
+    target_path = temp_dir / f"{entry.digest[:16]}-{filename}"
+    if target_path.exists():
+        return target_path
+    partial = temp_dir / f".{target_path.name}.{threading.get_ident()}.partial"
+    partial.unlink(missing_ok=True)
+    try:
+        os.link(entry.path, partial)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(entry.path, partial)
+    os.replace(partial, target_path)
+    return target_path
+
+
+async def resolve_all_resources(outline_data: Dict[str, Any], session_id: Optional[str]) -> Dict[str, Path]:
     """Resolve all resources in an outline to local paths.
 
+    URL resources are downloaded concurrently, at most settings.url_download_concurrency
+    at a time across all sessions.
+
     Args:
         outline_data: Outline dictionary with resources
         session_id: Session ID for directory resolution
@@ -81,9 +278,23 @@ def resolve_all_resources(outline_data: Dict[str, Any], session_id: Optional[str
 
     outline = Outline.from_dict(outline_data)
     resolved_resources = {}
+    downloads = []
 
     for resource in outline.resources:
         if resource.key:
-            resolved_resources[resource.key] = resolve_resource(resource, session_id)
+            if resource.path.startswith(("http://", "https://")):
+                downloads.append(resource)
+            else:
+                resolved_resources[resource.key] = resolve_resource(resource, session_id)
+
+    loop = asyncio.get_running_loop()
+    downloaded_paths = await asyncio.gather(
+        *(
+            loop.run_in_executor(_download_executor, _download_url_resource, resource, session_id)
+            for resource in downloads
+        )
+    )
+    resolved_resources.update((resource.key, path) for resource, path in zip(downloads, downloaded_paths))
 
-    return resolved_resources
+    # Keep outline order
+    return {resource.key: resolved_resources[resource.key] for resource in outline.resources if resource.key}
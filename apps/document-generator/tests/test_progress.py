@@ -0,0 +1,29 @@
+"""Tests for reporting recipe step events to a generation job."""
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+from recipe_executor.context import Context
+from recipe_executor.executor import Executor
+
+from document_generator_app.executor.progress import job_step_reporter
+from document_generator_app.jobs import Job
+
+
+async def _never_run(job: Job) -> None:
+    raise AssertionError("not run")
+
+
+@pytest.mark.asyncio
+async def test_job_counts_steps_of_the_recipe_and_its_sub_recipes(tmp_path: Path):
+    section = tmp_path / "write_section.json"
+    section.write_text(json.dumps({"steps": [{"type": "set_context", "config": {"key": "a", "value": "1"}}]}))
+    recipe = {"steps": [{"type": "execute_recipe", "config": {"recipe_path": str(section)}}]}
+    job = Job(id="job", session_id="session", run=_never_run)
+
+    await Executor(logging.getLogger("test_progress"), on_step=job_step_reporter(job)).execute(recipe, Context())
+
+    assert (job.steps_started, job.steps_completed) == (2, 2)
+    assert [event.message for event in job.events] == ["Running write section"]
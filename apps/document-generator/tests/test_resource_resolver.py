@@ -0,0 +1,157 @@
+"""Tests for URL resource resolution against a local HTTP stand-in server."""
+
+import hashlib
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from document_generator_app import resource_resolver
+from document_generator_app.models.outline import Resource
+from document_generator_app.resource_resolver import UrlCache, resolve_all_resources
+from document_generator_app.session import SessionManager
+
+
+class StandInServer:
+    """Serves in-memory documents with ETags and counts full downloads and 304 answers."""
+
+    def __init__(self) -> None:
+        self.documents = {}
+        self.delay = 0.0
+        self.downloads = 0
+        self.not_modified = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.documents.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                time.sleep(server.delay)
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                server.downloads += 1
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.stop()
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    """A fresh URL cache and a session store under tmp_path."""
+    url_cache = UrlCache(max_bytes=1024 * 1024, timeout=5)
+    monkeypatch.setattr(resource_resolver, "url_cache", url_cache)
+    monkeypatch.setattr(resource_resolver, "session_manager", SessionManager(root=tmp_path, cleanup_interval=0))
+    return url_cache
+
+
+def url_resource(key: str, url: str) -> Resource:
+    return Resource(key=key, path=url, title=key, description="", merge_mode="concat")
+
+
+def outline(*urls: str) -> dict:
+    return {"title": "t", "resources": [{"key": f"r{i}", "path": url} for i, url in enumerate(urls)]}
+
+
+def test_same_basename_urls_resolve_to_distinct_files(server, cache):
+    server.documents = {"/a/doc.md": b"first", "/b/doc.md": b"second"}
+
+    first = resource_resolver.resolve_resource(url_resource("a", server.url("/a/doc.md")), "s1")
+    second = resource_resolver.resolve_resource(url_resource("b", server.url("/b/doc.md")), "s1")
+
+    assert first != second
+    assert first.name.endswith("-doc.md") and second.name.endswith("-doc.md")
+    assert first.read_bytes() == b"first"
+    assert second.read_bytes() == b"second"
+
+
+def test_unchanged_url_is_revalidated_without_download(server, cache):
+    server.documents = {"/doc.md": b"content"}
+    resource = url_resource("doc", server.url("/doc.md"))
+
+    first = resource_resolver.resolve_resource(resource, "s1")
+    second = resource_resolver.resolve_resource(resource, "s2")
+
+    assert server.downloads == 1
+    assert server.not_modified == 1
+    assert cache.stats()["revalidated"] == 1
+    assert first.name == second.name
+    assert second.read_bytes() == b"content"
+
+
+def test_changed_content_gets_a_new_file(server, cache):
+    server.documents = {"/doc.md": b"old"}
+    resource = url_resource("doc", server.url("/doc.md"))
+    old = resource_resolver.resolve_resource(resource, "s1")
+
+    server.documents["/doc.md"] = b"new"
+    new = resource_resolver.resolve_resource(resource, "s1")
+
+    assert server.downloads == 2
+    assert new != old
+    assert old.read_bytes() == b"old"
+    assert new.read_bytes() == b"new"
+
+
+def test_stale_copy_is_served_when_server_is_down(server, cache):
+    server.documents = {"/doc.md": b"content"}
+    resource = url_resource("doc", server.url("/doc.md"))
+    resource_resolver.resolve_resource(resource, "s1")
+
+    server.stop()
+    path = resource_resolver.resolve_resource(resource, "s2")
+
+    assert path.read_bytes() == b"content"
+    assert cache.stats()["stale"] == 1
+
+
+def test_missing_url_raises(server, cache):
+    with pytest.raises(urllib.error.URLError):
+        resource_resolver.resolve_resource(url_resource("doc", server.url("/missing.md")), "s1")
+
+
+@pytest.mark.asyncio
+async def test_urls_download_concurrently(server, cache):
+    server.documents = {f"/{name}.md": name.encode() for name in ("one", "two", "three")}
+    server.delay = 0.3
+    urls = [server.url(f"/{name}.md") for name in ("one", "two", "three")]
+
+    started = time.monotonic()
+    resolved = await resolve_all_resources(outline(*urls), "s1")
+    elapsed = time.monotonic() - started
+
+    assert list(resolved) == ["r0", "r1", "r2"]
+    assert [path.read_bytes() for path in resolved.values()] == [b"one", b"two", b"three"]
+    assert elapsed < 0.8
+    assert cache._url_locks == {}
@@ -22,6 +22,14 @@ class Settings:
     llm_provider: str = os.getenv("LLM_PROVIDER", "openai")  # "openai" or "azure"
     default_model: str = os.getenv("DEFAULT_MODEL", "gpt-4o")
 
+    # Session storage limits (0 disables a limit)
+    session_idle_ttl: float = float(os.getenv("SESSION_IDLE_TTL", "7200"))  # Seconds before an idle session is removed
+    session_max_bytes: int = int(os.getenv("SESSION_MAX_BYTES", str(512 * 1024 * 1024)))  # Disk quota per session
+    # Disk quota of all sessions together
+    session_store_max_bytes: int = int(os.getenv("SESSION_STORE_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+    session_max_count: int = int(os.getenv("SESSION_MAX_COUNT", "500"))
+    session_cleanup_interval: float = float(os.getenv("SESSION_CLEANUP_INTERVAL", "300"))  # Seconds between passes
+
     @property
     def model_id(self) -> str:
         """Get the full model ID for recipe-executor."""
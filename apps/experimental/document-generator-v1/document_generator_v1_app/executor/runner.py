@@ -60,6 +60,7 @@ async def generate_document(outline: Optional[Outline], session_id: Optional[str
     tmpdir = str(session_dir / "execution")
     Path(tmpdir).mkdir(exist_ok=True)
     logger.info(f"Using temp directory: {tmpdir}")
+    session_manager.acquire(session_id)  # Keep the session from being evicted mid-run
 
     try:
         # Resolve all resources using the new resolver
@@ -134,3 +135,5 @@ async def generate_document(outline: Optional[Outline], session_id: Optional[str
         logger.error(f"Error generating document: {str(e)}")
         logger.error(f"Full traceback: {traceback.format_exc()}")
         return f"Error generating document: {str(e)}\n\nFull traceback:\n{traceback.format_exc()}"
+    finally:
+        session_manager.release(session_id)
@@ -55,7 +55,8 @@ class DocpackHandler:
 
             # Extract all other files to files/ subdirectory
             for file_info in zf.filelist:
-                if file_info.filename != "outline.json":
+                # Skip docpack metadata such as .docpack/manifest.json
+                if file_info.filename != "outline.json" and not file_info.filename.startswith(".docpack/"):
                     # Extract to files directory
                     file_info.filename = Path(file_info.filename).name  # Remove any path components
                     zf.extract(file_info, files_dir)
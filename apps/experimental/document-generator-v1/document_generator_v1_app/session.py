@@ -1,40 +1,106 @@
 """
 Session management for multi-user hosting.
 
-Provides session-scoped temporary directories to isolate user data.
+Provides session-scoped temporary directories to isolate user data. The store is bounded:
+sessions idle for longer than the TTL are removed, each session has a disk quota (regenerable
+files in temp/ are trimmed first), and the least recently used idle sessions are evicted when
+the store exceeds its global disk quota or session count. Eviction runs in a background task
+started by the app; metrics() reports active sessions and bytes held.
 """
 
-import uuid
+import asyncio
+import atexit
+import logging
+import os
+import shutil
 import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-import shutil
-import atexit
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from recipe_executor.utils.lazy_files import forget_lazy_files
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+DIR_PREFIX = "doc-gen-v1-"
+
+
+def _dir_size(path: Path) -> int:
+    """Total size in bytes of the files under path."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass  # Removed while walking
+    return total
 
 
 class SessionManager:
-    """Dead simple session directory management"""
+    """Bounded session directory management with idle TTL, disk quotas and LRU eviction"""
+
+    def __init__(
+        self,
+        idle_ttl: Optional[float] = None,
+        session_max_bytes: Optional[int] = None,
+        store_max_bytes: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        cleanup_interval: Optional[float] = None,
+        root: Optional[Path] = None,
+    ):
+        # Zero disables a limit
+        self.idle_ttl = settings.session_idle_ttl if idle_ttl is None else idle_ttl
+        self.session_max_bytes = settings.session_max_bytes if session_max_bytes is None else session_max_bytes
+        self.store_max_bytes = settings.session_store_max_bytes if store_max_bytes is None else store_max_bytes
+        self.max_sessions = settings.session_max_count if max_sessions is None else max_sessions
+        self.cleanup_interval = settings.session_cleanup_interval if cleanup_interval is None else cleanup_interval
+        self.root = Path(root) if root is not None else Path(tempfile.gettempdir())
 
-    def __init__(self):
-        self.session_dirs = {}
+        # Least recently used first
+        self.session_dirs: "OrderedDict[str, Path]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._bytes: Dict[str, int] = {}
+        self._in_use: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._cleanup_started = False
+        self._cleanup_task: Optional["asyncio.Task[None]"] = None
+        self._evictions: Dict[str, int] = {"expired": 0, "quota": 0, "count": 0}
+        self._trimmed_bytes = 0
+        self._last_cleanup: Optional[float] = None
         atexit.register(self.cleanup_all)
 
     def get_session_dir(self, session_id: Optional[str] = None) -> Path:
-        """Get unique temp directory for session"""
+        """Get unique temp directory for session, marking the session as recently used"""
         if not session_id:
             session_id = str(uuid.uuid4())
 
-        if session_id not in self.session_dirs:
-            session_dir = Path(tempfile.gettempdir()) / f"doc-gen-v1-{session_id}"
-            session_dir.mkdir(exist_ok=True)
+        evicted: List[Path] = []
+        with self._lock:
+            if session_id not in self.session_dirs:
+                session_dir = self.root / f"{DIR_PREFIX}{session_id}"
+                session_dir.mkdir(exist_ok=True)
 
-            # Create subdirectories for organized file management
-            (session_dir / "files").mkdir(exist_ok=True)  # Uploaded files (stored in docpack)
-            (session_dir / "temp").mkdir(exist_ok=True)  # Generated files, downloaded URLs
+                # Create subdirectories for organized file management
+                (session_dir / "files").mkdir(exist_ok=True)  # Uploaded files (stored in docpack)
+                (session_dir / "temp").mkdir(exist_ok=True)  # Generated files, downloaded URLs
 
-            self.session_dirs[session_id] = session_dir
+                self.session_dirs[session_id] = session_dir
+                self._bytes.setdefault(session_id, 0)
+                if self.max_sessions and len(self.session_dirs) > self.max_sessions:
+                    evicted = self._evict_lru(len(self.session_dirs) - self.max_sessions, "count", keep=session_id)
 
-        return self.session_dirs[session_id]
+            self._touch(session_id)
+            session_dir = self.session_dirs[session_id]
+
+        self._remove_dirs(evicted)
+        return session_dir
 
     def get_files_dir(self, session_id: Optional[str] = None) -> Path:
         """Get files directory for session (for uploaded files)"""
@@ -44,11 +110,226 @@ class SessionManager:
         """Get temp directory for session (for generated files and downloaded URLs)"""
         return self.get_session_dir(session_id) / "temp"
 
+    def acquire(self, session_id: Optional[str]) -> None:
+        """Protect a session from eviction while a long-running operation uses it"""
+        if not session_id:
+            return
+        self.get_session_dir(session_id)
+        with self._lock:
+            self._in_use[session_id] = self._in_use.get(session_id, 0) + 1
+
+    def release(self, session_id: Optional[str]) -> None:
+        """Undo acquire(); the session counts as used at release time"""
+        if not session_id:
+            return
+        with self._lock:
+            remaining = self._in_use.get(session_id, 1) - 1
+            if remaining > 0:
+                self._in_use[session_id] = remaining
+            else:
+                self._in_use.pop(session_id, None)
+            if session_id in self.session_dirs:
+                self._touch(session_id)
+
+    @contextmanager
+    def in_use(self, session_id: Optional[str]) -> Iterator[None]:
+        """Context manager form of acquire() and release()"""
+        self.acquire(session_id)
+        try:
+            yield
+        finally:
+            self.release(session_id)
+
+    def has_room(self, session_id: str, additional_bytes: int) -> bool:
+        """Check whether additional_bytes can be stored in a session without exceeding its quota"""
+        if not self.session_max_bytes:
+            return True
+        used = _dir_size(self.get_session_dir(session_id))
+        with self._lock:
+            if session_id in self.session_dirs:
+                self._bytes[session_id] = used
+        return used + additional_bytes <= self.session_max_bytes
+
+    def metrics(self) -> Dict[str, object]:
+        """Store metrics: active sessions, bytes held (as of the last measurement) and evictions"""
+        with self._lock:
+            sizes = [self._bytes.get(session_id, 0) for session_id in self.session_dirs]
+            return {
+                "active_sessions": len(self.session_dirs),
+                "sessions_in_use": len(self._in_use),
+                "bytes_held": sum(sizes),
+                "largest_session_bytes": max(sizes, default=0),
+                "evictions": dict(self._evictions),
+                "trimmed_bytes": self._trimmed_bytes,
+                "last_cleanup": self._last_cleanup,
+            }
+
+    def cleanup(self) -> Dict[str, object]:
+        """Run one eviction pass and return the resulting metrics.
+
+        Sessions idle for longer than the TTL are removed, sessions above their quota lose
+        their oldest temp files (unless in use), and the least recently used idle sessions are evicted while
+        the store exceeds its global quota or session count.
+        """
+        now = time.time()
+        evicted: List[Path] = []
+        with self._lock:
+            if self.idle_ttl:
+                expired = [
+                    session_id
+                    for session_id in self.session_dirs
+                    if session_id not in self._in_use and now - self._last_access[session_id] > self.idle_ttl
+                ]
+                for session_id in expired:
+                    evicted.append(self._forget(session_id, "expired"))
+            sessions = list(self.session_dirs.items())
+        self._remove_dirs(evicted)
+
+        # Measure outside the lock; sizes are an estimate by the time they are used anyway
+        sizes = {session_id: _dir_size(session_dir) for session_id, session_dir in sessions}
+        trimmed = 0
+        if self.session_max_bytes:
+            for session_id, session_dir in sessions:
+                with self._lock:
+                    # A running generation may still need its downloaded and converted files
+                    pinned = session_id in self._in_use
+                if not pinned and sizes[session_id] > self.session_max_bytes:
+                    freed = self._trim_temp(session_dir, sizes[session_id] - self.session_max_bytes)
+                    sizes[session_id] -= freed
+                    trimmed += freed
+
+        evicted = []
+        with self._lock:
+            for session_id, size in sizes.items():
+                if session_id in self.session_dirs:
+                    self._bytes[session_id] = size
+            if self.store_max_bytes:
+                evicted += self._evict_over_quota()
+            if self.max_sessions and len(self.session_dirs) > self.max_sessions:
+                evicted += self._evict_lru(len(self.session_dirs) - self.max_sessions, "count")
+            self._last_cleanup = now
+        self._remove_dirs(evicted)
+
+        metrics = self.metrics()
+        if evicted or trimmed:
+            logger.info(f"Session cleanup: {metrics}")
+        return metrics
+
+    async def run_cleanup_loop(self) -> None:
+        """Run cleanup passes every cleanup_interval seconds without blocking the event loop"""
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await asyncio.to_thread(self.cleanup)
+            except Exception as e:
+                logger.error(f"Session cleanup failed: {e}")
+
+    def start_background_cleanup(self) -> None:
+        """Start the cleanup loop once, on the running event loop or else on a daemon thread.
+
+        Called by the app at startup, not on import, so importing the module starts nothing.
+        """
+        if self.cleanup_interval <= 0:
+            return
+        with self._lock:
+            if self._cleanup_started:
+                return
+            self._cleanup_started = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._cleanup_task = loop.create_task(self.run_cleanup_loop())
+        else:
+            thread = threading.Thread(
+                target=lambda: asyncio.run(self.run_cleanup_loop()), name="session-cleanup", daemon=True
+            )
+            thread.start()
+
     def cleanup_all(self):
         """Clean up all session directories on shutdown"""
-        for session_dir in self.session_dirs.values():
+        with self._lock:
+            session_dirs = list(self.session_dirs.values())
+            self.session_dirs.clear()
+            self._last_access.clear()
+            self._bytes.clear()
+        for session_dir in session_dirs:
+            forget_lazy_files(str(session_dir))
             shutil.rmtree(session_dir, ignore_errors=True)
 
+    def _touch(self, session_id: str) -> None:
+        self.session_dirs.move_to_end(session_id)
+        self._last_access[session_id] = time.time()
+
+    def _forget(self, session_id: str, reason: str) -> Path:
+        """Drop a session from the store and move its directory aside for removal.
+
+        Renaming under the lock means a request that recreates the session right after
+        gets a fresh directory instead of racing the removal.
+        """
+        session_dir = self.session_dirs.pop(session_id)
+        self._last_access.pop(session_id, None)
+        self._bytes.pop(session_id, None)
+        self._evictions[reason] += 1
+        # Lazily extracted files registered under the session would otherwise stay registered forever
+        forget_lazy_files(str(session_dir))
+        doomed = session_dir.with_name(f".{session_dir.name}.evicted-{uuid.uuid4().hex[:8]}")
+        try:
+            session_dir.rename(doomed)
+        except OSError:
+            return session_dir
+        return doomed
+
+    def _evict_lru(self, count: int, reason: str, keep: Optional[str] = None) -> List[Path]:
+        candidates = [
+            session_id for session_id in self.session_dirs if session_id != keep and session_id not in self._in_use
+        ]
+        return [self._forget(session_id, reason) for session_id in candidates[:count]]
+
+    def _evict_over_quota(self) -> List[Path]:
+        evicted = []
+        total = sum(self._bytes.get(session_id, 0) for session_id in self.session_dirs)
+        for session_id in list(self.session_dirs):
+            if total <= self.store_max_bytes:
+                break
+            if session_id in self._in_use:
+                continue
+            total -= self._bytes.get(session_id, 0)
+            evicted.append(self._forget(session_id, "quota"))
+        return evicted
+
+    def _trim_temp(self, session_dir: Path, excess: int) -> int:
+        """Delete the oldest files in a session's temp directory until excess bytes are freed"""
+        entries: List[Tuple[float, int, Path]] = []
+        for root, _dirs, files in os.walk(session_dir / "temp"):
+            for name in files:
+                path = Path(root) / name
+                try:
+                    stat = path.lstat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        freed = 0
+        for _mtime, size, path in sorted(entries):
+            if freed >= excess:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            freed += size
+        with self._lock:
+            self._trimmed_bytes += freed
+        return freed
+
+    @staticmethod
+    def _remove_dirs(paths: List[Path]) -> None:
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
 
 # Global instance
 session_manager = SessionManager()
@@ -1833,6 +1833,16 @@ def build_editor() -> gr.Blocks:
 
             return json.dumps(schema, indent=2)
 
+        def api_session_metrics() -> str:
+            """Get session store metrics: active sessions, bytes held, evictions and trimmed bytes.
+
+            Returns:
+                str: JSON object with the session store metrics
+            """
+            from .session import session_manager
+
+            return json.dumps(session_manager.metrics(), indent=2)
+
         # Register API functions with clear names and documentation using dummy components
         # This approach ensures compatibility across Gradio versions
 
@@ -1856,4 +1866,11 @@ def build_editor() -> gr.Blocks:
             fn=api_generate_document, inputs=[api_input], outputs=[api_output], api_name="generate_document"
         )
 
+        api_input.submit(fn=api_session_metrics, inputs=[], outputs=[api_output], api_name="session_metrics")
+
+    # Evict idle and over-quota sessions in the background while the app runs
+    from .session import session_manager
+
+    session_manager.start_background_cleanup()
+
     return app
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for `DocpackHandler.create_package` on large docpacks.
+
+Generates --files resource files totalling roughly --size-mb megabytes: a mix of text
+(compressible) and PDF-like binary (incompressible) content. The docpack is then built
+once with a serial `zf.write(..., ZIP_DEFLATED)` loop (how create_package used to work)
+and once with create_package, which compresses in parallel and stores compressed types.
+
+Usage:
+    uv run python benchmarks/bench_create_package.py --size-mb 300 --files 200
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import List
+
+from docpack_file import DocpackHandler
+
+WORDS = "the docpack outline resource section prompt generator recipe context step".split()
+
+
+def make_resources(directory: Path, files: int, size_mb: float, binary_ratio: float) -> List[Path]:
+    rng = random.Random(42)
+    file_size = int(size_mb * 1024 * 1024 / files)
+    resources = []
+    for index in range(files):
+        if index < files * binary_ratio:
+            path = directory / f"resource_{index}.pdf"
+            path.write_bytes(os.urandom(file_size))
+        else:
+            path = directory / f"resource_{index}.md"
+            text = " ".join(rng.choice(WORDS) for _ in range(file_size // 6 + 1))
+            path.write_text(text[:file_size])
+        resources.append(path)
+    return resources
+
+
+def build_serial(resources: List[Path], outline: dict, output_path: Path) -> float:
+    start = time.perf_counter()
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for resource in resources:
+            zf.write(resource, resource.name)
+        zf.writestr("outline.json", json.dumps(outline, indent=2))
+    return time.perf_counter() - start
+
+
+def build_with_handler(resources: List[Path], outline: dict, output_path: Path, workers: int) -> float:
+    start = time.perf_counter()
+    DocpackHandler.create_package(outline, resources, output_path, max_workers=workers or None)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark docpack creation")
+    parser.add_argument("--size-mb", type=float, default=300.0, help="Total size of the resources in megabytes")
+    parser.add_argument("--files", type=int, default=200, help="Number of resource files")
+    parser.add_argument("--binary-ratio", type=float, default=0.5, help="Fraction of incompressible (PDF) resources")
+    parser.add_argument("--workers", type=int, default=0, help="Compression threads (0 = default)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="docpack-bench-") as tmp:
+        tmp_path = Path(tmp)
+        resource_dir = tmp_path / "resources"
+        resource_dir.mkdir()
+        resources = make_resources(resource_dir, args.files, args.size_mb, args.binary_ratio)
+        outline = {
+            "title": "Benchmark",
+            "resources": [{"key": path.stem, "path": str(path.resolve())} for path in resources],
+            "sections": [],
+        }
+
+        serial_path = tmp_path / "serial.docpack"
+        handler_path = tmp_path / "handler.docpack"
+        serial_time = build_serial(resources, outline, serial_path)
+        handler_time = build_with_handler(resources, outline, handler_path, args.workers)
+
+        with zipfile.ZipFile(handler_path) as zf:
+            assert zf.testzip() is None
+
+        print(f"Resources: {args.files} files, {args.size_mb:.0f} MB ({args.binary_ratio:.0%} incompressible)")
+        print(f"serial ZIP_DEFLATED:   {serial_time:.3f} sec, {serial_path.stat().st_size / 1e6:.1f} MB")
+        print(f"create_package:        {handler_time:.3f} sec, {handler_path.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
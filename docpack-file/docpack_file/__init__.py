@@ -1,6 +1,8 @@
 """Docpack - A package format for document outlines and resources."""
 
+from .diff import DocpackDiff
 from .handler import DocpackHandler
+from .reader import DocpackReader
 
 __version__ = "0.1.0"
-__all__ = ["DocpackHandler"]
\ No newline at end of file
+__all__ = ["DocpackDiff", "DocpackHandler", "DocpackReader"]
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""Content-addressed resource storage for .docpack files.
+
+Every distinct resource content is stored once per archive. Outline resources whose files
+have the same content point to the same stored blob, and the archive manifest records the
+SHA-256 of each blob so later saves and diffs can recognize unchanged content without
+reading it.
+"""
+
+import json
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compression import copy_raw_entries, write_resources
+from .reader import MANIFEST_FORMAT, MANIFEST_NAME, OUTLINE_NAME
+
+
+@dataclass
+class BlobSource:
+    """Where the content of a blob comes from: a file on disk or an entry of another docpack."""
+
+    sha256: str
+    path: Optional[Path] = None
+    package: Optional[Path] = None
+    entry: Optional[str] = None
+
+
+class BlobStore:
+    """Assigns archive names to resource contents, storing each distinct content once."""
+
+    def __init__(self) -> None:
+        self._names_by_hash: Dict[str, str] = {}
+        self._used_names: set = set()
+        self.blobs: List[Tuple[str, BlobSource]] = []
+
+    def add(self, preferred_name: str, source: BlobSource) -> str:
+        """Add a blob and return its archive name.
+
+        Content that is already stored returns the existing name. Otherwise the preferred
+        name is used, with a counter suffix if another blob already has that name.
+        """
+        existing = self._names_by_hash.get(source.sha256)
+        if existing is not None:
+            return existing
+
+        archive_name = preferred_name
+        if archive_name in self._used_names or archive_name in (OUTLINE_NAME, MANIFEST_NAME):
+            stem, suffix = Path(preferred_name).stem, Path(preferred_name).suffix
+            counter = 1
+            archive_name = f"{stem}_{counter}{suffix}"
+            while archive_name in self._used_names:
+                counter += 1
+                archive_name = f"{stem}_{counter}{suffix}"
+
+        self._used_names.add(archive_name)
+        self._names_by_hash[source.sha256] = archive_name
+        self.blobs.append((archive_name, source))
+        return archive_name
+
+    def manifest(self) -> Dict[str, Any]:
+        return {"format": MANIFEST_FORMAT, "blobs": {name: source.sha256 for name, source in self.blobs}}
+
+
+def write_package(
+    output_path: Path,
+    outline_data: Dict[str, Any],
+    store: BlobStore,
+    max_workers: Optional[int] = None,
+) -> None:
+    """Write a docpack with the blobs of a store, its manifest and the outline.
+
+    Blobs from other docpacks are copied without recompression; blobs from files are
+    compressed in parallel. The archive is written to a temporary file and moved into
+    place, so output_path may be one of the source docpacks.
+
+    Args:
+        output_path: Where to save the .docpack file
+        outline_data: Outline whose resource paths already refer to the blob names
+        store: Blobs to include
+        max_workers: Optional number of compression threads
+    """
+    output_path = Path(output_path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{output_path.name}.", suffix=".tmp", dir=output_path.parent)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    # mkstemp creates owner-only files; keep the permissions of the file being replaced
+    mode = output_path.stat().st_mode & 0o777 if output_path.exists() else 0o644
+
+    files: List[Tuple[Path, str]] = []
+    copies: Dict[Path, List[Tuple[str, str]]] = {}
+    for archive_name, source in store.blobs:
+        if source.package is not None and source.entry is not None:
+            copies.setdefault(source.package, []).append((source.entry, archive_name))
+        elif source.path is not None:
+            files.append((source.path, archive_name))
+
+    try:
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            # Unchanged blobs from existing docpacks, then new content
+            for package_path, entries in copies.items():
+                copy_raw_entries(zf, package_path, entries)
+            write_resources(zf, files, max_workers=max_workers)
+
+            zf.writestr(MANIFEST_NAME, json.dumps(store.manifest(), indent=2))
+            # Always include outline.json
+            zf.writestr(OUTLINE_NAME, json.dumps(outline_data, indent=2))
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
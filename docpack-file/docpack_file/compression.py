@@ -0,0 +1,246 @@
+"""Parallel, streaming zip writing for .docpack files.
+
+Resources are compressed concurrently in a thread pool (zlib releases the GIL while
+compressing) into spooled temporary buffers, then streamed into the archive in order.
+Already-compressed formats are stored as-is instead of being deflated again. Entries of
+an existing archive can be copied without decompressing them, so unchanged resources cost
+nothing to re-save.
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Iterable, List, Optional, Tuple
+
+# File types whose contents are already compressed; deflating them again only costs time
+STORED_SUFFIXES = frozenset({
+    ".7z",
+    ".avif",
+    ".bz2",
+    ".docpack",
+    ".docx",
+    ".epub",
+    ".gif",
+    ".gz",
+    ".heic",
+    ".jpeg",
+    ".jpg",
+    ".m4a",
+    ".mov",
+    ".mp3",
+    ".mp4",
+    ".odp",
+    ".ods",
+    ".odt",
+    ".ogg",
+    ".pdf",
+    ".png",
+    ".pptx",
+    ".rar",
+    ".webm",
+    ".webp",
+    ".xlsx",
+    ".xz",
+    ".zip",
+    ".zst",
+})
+
+CHUNK_SIZE = 1024 * 1024
+# Compressed entries larger than this are spooled to disk instead of memory
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def compression_for(path: Path) -> int:
+    """Choose the zip compression method for a resource file.
+
+    Args:
+        path: Resource file path
+
+    Returns:
+        zipfile.ZIP_STORED for already-compressed formats, zipfile.ZIP_DEFLATED otherwise
+    """
+    return zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+
+
+@dataclass
+class _PreparedEntry:
+    """A resource whose CRC and (possibly compressed) data are ready to be written."""
+
+    zinfo: zipfile.ZipInfo
+    source: Path
+    data: Optional[BinaryIO] = None  # Compressed data; None means copy the source as stored
+
+
+def _prepare_entry(source: Path, archive_name: str, compress_level: int) -> _PreparedEntry:
+    """Compute the CRC of a resource and, if its type warrants it, deflate it (runs in a worker)."""
+    zinfo = zipfile.ZipInfo.from_file(source, archive_name)
+    compress_type = compression_for(source)
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15) if compress_type == zipfile.ZIP_DEFLATED else None
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) if compressor else None
+
+    crc = 0
+    file_size = 0
+    with open(source, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            if compressor and spool:
+                spool.write(compressor.compress(chunk))
+    if compressor and spool:
+        spool.write(compressor.flush())
+
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    if spool is not None and spool.tell() < file_size:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.compress_size = spool.tell()
+        spool.seek(0)
+        return _PreparedEntry(zinfo, source, spool)
+
+    # Incompressible (or already-compressed) data is stored unchanged
+    if spool is not None:
+        spool.close()
+    zinfo.compress_type = zipfile.ZIP_STORED
+    zinfo.compress_size = file_size
+    return _PreparedEntry(zinfo, source)
+
+
+def _write_entry(zf: zipfile.ZipFile, entry: _PreparedEntry) -> None:
+    """Append a prepared entry to an archive opened for writing, streaming its data."""
+    fp = _start_entry(zf, entry.zinfo)
+    if entry.data is not None:
+        with entry.data:
+            shutil.copyfileobj(entry.data, fp, CHUNK_SIZE)
+    else:
+        with open(entry.source, "rb") as f:
+            shutil.copyfileobj(f, fp, CHUNK_SIZE)
+    _finish_entry(zf, entry.zinfo)
+
+
+def _start_entry(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo) -> BinaryIO:
+    """Write the local header of an entry whose CRC and sizes are known; returns the archive file."""
+    fp = zf.fp
+    assert fp is not None
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    fp.seek(zf.start_dir)
+    zinfo.header_offset = fp.tell()
+    fp.write(zinfo.FileHeader(zip64))
+    return fp
+
+
+def _finish_entry(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo) -> None:
+    # Register the entry the same way ZipFile.open(..., "w") does when it closes
+    assert zf.fp is not None
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+
+
+def copy_raw_entries(zf: zipfile.ZipFile, package_path: Path, entries: Iterable[Tuple[str, str]]) -> None:
+    """Copy entries from another archive without decompressing or recompressing them.
+
+    Args:
+        zf: Archive opened in "w" mode on a seekable file
+        package_path: Archive to copy from
+        entries: (name in package_path, name in zf) pairs
+    """
+    with zipfile.ZipFile(package_path, "r") as src_zf, open(package_path, "rb") as src:
+        for src_name, archive_name in entries:
+            info = src_zf.getinfo(src_name)
+            if info.flag_bits & 0x1:
+                raise ValueError(f"Cannot copy encrypted entry: {src_name}")
+
+            # The compressed data follows the local header, whose extra field may differ from the central one
+            src.seek(info.header_offset)
+            header = src.read(zipfile.sizeFileHeader)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            src.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+
+            zinfo = zipfile.ZipInfo(archive_name, info.date_time)
+            zinfo.compress_type = info.compress_type
+            zinfo.external_attr = info.external_attr
+            zinfo.CRC = info.CRC
+            zinfo.file_size = info.file_size
+            zinfo.compress_size = info.compress_size
+
+            fp = _start_entry(zf, zinfo)
+            remaining = info.compress_size
+            while remaining:
+                chunk = src.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ValueError(f"Truncated entry in {package_path}: {src_name}")
+                fp.write(chunk)
+                remaining -= len(chunk)
+            _finish_entry(zf, zinfo)
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(paths: Iterable[Path], max_workers: Optional[int] = None) -> Dict[Path, str]:
+    """Hash files concurrently (hashlib releases the GIL for large buffers).
+
+    Args:
+        paths: Files to hash
+        max_workers: Number of threads (defaults to the CPU count, up to 8)
+
+    Returns:
+        Mapping of each path to its SHA-256 hex digest
+    """
+    unique: List[Path] = list(dict.fromkeys(paths))
+    if len(unique) <= 1:
+        return {path: hash_file(path) for path in unique}
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1)) as executor:
+        return dict(zip(unique, executor.map(hash_file, unique)))
+
+
+def write_resources(
+    zf: zipfile.ZipFile,
+    resources: Iterable[Tuple[Path, str]],
+    max_workers: Optional[int] = None,
+    compress_level: int = 6,
+) -> None:
+    """Compress resources in parallel and stream them into an archive in order.
+
+    At most two entries per worker are prepared ahead of the writer, bounding the
+    memory and temporary disk space used for compressed data.
+
+    Args:
+        zf: Archive opened in "w" mode on a seekable file
+        resources: (source path, archive name) pairs, in archive order
+        max_workers: Number of compression threads (defaults to the CPU count, up to 8)
+        compress_level: zlib compression level for deflated entries
+    """
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    pending: Deque[Future[_PreparedEntry]] = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docpack") as executor:
+        try:
+            for source, archive_name in resources:
+                pending.append(executor.submit(_prepare_entry, source, archive_name, compress_level))
+                if len(pending) >= max_workers * 2:
+                    _write_entry(zf, pending.popleft().result())
+            while pending:
+                _write_entry(zf, pending.popleft().result())
+        finally:
+            # Release spooled data of entries that will not be written after an error
+            for future in pending:
+                future.cancel()
+                if not future.cancelled() and future.exception() is None:
+                    data = future.result().data
+                    if data is not None:
+                        data.close()
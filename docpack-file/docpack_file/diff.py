@@ -0,0 +1,148 @@
+"""Diff and merge of .docpack files by resource key and content hash."""
+
+import copy
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .blobs import BlobSource, BlobStore, write_package
+from .reader import DocpackReader
+
+
+@dataclass
+class DocpackDiff:
+    """Differences between two docpacks.
+
+    Resources are matched by their outline key (or path when they have no key) and compared
+    by content hash, so renamed or re-compressed files with the same content are unchanged.
+    """
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    outline_changed: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.outline_changed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "outline_changed": self.outline_changed,
+        }
+
+
+def diff_packages(old_path: Path, new_path: Path) -> DocpackDiff:
+    """Compare two docpacks.
+
+    Args:
+        old_path: Path to the original .docpack file
+        new_path: Path to the updated .docpack file
+
+    Returns:
+        A DocpackDiff from old to new
+    """
+    with DocpackReader(old_path) as old, DocpackReader(new_path) as new:
+        old_resources = _resources_by_key(old)
+        new_resources = _resources_by_key(new)
+        old_outline, new_outline = old.outline, new.outline
+
+    result = DocpackDiff(outline_changed=_outline_shape(old_outline) != _outline_shape(new_outline))
+    for key, (_, new_hash) in new_resources.items():
+        if key not in old_resources:
+            result.added.append(key)
+        elif old_resources[key][1] != new_hash:
+            result.changed.append(key)
+        else:
+            result.unchanged.append(key)
+    result.removed = [key for key in old_resources if key not in new_resources]
+    return result
+
+
+def merge_packages(
+    base_path: Path,
+    other_path: Path,
+    output_path: Path,
+    max_workers: Optional[int] = None,
+) -> DocpackDiff:
+    """Merge another docpack into a base docpack.
+
+    Top-level outline fields of the other docpack replace those of the base. Resources are
+    merged by key: the other docpack's version wins, and resources only in the base are kept.
+    All resource data is copied from the source archives without recompression, and content
+    present in both is stored once. output_path may be base_path or other_path.
+
+    Args:
+        base_path: Path to the base .docpack file
+        other_path: Path to the .docpack file whose changes are applied
+        output_path: Where to save the merged .docpack file
+        max_workers: Optional number of compression threads
+
+    Returns:
+        The diff from base to other that was applied
+    """
+    base_path, other_path = Path(base_path), Path(other_path)
+    changes = diff_packages(base_path, other_path)
+
+    with DocpackReader(base_path) as base, DocpackReader(other_path) as other:
+        base_outline, other_outline = base.outline, other.outline
+        hashes = {base_path: base.blob_hashes(), other_path: other.blob_hashes()}
+
+    merged = copy.deepcopy(base_outline)
+    merged.update({name: copy.deepcopy(value) for name, value in other_outline.items() if name != "resources"})
+
+    # Resources in base order (replaced by the other version), then those only in other
+    merged_resources: List[Tuple[Dict[str, Any], Path]] = []
+    other_by_key = {_resource_key(r): r for r in other_outline.get("resources", []) if isinstance(r, dict)}
+    base_keys = set()
+    for resource in base_outline.get("resources", []):
+        if not isinstance(resource, dict):
+            continue
+        key = _resource_key(resource)
+        base_keys.add(key)
+        if key in other_by_key:
+            merged_resources.append((copy.deepcopy(other_by_key[key]), other_path))
+        else:
+            merged_resources.append((copy.deepcopy(resource), base_path))
+    for key, resource in other_by_key.items():
+        if key not in base_keys:
+            merged_resources.append((copy.deepcopy(resource), other_path))
+
+    store = BlobStore()
+    for resource, package_path in merged_resources:
+        entry = resource.get("path")
+        sha = hashes[package_path].get(entry) if entry else None
+        if sha is not None:
+            resource["path"] = store.add(Path(entry).name, BlobSource(sha, package=package_path, entry=entry))
+    merged["resources"] = [resource for resource, _ in merged_resources]
+
+    write_package(Path(output_path), merged, store, max_workers=max_workers)
+    return changes
+
+
+def _resource_key(resource: Dict[str, Any]) -> str:
+    return str(resource.get("key") or resource.get("path") or "")
+
+
+def _resources_by_key(reader: DocpackReader) -> Dict[str, Tuple[Dict[str, Any], Optional[str]]]:
+    hashes = reader.blob_hashes()
+    resources: Dict[str, Tuple[Dict[str, Any], Optional[str]]] = {}
+    for resource in reader.outline.get("resources", []):
+        if isinstance(resource, dict):
+            resources[_resource_key(resource)] = (resource, hashes.get(resource.get("path", "")))
+    return resources
+
+
+def _outline_shape(outline: Dict[str, Any]) -> Dict[str, Any]:
+    """The outline without archive resource names, which differ between otherwise equal docpacks."""
+    shape = {name: value for name, value in outline.items() if name != "resources"}
+    shape["resources"] = [
+        {name: value for name, value in resource.items() if name != "path"} if isinstance(resource, dict) else resource
+        for resource in outline.get("resources", [])
+    ]
+    return shape
@@ -9,6 +9,11 @@ import zipfile
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional
 
+from .blobs import BlobSource, BlobStore, write_package
+from .compression import hash_files
+from .diff import DocpackDiff, diff_packages, merge_packages
+from .reader import MANIFEST_NAME, OUTLINE_NAME, DocpackReader, read_manifest
+
 
 class DocpackHandler:
     """Handles .docpack file creation and extraction with filename conflict resolution."""
@@ -19,67 +24,71 @@ class DocpackHandler:
         resource_files: List[Path],
         output_path: Path,
         resource_key_map: Optional[Dict[str, str]] = None,
+        max_workers: Optional[int] = None,
+        base_package: Optional[Path] = None,
     ) -> None:
         """Create a .docpack file from outline data and resource files.
 
-        This version handles filename conflicts by using resource keys as prefixes.
+        Each distinct file content is stored once: resources whose files have identical
+        content share one archive entry, and only files with the same name but different
+        content get a counter suffix. Resources are compressed in parallel and streamed to
+        the output file; types that are already compressed (PDF, DOCX, images, ...) are
+        stored as-is.
 
         Args:
             outline_data: The outline JSON data
             resource_files: List of resource file paths to include
             output_path: Where to save the .docpack file
             resource_key_map: Optional mapping of file paths to resource keys
+            max_workers: Optional number of compression threads
+            base_package: Optional previous version of the docpack (may be output_path);
+                resources whose content it already stores are copied from it without
+                recompression
         """
-        # Track used archive names to ensure uniqueness
-        used_names = set()
+        existing_files = [resource_file for resource_file in resource_files if resource_file.exists()]
+        hashes = hash_files(existing_files, max_workers=max_workers)
+
+        # Content already stored in the previous version can be copied as-is
+        base_blobs: Dict[str, str] = {}
+        if base_package is not None and Path(base_package).exists():
+            with DocpackReader(base_package) as reader:
+                base_blobs = {sha: name for name, sha in reader.blob_hashes().items()}
+
+        store = BlobStore()
         path_to_archive_name = {}
+        for resource_file in existing_files:
+            sha = hashes[resource_file]
+            if sha in base_blobs:
+                source = BlobSource(sha, package=Path(base_package), entry=base_blobs[sha])  # type: ignore[arg-type]
+            else:
+                source = BlobSource(sha, path=resource_file)
+
+            # Keep original filename; identical content reuses the blob already stored
+            archive_name = store.add(resource_file.name, source)
+            path_to_archive_name[str(resource_file)] = archive_name
+            path_to_archive_name[str(resource_file.resolve())] = archive_name
+
+        # Update outline data with new archive names
+        updated_outline = outline_data.copy()
+        if "resources" in updated_outline:
+            for resource in updated_outline["resources"]:
+                if "path" in resource and resource["path"]:
+                    original_path = str(Path(resource["path"]).resolve())
+                    if original_path in path_to_archive_name:
+                        # Update to archive name (without directory)
+                        resource["path"] = path_to_archive_name[original_path]
+                    else:
+                        # Fallback: just use filename if not found in map
+                        resource["path"] = Path(resource["path"]).name
 
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            # Process resources to handle potential filename conflicts
-            for i, resource_file in enumerate(resource_files):
-                if not resource_file.exists():
-                    continue
-
-                original_path_str = str(resource_file)
-
-                # Keep original filename, handle conflicts with counter suffix only if needed
-                archive_name = resource_file.name
-
-                # Only add suffix if there's a conflict
-                if archive_name in used_names:
-                    base_stem = resource_file.stem
-                    suffix = resource_file.suffix
-                    counter = 1
-                    while archive_name in used_names:
-                        archive_name = f"{base_stem}_{counter}{suffix}"
-                        counter += 1
-
-                used_names.add(archive_name)
-                path_to_archive_name[original_path_str] = archive_name
-
-                # Add file to archive
-                zf.write(resource_file, archive_name)
-
-            # Update outline data with new archive names
-            updated_outline = outline_data.copy()
-            if "resources" in updated_outline:
-                for resource in updated_outline["resources"]:
-                    if "path" in resource and resource["path"]:
-                        original_path = str(Path(resource["path"]).resolve())
-                        if original_path in path_to_archive_name:
-                            # Update to archive name (without directory)
-                            resource["path"] = path_to_archive_name[original_path]
-                        else:
-                            # Fallback: just use filename if not found in map
-                            resource["path"] = Path(resource["path"]).name
-
-            # Always include outline.json
-            zf.writestr("outline.json", json.dumps(updated_outline, indent=2))
+        write_package(output_path, updated_outline, store, max_workers=max_workers)
 
     @staticmethod
     def extract_package(package_path: Path, extract_dir: Path) -> Tuple[Dict[str, Any], List[Path]]:
         """Extract a .docpack file to a directory with organized structure.
 
+        Files already extracted from the same archive (by content hash) are not written again.
+
         Args:
             package_path: Path to the .docpack file
             extract_dir: Session directory to extract to
@@ -93,24 +102,17 @@ class DocpackHandler:
         files_dir = extract_dir / "files"
         files_dir.mkdir(exist_ok=True)
 
-        with zipfile.ZipFile(package_path, "r") as zf:
-            # Extract outline.json to extract_dir
-            if "outline.json" in zf.namelist():
-                zf.extract("outline.json", extract_dir)
-
-            # First pass: extract files
-            for file_info in zf.filelist:
-                if file_info.filename != "outline.json":
-                    # Extract to files directory with original archive name
-                    zf.extract(file_info, files_dir)
+        with DocpackReader(package_path) as reader:
+            # Raises ValueError if the package has no outline.json
+            outline_data = reader.outline
 
-        # Read outline.json
-        outline_path = extract_dir / "outline.json"
-        if not outline_path.exists():
-            raise ValueError("Package does not contain outline.json")
+            # Write outline.json to extract_dir
+            with open(extract_dir / OUTLINE_NAME, "w") as f:
+                json.dump(outline_data, f, indent=2)
 
-        with open(outline_path, "r") as f:
-            outline_data = json.load(f)
+            # Extract files to files directory with original archive name; the extraction
+            # marker is kept beside files_dir so the directory only holds resources
+            reader.extract_all(files_dir)
 
         # Update resource paths to point to extracted files
         resource_files = []
@@ -121,10 +123,67 @@ class DocpackHandler:
                     extracted_path = files_dir / resource["path"]
                     if extracted_path.exists():
                         resource["path"] = str(extracted_path)
-                        resource_files.append(extracted_path)
+                        # Resources with identical content share one extracted file
+                        if extracted_path not in resource_files:
+                            resource_files.append(extracted_path)
 
         return outline_data, resource_files
 
+    @staticmethod
+    def open_package(package_path: Path) -> DocpackReader:
+        """Open a .docpack file for lazy, random-access reading without extracting it.
+
+        Args:
+            package_path: Path to the .docpack file
+
+        Returns:
+            A DocpackReader (use it as a context manager to close the archive)
+        """
+        return DocpackReader(package_path)
+
+    @staticmethod
+    def read_outline(package_path: Path) -> Dict[str, Any]:
+        """Read the outline data of a .docpack file without extracting any resources.
+
+        Args:
+            package_path: Path to the .docpack file
+
+        Returns:
+            The outline data, with resource paths as stored in the archive
+        """
+        with DocpackReader(package_path) as reader:
+            return reader.outline
+
+    @staticmethod
+    def diff_packages(old_path: Path, new_path: Path) -> DocpackDiff:
+        """Compare two docpacks by resource key and content hash.
+
+        Args:
+            old_path: Path to the original .docpack file
+            new_path: Path to the updated .docpack file
+
+        Returns:
+            A DocpackDiff listing added, removed, changed and unchanged resource keys
+        """
+        return diff_packages(old_path, new_path)
+
+    @staticmethod
+    def merge_packages(
+        base_path: Path, other_path: Path, output_path: Path, max_workers: Optional[int] = None
+    ) -> DocpackDiff:
+        """Merge another docpack into a base docpack, reusing stored blobs without recompression.
+
+        Args:
+            base_path: Path to the base .docpack file
+            other_path: Path to the .docpack file whose changes are applied
+            output_path: Where to save the merged .docpack file (may be base_path)
+            max_workers: Optional number of compression threads
+
+        Returns:
+            The diff from base to other that was applied
+        """
+        return merge_packages(base_path, other_path, output_path, max_workers=max_workers)
+
     @staticmethod
     def validate_package(package_path: Path) -> bool:
         """Validate that a file is a valid .docpack.
@@ -156,9 +215,12 @@ class DocpackHandler:
 
         try:
             with zipfile.ZipFile(package_path, "r") as zf:
+                has_manifest = read_manifest(zf) is not None
                 for filename in zf.namelist():
                     if filename == "outline.json":
                         contents["outline"].append(filename)
+                    elif filename == MANIFEST_NAME and has_manifest:
+                        continue
                     else:
                         contents["resources"].append(filename)
             return contents
@@ -102,6 +102,46 @@ def cmd_list(args):
         return 1
 
 
+def cmd_diff(args):
+    """Compare two docpacks by resource key and content hash."""
+    old_path = Path(args.old)
+    new_path = Path(args.new)
+
+    for package_path in (old_path, new_path):
+        if not package_path.exists():
+            print(f"Error: Package file not found: {package_path}", file=sys.stderr)
+            return 1
+
+    try:
+        diff = DocpackHandler.diff_packages(old_path, new_path)
+        print(json.dumps(diff.to_dict(), indent=2))
+        return 0
+    except Exception as e:
+        print(f"Error comparing docpacks: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_merge(args):
+    """Merge a docpack into a base docpack."""
+    base_path = Path(args.base)
+    other_path = Path(args.other)
+    output_path = Path(args.output)
+
+    for package_path in (base_path, other_path):
+        if not package_path.exists():
+            print(f"Error: Package file not found: {package_path}", file=sys.stderr)
+            return 1
+
+    try:
+        diff = DocpackHandler.merge_packages(base_path, other_path, output_path)
+        print(f"Merged docpack: {output_path}")
+        print(f"Added: {len(diff.added)}, changed: {len(diff.changed)}, unchanged: {len(diff.unchanged)}")
+        return 0
+    except Exception as e:
+        print(f"Error merging docpacks: {e}", file=sys.stderr)
+        return 1
+
+
 def main():
     """Main entry point for the docpack CLI."""
     parser = argparse.ArgumentParser(description="Docpack file management tool")
@@ -125,6 +165,17 @@ def main():
     list_parser = subparsers.add_parser("list", help="List docpack contents")
     list_parser.add_argument("package", help="Path to .docpack file")
     
+    # Diff command
+    diff_parser = subparsers.add_parser("diff", help="Compare two docpacks")
+    diff_parser.add_argument("old", help="Path to the original .docpack file")
+    diff_parser.add_argument("new", help="Path to the updated .docpack file")
+
+    # Merge command
+    merge_parser = subparsers.add_parser("merge", help="Merge a docpack into a base docpack")
+    merge_parser.add_argument("base", help="Path to the base .docpack file")
+    merge_parser.add_argument("other", help="Path to the .docpack file whose changes are applied")
+    merge_parser.add_argument("--output", "-p", required=True, help="Output docpack file path")
+
     args = parser.parse_args()
     
     if not args.command:
@@ -137,6 +188,8 @@ def main():
         "extract": cmd_extract,
         "validate": cmd_validate,
         "list": cmd_list,
+        "diff": cmd_diff,
+        "merge": cmd_merge,
     }
     
     return commands[args.command](args)
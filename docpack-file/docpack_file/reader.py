@@ -0,0 +1,268 @@
+"""Lazy, random-access reading of .docpack files.
+
+The outline is parsed straight from the archive and resources are exposed as streams or
+bytes, so opening a docpack does not extract anything. Resources that must exist on disk
+can be extracted one at a time; extracted files are tracked per archive content hash so
+extracting the same docpack again only writes what is missing.
+"""
+
+import hashlib
+import json
+import shutil
+import threading
+import zipfile
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+OUTLINE_NAME = "outline.json"
+# Content hashes of the stored resource blobs, written by create_package. Namespaced so it
+# cannot clash with a resource, and only reserved when it is a valid manifest.
+MANIFEST_NAME = ".docpack/manifest.json"
+MANIFEST_FORMAT = 1
+# Marker file recording which archive (by content hash) a directory was extracted from
+EXTRACTION_MARKER = ".docpack-extraction.json"
+
+
+class DocpackReader:
+    """Random-access reader for a .docpack archive.
+
+    Usage:
+        with DocpackReader(Path("document.docpack")) as reader:
+            outline = reader.outline
+            with reader.open_resource("notes.md") as f:
+                text = f.read().decode("utf-8")
+    """
+
+    def __init__(self, package_path: Path):
+        self.package_path = Path(package_path)
+        self._zf: Optional[zipfile.ZipFile] = None
+        self._outline: Optional[Dict[str, Any]] = None
+        self._archive_hash: Optional[str] = None
+        self._blob_hashes: Optional[Dict[str, str]] = None
+        self._manifest: Optional[Dict[str, str]] = None
+        self._reserved: Optional[frozenset] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DocpackReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _zip(self) -> zipfile.ZipFile:
+        if self._zf is None:
+            self._zf = zipfile.ZipFile(self.package_path, "r")
+        return self._zf
+
+    def close(self) -> None:
+        """Close the underlying archive."""
+        if self._zf is not None:
+            self._zf.close()
+            self._zf = None
+
+    @property
+    def outline(self) -> Dict[str, Any]:
+        """The outline data, parsed from outline.json inside the archive."""
+        if self._outline is None:
+            zf = self._zip()
+            if OUTLINE_NAME not in zf.NameToInfo:
+                raise ValueError("Package does not contain outline.json")
+            with self._lock:
+                self._outline = json.loads(zf.read(OUTLINE_NAME).decode("utf-8"))
+        return self._outline
+
+    @property
+    def archive_hash(self) -> str:
+        """Content hash of the archive, derived from its directory (names, CRCs and sizes).
+
+        Computing it reads only the zip central directory, not the resource data.
+        """
+        if self._archive_hash is None:
+            digest = hashlib.sha256()
+            for info in sorted(self._zip().infolist(), key=lambda i: i.filename):
+                digest.update(f"{info.filename}\0{info.CRC:08x}\0{info.file_size}\n".encode("utf-8"))
+            self._archive_hash = digest.hexdigest()
+        return self._archive_hash
+
+    def _reserved_names(self) -> frozenset:
+        """Entries that are docpack metadata rather than resources."""
+        if self._reserved is None:
+            zf = self._zip()
+            with self._lock:
+                self._manifest = read_manifest(zf)
+            self._reserved = frozenset({OUTLINE_NAME, MANIFEST_NAME} if self._manifest is not None else {OUTLINE_NAME})
+        return self._reserved
+
+    def resource_names(self) -> List[str]:
+        """Names of all resource entries in the archive."""
+        reserved = self._reserved_names()
+        return [name for name in self._zip().namelist() if name not in reserved and not name.endswith("/")]
+
+    def has_resource(self, name: str) -> bool:
+        return name not in self._reserved_names() and name in self._zip().NameToInfo
+
+    def blob_hashes(self) -> Dict[str, str]:
+        """SHA-256 digests of the stored resources, keyed by resource name.
+
+        Digests come from the archive manifest; resources it does not cover (e.g. in docpacks
+        created before manifests existed) are hashed by streaming their contents.
+        """
+        if self._blob_hashes is None:
+            self._reserved_names()
+            recorded = self._manifest or {}
+
+            hashes: Dict[str, str] = {}
+            for name in self.resource_names():
+                digest = recorded.get(name)
+                if digest is None:
+                    sha = hashlib.sha256()
+                    with self.open_resource(name) as f:
+                        while chunk := f.read(1024 * 1024):
+                            sha.update(chunk)
+                    digest = sha.hexdigest()
+                hashes[name] = digest
+            self._blob_hashes = hashes
+        return dict(self._blob_hashes)
+
+    def resource_size(self, name: str) -> int:
+        """Uncompressed size of a resource in bytes."""
+        return self._info(name).file_size
+
+    def open_resource(self, name: str) -> IO[bytes]:
+        """Open a resource as a readable binary stream, decompressing on demand."""
+        return self._zip().open(self._info(name), "r")
+
+    def read_resource(self, name: str) -> bytes:
+        """Read a resource fully into memory."""
+        with self.open_resource(name) as f:
+            return f.read()
+
+    def read_text(self, name: str, encoding: str = "utf-8") -> str:
+        return self.read_resource(name).decode(encoding)
+
+    def extract_resource(self, name: str, target_dir: Path, marker_path: Optional[Path] = None) -> Path:
+        """Extract a single resource into target_dir unless it is already there.
+
+        Args:
+            name: Resource name within the archive
+            target_dir: Directory to extract into
+            marker_path: Where to record what was extracted (see extract_resources)
+
+        Returns:
+            Path to the extracted file
+        """
+        return self.extract_resources([name], target_dir, marker_path)[0]
+
+    def extract_resources(self, names: List[str], target_dir: Path, marker_path: Optional[Path] = None) -> List[Path]:
+        """Extract resources into target_dir, skipping files already extracted from this archive.
+
+        Args:
+            names: Resource names within the archive
+            target_dir: Directory to extract into
+            marker_path: Where to record what was extracted; defaults to a hidden file next to
+                target_dir, so target_dir itself only ever contains resources
+
+        Returns:
+            Paths to the extracted files, in the order of names
+        """
+        target_dir = Path(target_dir)
+        marker_path = Path(marker_path) if marker_path is not None else default_marker_path(target_dir)
+        targets = [(self._info(name), _safe_target(target_dir, name)) for name in names]
+
+        with self._lock:
+            extracted = _read_marker(marker_path, self.archive_hash)
+            changed = False
+            for info, target in targets:
+                recorded = extracted.get(info.filename)
+                if recorded is not None and recorded == _file_signature(target, info.file_size):
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_name(f".{target.name}.partial")
+                with self._zip().open(info, "r") as src, open(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                tmp.replace(target)
+                extracted[info.filename] = _file_signature(target, info.file_size)
+                changed = True
+            if changed:
+                _write_marker(marker_path, self.archive_hash, extracted)
+
+        return [target for _, target in targets]
+
+    def extract_all(self, target_dir: Path, marker_path: Optional[Path] = None) -> List[Path]:
+        """Extract every resource into target_dir, skipping files extracted earlier."""
+        return self.extract_resources(self.resource_names(), target_dir, marker_path)
+
+    def _info(self, name: str) -> zipfile.ZipInfo:
+        info = self._zip().NameToInfo.get(name)
+        if info is None or name in self._reserved_names():
+            raise KeyError(f"Resource not found in docpack: {name}")
+        return info
+
+
+def read_manifest(zf: zipfile.ZipFile) -> Optional[Dict[str, str]]:
+    """Blob digests from the manifest of an open docpack, or None if it has no valid manifest.
+
+    An entry at MANIFEST_NAME that is not a manifest of a known format mapping names to
+    SHA-256 hex digests is left alone as an ordinary resource.
+    """
+    if MANIFEST_NAME not in zf.NameToInfo:
+        return None
+    try:
+        manifest = json.loads(zf.read(MANIFEST_NAME).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        return None
+    blobs = manifest.get("blobs")
+    if not isinstance(blobs, dict) or not all(
+        isinstance(name, str) and isinstance(digest, str) and _is_sha256(digest) for name, digest in blobs.items()
+    ):
+        return None
+    return dict(blobs)
+
+
+def default_marker_path(target_dir: Path) -> Path:
+    """Extraction marker of target_dir: a hidden file beside it, named after it."""
+    target_dir = Path(target_dir).resolve()
+    return target_dir.parent / f".{target_dir.name}{EXTRACTION_MARKER}"
+
+
+def _is_sha256(digest: str) -> bool:
+    return len(digest) == 64 and all(c in "0123456789abcdef" for c in digest)
+
+
+def _safe_target(target_dir: Path, name: str) -> Path:
+    """Resolve the extraction path of an entry, refusing names that escape target_dir."""
+    root = target_dir.resolve()
+    target = (root / name).resolve()
+    if root not in target.parents:
+        raise ValueError(f"Unsafe resource name in docpack: {name}")
+    return target
+
+
+def _file_signature(path: Path, expected_size: int) -> Optional[List[int]]:
+    """[size, mtime_ns] of an extracted file, or None if it is missing or has the wrong size."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    if stat.st_size != expected_size:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_marker(marker_path: Path, archive_hash: str) -> Dict[str, List[int]]:
+    try:
+        marker = json.loads(marker_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(marker, dict) or marker.get("archive_hash") != archive_hash:
+        return {}  # Extracted from a different archive; nothing can be reused
+    files = marker.get("files")
+    return dict(files) if isinstance(files, dict) else {}
+
+
+def _write_marker(marker_path: Path, archive_hash: str, files: Dict[str, List[int]]) -> None:
+    marker = {"archive_hash": archive_hash, "files": files}
+    marker_path.parent.mkdir(parents=True, exist_ok=True)
+    marker_path.write_text(json.dumps(marker, indent=2))
@@ -0,0 +1,110 @@
+"""Memory-bounded content cache for the documentation server."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class CacheEntry:
+    """Cached document content with the validators needed to revalidate it."""
+
+    content: str
+    size: int
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class ContentCache:
+    """
+    LRU cache of document contents bounded by total size in bytes.
+
+    Entries older than the TTL are not returned by get() but are kept until evicted, so
+    URLs can be revalidated with their ETag/Last-Modified instead of being re-downloaded.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.not_modified = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[str]:
+        """Return fresh content for key, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry is None or entry.age() >= self.ttl:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.content
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key regardless of age, without updating metrics or recency."""
+        return self._entries.get(key)
+
+    def put(self, key: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store content, evicting least recently used entries to stay within max_bytes."""
+        self.pop(key)
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return  # Never cache something that would evict the whole cache
+        self._entries[key] = CacheEntry(content, size, time.monotonic(), etag, last_modified)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def record_revalidation(self) -> None:
+        """Count a conditional request made to revalidate a stale entry."""
+        self.revalidations += 1
+
+    def mark_revalidated(self, key: str) -> Optional[str]:
+        """Reset the age of an entry after the origin confirmed it is unchanged (HTTP 304)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.stored_at = time.monotonic()
+        self._entries.move_to_end(key)
+        self.not_modified += 1
+        return entry.content
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+        }
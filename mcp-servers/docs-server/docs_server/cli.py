@@ -101,6 +101,12 @@ Examples:
         help="Disable caching of documentation content",
     )
 
+    parser.add_argument(
+        "--index-path",
+        type=Path,
+        help="File to persist the search index to between runs",
+    )
+
     parser.add_argument(
         "--config",
         type=Path,
@@ -132,6 +138,9 @@ Examples:
         if args.no_cache:
             settings.enable_cache = False
 
+        if args.index_path:
+            settings.search_index_path = args.index_path
+
         settings.host = args.host
         settings.port = args.port
 
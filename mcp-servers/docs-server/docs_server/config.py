@@ -1,7 +1,7 @@
 """Configuration for the documentation server."""
 
 from pathlib import Path
-from typing import List, Union, Sequence
+from typing import List, Optional, Union, Sequence
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -77,3 +77,30 @@ class DocsServerSettings(BaseSettings):
         default=300,  # 5 minutes
         description="Cache time-to-live in seconds",
     )
+
+    cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,  # 64MB
+        description="Maximum total size of cached documentation content in bytes (least recently used entries are evicted)",
+    )
+
+    url_fetch_concurrency: int = Field(
+        default=4,
+        description="Maximum number of URLs fetched at the same time",
+    )
+
+    # Index settings
+    index_refresh_interval: int = Field(
+        default=60,
+        description="Seconds between checks for changed documentation files",
+    )
+
+    watch_files: bool = Field(
+        default=True,
+        description="Use file system events (requires watchdog) to detect changes instead of polling",
+    )
+
+    # Search settings
+    search_index_path: Optional[Path] = Field(
+        default=None,
+        description="File to persist the full-text search index to between runs (in-memory only if unset)",
+    )
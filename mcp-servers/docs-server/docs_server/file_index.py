@@ -0,0 +1,218 @@
+"""Incremental directory index for the documentation server."""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEvent, FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; fall back to directory mtime polling
+    Observer = None  # type: ignore[assignment,misc]
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    FileSystemEvent = object  # type: ignore[assignment,misc]
+
+# (mtime_ns, size) of an indexed file, used to detect content changes
+FileSignature = Tuple[int, int]
+
+
+@dataclass
+class _DirEntry:
+    """Cached listing of a single directory."""
+
+    mtime_ns: int
+    files: Dict[Path, FileSignature] = field(default_factory=dict)
+    subdirs: List[Path] = field(default_factory=list)
+
+
+class _DirtyTracker(FileSystemEventHandler):  # type: ignore[misc,valid-type]
+    """Collects directories touched by file system events."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._dirty: Set[Path] = set()
+
+    def on_any_event(self, event: "FileSystemEvent") -> None:  # type: ignore[override]
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        with self._lock:
+            for raw in paths:
+                if not raw:
+                    continue
+                path = Path(os.fsdecode(raw))
+                self._dirty.add(path.parent)
+                if event.is_directory:
+                    self._dirty.add(path)
+
+    def has_changes(self) -> bool:
+        with self._lock:
+            return bool(self._dirty)
+
+    def drain(self) -> Set[Path]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+
+class DirectoryIndex:
+    """
+    Incrementally maintained listing of documentation files under a set of roots.
+
+    Each directory's listing is cached together with its mtime. A rescan re-lists only
+    directories whose mtime changed, so unchanged subtrees cost one stat per directory.
+    When watchdog is installed and watching is enabled, file system events mark the
+    changed directories instead, and clean subtrees are reused without any stat calls.
+
+    All methods are synchronous and perform blocking I/O; call scan() from a worker thread.
+    """
+
+    def __init__(self, should_include: Callable[[Path], bool], max_file_size: int, watch: bool = True):
+        self._should_include = should_include
+        self._max_file_size = max_file_size
+        self._dirs: Dict[Path, _DirEntry] = {}
+        self._roots: Tuple[Path, ...] = ()
+        self._watch = watch and Observer is not None
+        self._observer: Optional["Observer"] = None  # type: ignore[valid-type]
+        self._tracker: Optional[_DirtyTracker] = None
+        self._watch_failed = False
+
+    @property
+    def watching(self) -> bool:
+        """True if file system events are being used to detect changes."""
+        return self._observer is not None
+
+    def has_changes(self) -> bool:
+        """True if the watcher has seen changes since the last scan (always False without a watcher)."""
+        return self._tracker is not None and self._tracker.has_changes()
+
+    def scan(self, roots: Iterable[Path]) -> Dict[Path, FileSignature]:
+        """
+        Return all included files under the roots with their signatures, re-listing only
+        directories that changed since the previous scan.
+        """
+        roots = tuple(roots)
+        if roots != self._roots:
+            self.stop()
+            self._roots = roots
+            self._dirs = {path: entry for path, entry in self._dirs.items() if any(_is_under(path, r) for r in roots)}
+
+        dirty: Optional[Set[Path]] = None
+        if self._watch and not self._watch_failed:
+            if self._observer is None:
+                self._start_watching()
+            elif self._tracker is not None:
+                dirty = self._tracker.drain()
+
+        result: Dict[Path, FileSignature] = {}
+        seen: Set[Path] = set()
+        for root in roots:
+            self._scan_dir(root, dirty, result, seen)
+
+        # Forget directories that no longer exist under any root
+        for path in list(self._dirs):
+            if path not in seen:
+                del self._dirs[path]
+        return result
+
+    def _scan_dir(
+        self,
+        path: Path,
+        dirty: Optional[Set[Path]],
+        result: Dict[Path, FileSignature],
+        seen: Set[Path],
+    ) -> None:
+        if path in seen:
+            return
+        seen.add(path)
+        entry = self._dirs.get(path)
+
+        if entry is not None and dirty is not None and path not in dirty:
+            # Watcher reported no changes here; reuse the cached listing without touching disk
+            result.update(entry.files)
+        else:
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                self._dirs.pop(path, None)
+                return
+            if entry is None or entry.mtime_ns != mtime_ns:
+                entry = self._list_dir(path, mtime_ns)
+                if entry is None:
+                    return
+                self._dirs[path] = entry
+            else:
+                # Listing unchanged; refresh signatures so content edits are still noticed
+                self._refresh_signatures(entry)
+            result.update(entry.files)
+
+        for subdir in entry.subdirs:
+            self._scan_dir(subdir, dirty, result, seen)
+
+    def _list_dir(self, path: Path, mtime_ns: int) -> Optional[_DirEntry]:
+        entry = _DirEntry(mtime_ns=mtime_ns)
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        if item.is_dir():
+                            if not item.name.startswith("."):
+                                entry.subdirs.append(Path(item.path))
+                        elif item.is_file():
+                            file_path = Path(item.path)
+                            if self._should_include(file_path):
+                                stat = item.stat()
+                                if stat.st_size <= self._max_file_size:
+                                    entry.files[file_path] = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        continue
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            return None  # Skip directories we can't access
+        entry.subdirs.sort()
+        return entry
+
+    def _refresh_signatures(self, entry: _DirEntry) -> None:
+        for file_path in list(entry.files):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                del entry.files[file_path]
+                continue
+            if stat.st_size <= self._max_file_size:
+                entry.files[file_path] = (stat.st_mtime_ns, stat.st_size)
+            else:
+                del entry.files[file_path]
+
+    def _start_watching(self) -> None:
+        try:
+            tracker = _DirtyTracker()
+            observer = Observer()  # type: ignore[misc]
+            for root in self._roots:
+                observer.schedule(tracker, str(root), recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            # inotify limits or unsupported file systems; keep polling directory mtimes
+            print(f"Warning: File watching unavailable, using polling: {type(e).__name__}: {e}")
+            self._watch_failed = True
+            return
+        self._tracker = tracker
+        self._observer = observer
+
+    def stop(self) -> None:
+        """Stop the file watcher, if running."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+            self._tracker = None
+
+    def clear(self) -> None:
+        """Forget all cached listings and stop watching."""
+        self.stop()
+        self._dirs.clear()
+        self._roots = ()
+
+
+def _is_under(path: Path, root: Path) -> bool:
+    return path == root or root in path.parents
@@ -1,14 +1,20 @@
 """Document loader for the documentation server."""
 
+import asyncio
 import fnmatch
+import hashlib
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Set, Union
 
 import aiofiles
 import httpx
 
+from .cache import ContentCache
 from .config import DocsServerSettings
+from .file_index import DirectoryIndex, FileSignature
+from .search import SearchIndex, extract_snippets
 
 
 class DocumentLoader:
@@ -16,9 +22,18 @@ class DocumentLoader:
 
     def __init__(self, settings: DocsServerSettings):
         self.settings = settings
-        self._cache: Dict[str, tuple[str, datetime]] = {}
+        self._cache = ContentCache(max_bytes=settings.cache_max_bytes, ttl=settings.cache_ttl)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._url_semaphore = asyncio.Semaphore(max(1, settings.url_fetch_concurrency))
+        # Serializes index refreshes: DirectoryIndex.scan and its watcher are not safe to run twice at once
+        self._refresh_lock = asyncio.Lock()
         self._file_index: Optional[List[Union[Path, str]]] = None
         self._index_time: Optional[datetime] = None
+        self._search_index: Optional[SearchIndex] = None
+        self._indexed_urls: Set[str] = set()
+        self._display_paths: Dict[Union[Path, str], str] = {}
+        self._path_lookup: Dict[str, Union[Path, str]] = {}
+        self._directory_index = DirectoryIndex(self._should_include, settings.max_file_size, watch=settings.watch_files)
 
     def _should_include(self, path: Path) -> bool:
         """Check if a file should be included based on patterns."""
@@ -42,71 +57,150 @@ class DocumentLoader:
 
         return False
 
-    async def _scan_directory(self, path: Path) -> List[Path]:
-        """Recursively scan a directory for documentation files."""
-        files = []
-
-        try:
-            for item in path.iterdir():
-                if item.is_dir() and not item.name.startswith("."):
-                    files.extend(await self._scan_directory(item))
-                elif item.is_file() and self._should_include(item):
-                    if item.stat().st_size <= self.settings.max_file_size:
-                        files.append(item)
-        except PermissionError:
-            pass  # Skip directories we can't access
-
-        return files
+    def _needs_refresh(self) -> bool:
+        if self._file_index is None or self._index_time is None:
+            return True
+        if self._directory_index.has_changes():
+            return True
+        return datetime.now() - self._index_time > timedelta(seconds=self.settings.index_refresh_interval)
+
+    def _scan_local_paths(self, paths: List[Path]) -> Dict[Path, FileSignature]:
+        """Blocking scan of the configured local paths; runs in a worker thread."""
+        signatures: Dict[Path, FileSignature] = {}
+        roots = []
+        for path in paths:
+            path = path.resolve()
+            if path.is_file():
+                if self._should_include(path):
+                    stat = path.stat()
+                    signatures[path] = (stat.st_mtime_ns, stat.st_size)
+            elif path.is_dir():
+                roots.append(path)
+        signatures.update(self._directory_index.scan(roots))
+        return signatures
 
     async def get_file_index(self) -> List[Union[Path, str]]:
         """Get an index of all available documentation files and URLs."""
         # Check if we need to refresh the index
-        if (
-            self._file_index is None
-            or self._index_time is None
-            or datetime.now() - self._index_time > timedelta(seconds=60)
-        ):
-            files = []
-
-            for doc_path in self.settings.doc_paths:
-                # Handle URLs (which are kept as strings)
-                if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
-                    path_str = doc_path
-                    # Check if URL matches include patterns (based on filename)
-                    url_filename = path_str.split("/")[-1]
-                    include = False
-                    for pattern in self.settings.include_patterns:
-                        if fnmatch.fnmatch(url_filename, pattern):
-                            include = True
-                            break
-
-                    if include:
-                        # Pre-fetch URL content to ensure it's available
-                        print(f"Fetching URL: {path_str}")
-                        content = await self._load_url(path_str)
-                        if content:
-                            # Add URL to index as a string
-                            files.append(path_str)
-                            print(f"Successfully indexed URL: {path_str}")
-                        else:
-                            # Log failed URL fetch
-                            print(f"Warning: Failed to fetch URL: {path_str}")
+        if self._needs_refresh():
+            async with self._refresh_lock:
+                # A concurrent call may have refreshed the index while this one waited
+                if self._needs_refresh():
+                    await self._refresh_file_index()
+
+        return self._file_index or []
+
+    async def _refresh_file_index(self) -> None:
+        """Rebuild the file index, path maps and search index; callers hold _refresh_lock."""
+        files: List[Union[Path, str]] = []
+        local_paths: List[Path] = []
+
+        pending_urls: List[str] = []
+
+        for doc_path in self.settings.doc_paths:
+            # Handle URLs (which are kept as strings)
+            if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
+                path_str = doc_path
+                # URLs that were fetched successfully stay indexed until the cache is cleared
+                if path_str in self._indexed_urls:
+                    files.append(path_str)
+                    continue
+
+                # Check if URL matches include patterns (based on filename)
+                url_filename = path_str.split("/")[-1]
+                include = False
+                for pattern in self.settings.include_patterns:
+                    if fnmatch.fnmatch(url_filename, pattern):
+                        include = True
+                        break
+
+                if include:
+                    pending_urls.append(path_str)
+            else:
+                # Handle Path objects
+                local_paths.append(doc_path if isinstance(doc_path, Path) else Path(doc_path))
+
+        # Pre-fetch new URLs concurrently (bounded by url_fetch_concurrency)
+        if pending_urls:
+            print(f"Fetching {len(pending_urls)} URL(s)")
+            contents = await asyncio.gather(*(self._load_url(url) for url in pending_urls))
+            for path_str, content in zip(pending_urls, contents):
+                if content:
+                    # Add URL to index as a string
+                    files.append(path_str)
+                    self._indexed_urls.add(path_str)
+                    print(f"Successfully indexed URL: {path_str}")
                 else:
-                    # Handle Path objects
-                    path = doc_path if isinstance(doc_path, Path) else Path(doc_path)
-                    path = path.resolve()
-
-                    if path.is_file() and self._should_include(path):
-                        files.append(path)
-                    elif path.is_dir():
-                        files.extend(await self._scan_directory(path))
-
-            # Sort with mixed types (strings and Path objects)
-            unique_files = list(set(files))
-            self._file_index = sorted(unique_files, key=lambda x: str(x))
-            self._index_time = datetime.now()
-
-        return self._file_index
+                    # Log failed URL fetch
+                    print(f"Warning: Failed to fetch URL: {path_str}")
+
+        # Walk directories off the event loop; only changed directories are re-listed
+        signatures = await asyncio.to_thread(self._scan_local_paths, local_paths)
+        files.extend(signatures)
+
+        # Sort with mixed types (strings and Path objects)
+        unique_files = list(set(files))
+        self._file_index = sorted(unique_files, key=lambda x: str(x))
+        self._index_time = datetime.now()
+        self._build_path_maps(self._file_index)
+        await self._update_search_index(self._file_index, signatures)
+
+    def _build_path_maps(self, files: List[Union[Path, str]]) -> None:
+        """Map display paths, absolute paths and URLs to index entries for constant-time lookups."""
+        # Resolved local doc_path -> (configuration order, doc_path as configured)
+        roots: Dict[Path, tuple[int, Union[Path, str]]] = {}
+        for order, doc_path in enumerate(self.settings.doc_paths):
+            if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
+                continue
+            resolved = Path(doc_path).resolve()
+            roots.setdefault(resolved, (order, doc_path))
+
+        display_paths: Dict[Union[Path, str], str] = {}
+        lookup: Dict[str, Union[Path, str]] = {}
+        for entry in files:
+            if isinstance(entry, str):
+                display_paths[entry] = entry
+                lookup[entry] = entry
+                continue
+
+            # Show files relative to the first configured doc_path that contains them
+            match = None
+            for candidate in (entry, *entry.parents):
+                root = roots.get(candidate)
+                if root is not None and (match is None or root[0] < match[0]):
+                    match = (root[0], root[1], candidate)
+            if match is None:
+                display = str(entry)
+            else:
+                _, doc_path, root = match
+                display = str(doc_path) if entry == root else str(Path(doc_path) / entry.relative_to(root))
+
+            display_paths[entry] = display
+            lookup[str(entry)] = entry
+            lookup.setdefault(display, entry)
+            lookup.setdefault(os.path.normpath(display), entry)
+
+        self._display_paths = display_paths
+        self._path_lookup = lookup
+
+    def display_path(self, entry: Union[Path, str]) -> str:
+        """Return an index entry as shown to clients (configured doc_path plus relative path, or the URL)."""
+        return self._display_paths.get(entry, str(entry))
+
+    async def resolve_path(self, file_path: str) -> Optional[Union[Path, str]]:
+        """
+        Resolve a requested path or URL to its index entry.
+
+        Accepts URLs, paths as returned by list_docs, absolute paths, and paths relative to the
+        current directory. Returns None if the path is not in the index.
+        """
+        await self.get_file_index()
+        lookup = self._path_lookup
+
+        entry = lookup.get(file_path) or lookup.get(os.path.normpath(file_path))
+        if entry is not None or file_path.startswith(("http://", "https://")):
+            return entry
+        return lookup.get(str(Path(file_path).resolve()))
 
     async def load_file(self, file_path: Union[Path, str]) -> Optional[str]:
         """Load a documentation file or URL with caching."""
@@ -119,75 +213,180 @@ class DocumentLoader:
         file_path = Path(file_path).resolve()
 
         # Check cache
-        if self.settings.enable_cache and str(file_path) in self._cache:
-            content, cached_time = self._cache[str(file_path)]
-            if datetime.now() - cached_time < timedelta(seconds=self.settings.cache_ttl):
+        if self.settings.enable_cache:
+            content = self._cache.get(str(file_path))
+            if content is not None:
                 return content
 
-        # Load file
+        return await self._read_file(file_path)
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """The full-text search index, loaded from disk on first use if persistence is configured."""
+        if self._search_index is None:
+            if self.settings.search_index_path:
+                self._search_index = SearchIndex.load(Path(self.settings.search_index_path))
+            else:
+                self._search_index = SearchIndex()
+        return self._search_index
+
+    async def _update_search_index(self, files: List[Union[Path, str]], signatures: Dict[Path, FileSignature]) -> None:
+        """Bring the search index in line with the file index, re-indexing only changed documents."""
+        index = self.search_index
+        live_ids = {str(f) for f in files}
+        changed = False
+
+        for doc_id in index.doc_ids():
+            if doc_id not in live_ids:
+                index.remove_document(doc_id)
+                changed = True
+
+        for file_path in files:
+            doc_id = str(file_path)
+            if isinstance(file_path, str):
+                # URLs are indexed once when first fetched
+                if doc_id in index:
+                    continue
+                content = await self._load_url(file_path)
+                if content is None:
+                    continue
+                signature = hashlib.sha1(content.encode("utf-8")).hexdigest()
+            else:
+                signature = signatures[file_path]
+                if index.signature(doc_id) == signature:
+                    continue
+                content = await self._read_file(file_path)
+                if content is None:
+                    continue
+
+            index.add_document(doc_id, content, signature)
+            changed = True
+
+        if changed and self.settings.search_index_path:
+            # Serializing the positional index is slow for large doc sets; keep it off the event loop.
+            # The index is only mutated under _refresh_lock, which is held until the save completes.
+            await asyncio.to_thread(index.save, Path(self.settings.search_index_path))
+
+    async def _read_file(self, file_path: Path) -> Optional[str]:
+        """Read a file from disk, refreshing its cache entry."""
         try:
             async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
                 content = await f.read()
-
-            # Update cache
-            if self.settings.enable_cache:
-                self._cache[str(file_path)] = (content, datetime.now())
-
-            return content
         except Exception:
             return None
-
-    async def search_files(self, query: str) -> List[tuple[Union[Path, str], str]]:
-        """Search for files containing the query string."""
-        query_lower = query.lower()
-        results = []
-
+        if self.settings.enable_cache:
+            self._cache.put(str(file_path), content)
+        return content
+
+    async def search(
+        self, query: str, max_results: int = 10, max_snippets: int = 3
+    ) -> List[tuple[Union[Path, str], float, List[str]]]:
+        """
+        Search the full-text index.
+
+        Bare terms are ranked with BM25; quoted phrases must match exactly. Returns
+        (file, score, snippets) tuples, best match first. Only the matching files are read
+        to build snippets.
+        """
         files = await self.get_file_index()
+        files_by_id = {str(f): f for f in files}
 
-        for file_path in files:
+        results = []
+        for hit in self.search_index.search(query, max_results=max_results):
+            file_path = files_by_id.get(hit.doc_id)
+            if file_path is None:
+                continue
             content = await self.load_file(file_path)
-            if content and query_lower in content.lower():
-                # Extract a snippet around the match
-                index = content.lower().find(query_lower)
-                start = max(0, index - 100)
-                end = min(len(content), index + len(query) + 100)
-                snippet = content[start:end]
-
-                if start > 0:
-                    snippet = "..." + snippet
-                if end < len(content):
-                    snippet = snippet + "..."
-
-                results.append((file_path, snippet))
+            snippets = extract_snippets(content, query, max_snippets=max_snippets) if content else []
+            results.append((file_path, hit.score, snippets))
 
         return results
 
+    async def search_files(self, query: str) -> List[tuple[Union[Path, str], str]]:
+        """Search for files matching the query, returning the best snippet for each."""
+        files = await self.get_file_index()
+        results = await self.search(query, max_results=len(files), max_snippets=1)
+        return [(file_path, snippets[0] if snippets else "") for file_path, _, snippets in results]
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client so URL fetches reuse pooled connections."""
+        if self._http_client is None or self._http_client.is_closed:
+            concurrency = max(1, self.settings.url_fetch_concurrency)
+            self._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            )
+        return self._http_client
+
     async def _load_url(self, url: str) -> Optional[str]:
-        """Load content from a URL."""
+        """Load content from a URL, revalidating stale cache entries with ETag/Last-Modified."""
         # Check cache first
-        if self.settings.enable_cache and url in self._cache:
-            content, cached_time = self._cache[url]
-            if datetime.now() - cached_time < timedelta(seconds=self.settings.cache_ttl):
+        cached = None
+        if self.settings.enable_cache:
+            content = self._cache.get(url)
+            if content is not None:
                 return content
+            cached = self._cache.get_entry(url)
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+            if headers:
+                self._cache.record_revalidation()
 
         # Fetch URL
+        client = self._get_http_client()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=30.0, follow_redirects=True)
-                response.raise_for_status()
-                content = response.text
+            async with self._url_semaphore:
+                response = await client.get(url, headers=headers)
+
+            if response.status_code == 304 and cached is not None:
+                return self._cache.mark_revalidated(url)
+
+            response.raise_for_status()
+            content = response.text
 
             # Update cache
             if self.settings.enable_cache:
-                self._cache[url] = (content, datetime.now())
+                self._cache.put(
+                    url,
+                    content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+
+            # Keep the search index in step with changed remote content
+            if cached is not None and cached.content != content and url in self.search_index:
+                self.search_index.add_document(url, content, hashlib.sha1(content.encode("utf-8")).hexdigest())
 
             return content
         except Exception as e:
             print(f"Error fetching URL {url}: {type(e).__name__}: {str(e)}")
+            if cached is not None:
+                # Serve stale content rather than failing when the origin is unreachable
+                return cached.content
             return None
 
+    def cache_metrics(self) -> Dict[str, float]:
+        """Return content cache statistics."""
+        return self._cache.metrics()
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
     def clear_cache(self):
         """Clear the document cache."""
         self._cache.clear()
         self._file_index = None
         self._index_time = None
+        self._indexed_urls.clear()
+        self._directory_index.clear()
+        if self._search_index is not None:
+            self._search_index.clear()
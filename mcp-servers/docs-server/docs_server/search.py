@@ -0,0 +1,273 @@
+"""Inverted full-text index for the documentation server."""
+
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+
+INDEX_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return [token.lower() for token in _TOKEN_PATTERN.findall(text)]
+
+
+@dataclass
+class ParsedQuery:
+    """A search query split into bare terms and quoted phrases."""
+
+    terms: List[str] = field(default_factory=list)
+    phrases: List[List[str]] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, query: str) -> "ParsedQuery":
+        phrases = []
+        for match in _PHRASE_PATTERN.findall(query):
+            tokens = tokenize(match)
+            if tokens:
+                phrases.append(tokens)
+        terms = tokenize(_PHRASE_PATTERN.sub(" ", query).replace('"', " "))
+        return cls(terms=terms, phrases=phrases)
+
+    def all_terms(self) -> Set[str]:
+        """Every distinct term in the query, including those inside phrases."""
+        result = set(self.terms)
+        for phrase in self.phrases:
+            result.update(phrase)
+        return result
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.phrases)
+
+
+@dataclass
+class SearchHit:
+    """A ranked search result for a single document."""
+
+    doc_id: str
+    score: float
+
+
+class SearchIndex:
+    """
+    Positional inverted index with BM25 ranking.
+
+    Documents are added, replaced or removed individually, so the index can be kept up to
+    date as files change without rebuilding it. Each document carries a caller-defined
+    signature (for example file mtime and size) used to skip re-indexing unchanged content.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # doc_id -> term -> token positions
+        self._docs: Dict[str, Dict[str, List[int]]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._signatures: Dict[str, Any] = {}
+        # term -> ids of documents containing it
+        self._postings: Dict[str, Set[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._docs
+
+    def doc_ids(self) -> List[str]:
+        return list(self._docs)
+
+    def signature(self, doc_id: str) -> Any:
+        """Return the signature stored with a document, or None if it is not indexed."""
+        return self._signatures.get(doc_id)
+
+    def add_document(self, doc_id: str, content: str, signature: Any = None) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self._docs:
+            self.remove_document(doc_id)
+
+        positions: Dict[str, List[int]] = {}
+        tokens = tokenize(content)
+        for position, token in enumerate(tokens):
+            positions.setdefault(token, []).append(position)
+        self._store(doc_id, positions, len(tokens), signature)
+
+    def _store(self, doc_id: str, positions: Dict[str, List[int]], length: int, signature: Any) -> None:
+        self._docs[doc_id] = positions
+        self._lengths[doc_id] = length
+        self._signatures[doc_id] = signature
+        self._total_length += length
+        for term in positions:
+            self._postings.setdefault(term, set()).add(doc_id)
+
+    def remove_document(self, doc_id: str) -> None:
+        """Remove a document from the index if present."""
+        positions = self._docs.pop(doc_id, None)
+        if positions is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id, 0)
+        self._signatures.pop(doc_id, None)
+        for term in positions:
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._postings[term]
+
+    def clear(self) -> None:
+        self._docs.clear()
+        self._lengths.clear()
+        self._signatures.clear()
+        self._postings.clear()
+        self._total_length = 0
+
+    def _has_phrase(self, doc_id: str, phrase: List[str]) -> bool:
+        positions = self._docs[doc_id]
+        if any(term not in positions for term in phrase):
+            return False
+        later = [set(positions[term]) for term in phrase[1:]]
+        return any(
+            all(start + offset + 1 in term_positions for offset, term_positions in enumerate(later))
+            for start in positions[phrase[0]]
+        )
+
+    def search(self, query: str, max_results: int = 10) -> List[SearchHit]:
+        """
+        Rank documents for a query.
+
+        Bare terms are combined with OR and ranked with BM25. Quoted phrases must appear
+        verbatim (as consecutive tokens) in every returned document.
+        """
+        parsed = ParsedQuery.parse(query)
+        if not parsed or not self._docs:
+            return []
+
+        if parsed.phrases:
+            # Only documents that contain every phrase can match
+            candidates: Optional[Set[str]] = None
+            for phrase in parsed.phrases:
+                docs = set.intersection(*(self._postings.get(term, set()) for term in phrase))
+                candidates = docs if candidates is None else candidates & docs
+            candidates = {
+                doc_id
+                for doc_id in candidates or set()
+                if all(self._has_phrase(doc_id, phrase) for phrase in parsed.phrases)
+            }
+        else:
+            candidates = set().union(*(self._postings.get(term, set()) for term in parsed.terms))
+
+        if not candidates:
+            return []
+
+        total_docs = len(self._docs)
+        avg_length = self._total_length / total_docs if total_docs else 0.0
+        scores: Dict[str, float] = {}
+        for term in parsed.all_terms():
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id in docs & candidates:
+                freq = len(self._docs[doc_id][term])
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / (avg_length or 1.0))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [SearchHit(doc_id=doc_id, score=round(score, 4)) for doc_id, score in ranked[:max_results]]
+
+    def save(self, path: Path) -> None:
+        """Write the index to a JSON file."""
+        data = {
+            "version": INDEX_VERSION,
+            "docs": {
+                doc_id: {
+                    "signature": self._signatures.get(doc_id),
+                    "length": self._lengths[doc_id],
+                    "terms": positions,
+                }
+                for doc_id, positions in self._docs.items()
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SearchIndex":
+        """Read an index written by save(). Returns an empty index if the file is missing or invalid."""
+        index = cls()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return index
+        for doc_id, entry in data.get("docs", {}).items():
+            signature = entry.get("signature")
+            if isinstance(signature, list):
+                signature = tuple(signature)
+            index._store(doc_id, entry["terms"], entry["length"], signature)
+        return index
+
+
+def extract_snippets(content: str, query: str, max_snippets: int = 3, context_chars: int = 100) -> List[str]:
+    """
+    Extract up to max_snippets non-overlapping snippets around query matches, in document order.
+
+    Windows containing more matches are preferred. Phrase matches are highlighted as a whole.
+    """
+    parsed = ParsedQuery.parse(query)
+    if not parsed:
+        return []
+
+    spans = [(match.start(), match.end(), match.group().lower()) for match in _TOKEN_PATTERN.finditer(content)]
+    terms = set(parsed.terms)
+    hits: List[Tuple[int, int]] = []
+    for position, (start, end, token) in enumerate(spans):
+        if token in terms:
+            hits.append((start, end))
+        for phrase in parsed.phrases:
+            if token == phrase[0] and [s[2] for s in spans[position : position + len(phrase)]] == phrase:
+                hits.append((start, spans[position + len(phrase) - 1][1]))
+    if not hits:
+        return []
+    hits.sort()
+
+    # Merge nearby hits into windows of context around them. A window never grows beyond
+    # about two contexts, so dense matches yield several snippets instead of the whole document.
+    max_chars = 2 * context_chars + max(end - start for start, end in hits)
+    windows: List[List[int]] = []
+    for start, end in hits:
+        window_start = max(0, start - context_chars)
+        window_end = min(len(content), end + context_chars)
+        if windows and window_start <= windows[-1][1]:
+            last = windows[-1]
+            if window_end - last[0] <= max_chars:
+                last[1] = max(last[1], window_end)
+                last[2] += 1
+                continue
+            if end <= last[1]:
+                # The match is inside the full window already; keep its context as it is
+                last[2] += 1
+                continue
+            # Start a new window where the full one ends, so snippets never overlap
+            window_start = last[1]
+        windows.append([window_start, window_end, 1])
+
+    best = sorted(windows, key=lambda window: (-window[2], window[0]))[:max_snippets]
+    snippets = []
+    for start, end, _ in sorted(best):
+        snippet = content[start:end]
+        if start > 0:
+            snippet = "..." + snippet
+        if end < len(content):
+            snippet = snippet + "..."
+        snippets.append(snippet)
+    return snippets
@@ -1,6 +1,5 @@
 """MCP server implementation for documentation."""
 
-from pathlib import Path
 from typing import List
 
 from mcp.server.fastmcp import FastMCP
@@ -23,46 +22,7 @@ def create_docs_server(settings: DocsServerSettings) -> FastMCP:
             List of file paths as configured (e.g., '../../ai_context/generated/file.md').
         """
         files = await loader.get_file_index()
-
-        result = []
-        for file_path in files:
-            # URLs are stored as strings, return as-is
-            if isinstance(file_path, str):
-                result.append(file_path)
-            else:
-                # For files, find which doc_path it belongs to and show relative to that
-                found = False
-                for doc_path in settings.doc_paths:
-                    if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
-                        continue
-
-                    doc_path_obj = doc_path if isinstance(doc_path, Path) else Path(doc_path)
-                    try:
-                        # Check if this file is under this doc_path
-                        rel_path = file_path.relative_to(doc_path_obj.resolve())
-                        # Return it as configured doc_path + relative path
-                        result.append(str(doc_path / rel_path))
-                        found = True
-                        break
-                    except ValueError:
-                        continue
-
-                if not found:
-                    # If file is the doc_path itself, return as configured
-                    for doc_path in settings.doc_paths:
-                        if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
-                            continue
-                        doc_path_obj = doc_path if isinstance(doc_path, Path) else Path(doc_path)
-                        if doc_path_obj.resolve() == file_path:
-                            result.append(str(doc_path))
-                            found = True
-                            break
-
-                    if not found:
-                        # Fallback to absolute path
-                        result.append(str(file_path))
-
-        return result
+        return [loader.display_path(file_path) for file_path in files]
 
     @mcp.tool()
     async def read_doc(file_path: str) -> str:
@@ -75,75 +35,13 @@ def create_docs_server(settings: DocsServerSettings) -> FastMCP:
         Returns:
             The contents of the file, or an error message if the file cannot be read.
         """
-        # Check if it's a URL first
-        if file_path.startswith(("http://", "https://")):
-            # Validate URL is in our index
-            files = await loader.get_file_index()
-            if file_path not in [f for f in files if isinstance(f, str)]:
+        entry = await loader.resolve_path(file_path)
+        if entry is None:
+            if file_path.startswith(("http://", "https://")):
                 return f"Error: URL '{file_path}' not found in documentation index"
-            content = await loader.load_file(file_path)
-        else:
-            # For file paths, resolve based on our doc_paths
-            resolved_path = None
-
-            # First check if it matches any doc_path exactly
-            for doc_path in settings.doc_paths:
-                if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
-                    continue
-                if str(doc_path) == file_path:
-                    resolved_path = Path(doc_path).resolve()
-                    break
-
-            # Then check if it's a path under a doc_path
-            if not resolved_path:
-                path_obj = Path(file_path)
-                if path_obj.is_absolute():
-                    # Absolute path - validate it's in our index
-                    files = await loader.get_file_index()
-                    for f in files:
-                        if isinstance(f, Path) and f == path_obj:
-                            resolved_path = f
-                            break
-                else:
-                    # Relative path - could be relative to current dir or a doc_path
-                    # First try as-is
-                    candidate = path_obj.resolve()
-                    if candidate.exists():
-                        files = await loader.get_file_index()
-                        for f in files:
-                            if isinstance(f, Path) and f == candidate:
-                                resolved_path = candidate
-                                break
-
-                    # If not found, try relative to each doc_path
-                    if not resolved_path:
-                        for doc_path in settings.doc_paths:
-                            if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
-                                continue
-                            doc_path_obj = doc_path if isinstance(doc_path, Path) else Path(doc_path)
-                            # For paths like ../../ai_context/generated/file.md
-                            # We need to resolve the doc_path first, then append the rest
-                            if str(file_path).startswith(str(doc_path)):
-                                # Extract the relative part after the doc_path
-                                rel_part = str(file_path)[len(str(doc_path)) :].lstrip("/")
-                                if rel_part:
-                                    candidate = doc_path_obj.resolve() / rel_part
-                                else:
-                                    candidate = doc_path_obj.resolve()
-
-                                if candidate.exists():
-                                    files = await loader.get_file_index()
-                                    for f in files:
-                                        if isinstance(f, Path) and f == candidate:
-                                            resolved_path = candidate
-                                            break
-                                if resolved_path:
-                                    break
+            return f"Error: File '{file_path}' not found in documentation index"
 
-            if not resolved_path:
-                return f"Error: File '{file_path}' not found in documentation index"
-
-            content = await loader.load_file(resolved_path)
+        content = await loader.load_file(entry)
 
         if content is None:
             return f"Error: Could not read file '{file_path}'"
@@ -151,49 +49,32 @@ def create_docs_server(settings: DocsServerSettings) -> FastMCP:
         return content
 
     @mcp.tool()
-    async def search_docs(query: str, max_results: int = 10) -> List[dict]:
+    async def search_docs(query: str, max_results: int = 10, max_snippets: int = 3) -> List[dict]:
         """
-        Search for documentation files containing the specified query.
+        Search the documentation using a ranked full-text index.
 
         Args:
-            query: The search query string.
+            query: The search query. Words are matched individually and ranked by relevance;
+                wrap words in double quotes to require an exact phrase (e.g. '"context overrides" loop').
             max_results: Maximum number of results to return (default: 10).
+            max_snippets: Maximum number of matching snippets per file (default: 3).
 
         Returns:
-            List of search results with file paths and matching snippets.
+            List of search results, best match first, with file paths, relevance scores and snippets.
         """
-        results = await loader.search_files(query)
-
-        # Limit results
-        results = results[:max_results]
+        results = await loader.search(query, max_results=max_results, max_snippets=max_snippets)
 
         # Format results
         formatted_results = []
-        for file_path, snippet in results:
-            if isinstance(file_path, str):
-                # URL - return as-is
-                formatted_results.append({"file": file_path, "snippet": snippet.strip()})
-            else:
-                # File - find its doc_path and show relative to that
-                display_path = str(file_path)  # fallback
-                for doc_path in settings.doc_paths:
-                    if isinstance(doc_path, str) and doc_path.startswith(("http://", "https://")):
-                        continue
-
-                    doc_path_obj = doc_path if isinstance(doc_path, Path) else Path(doc_path)
-                    try:
-                        # Check if this file is under this doc_path
-                        rel_path = file_path.relative_to(doc_path_obj.resolve())
-                        # Return it as configured doc_path + relative path
-                        display_path = str(doc_path / rel_path)
-                        break
-                    except ValueError:
-                        # Check if it IS the doc_path
-                        if doc_path_obj.resolve() == file_path:
-                            display_path = str(doc_path)
-                            break
-
-                formatted_results.append({"file": display_path, "snippet": snippet.strip()})
+        for file_path, score, snippets in results:
+            snippets = [snippet.strip() for snippet in snippets]
+            display_path = loader.display_path(file_path)
+            formatted_results.append({
+                "file": display_path,
+                "score": score,
+                "snippet": snippets[0] if snippets else "",
+                "snippets": snippets,
+            })
 
         return formatted_results
 
@@ -241,8 +122,20 @@ def create_docs_server(settings: DocsServerSettings) -> FastMCP:
             "file_types": extensions,
             "doc_paths": [str(p) for p in settings.doc_paths],
             "cache_enabled": settings.enable_cache,
+            "search_index_documents": len(loader.search_index),
         }
 
+    @mcp.tool()
+    async def get_cache_stats() -> dict:
+        """
+        Get statistics about the documentation content cache.
+
+        Returns:
+            Dictionary with cache entries, size in bytes, hit/miss counts, hit rate,
+            evictions, and URL revalidations (including how many returned 304 Not Modified).
+        """
+        return {**loader.cache_metrics(), "cache_enabled": settings.enable_cache}
+
     @mcp.tool()
     async def clear_cache() -> str:
         """
@@ -0,0 +1,50 @@
+"""Tests for the content cache."""
+
+import time
+
+from docs_server.cache import ContentCache
+
+
+def test_lru_eviction_by_bytes():
+    """Least recently used entries are evicted once the byte limit is exceeded."""
+    cache = ContentCache(max_bytes=10, ttl=60)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # a is now most recently used
+
+    cache.put("c", "cccc")
+
+    assert "b" not in cache
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.metrics()["bytes"] == 8
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_oversized_entries_are_not_cached():
+    """Content larger than the whole cache is skipped instead of flushing everything."""
+    cache = ContentCache(max_bytes=4, ttl=60)
+    cache.put("small", "abc")
+    cache.put("big", "abcdefgh")
+
+    assert "big" not in cache
+    assert cache.get("small") == "abc"
+
+
+def test_expired_entries_are_kept_for_revalidation():
+    """Expired entries miss on get() but keep their validators until revalidated."""
+    cache = ContentCache(max_bytes=100, ttl=0.01)
+    cache.put("url", "content", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    time.sleep(0.02)
+
+    assert cache.get("url") is None
+    entry = cache.get_entry("url")
+    assert entry is not None and entry.etag == '"v1"'
+
+    assert cache.mark_revalidated("url") == "content"
+    assert cache.get("url") == "content"
+
+    metrics = cache.metrics()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 1
+    assert metrics["not_modified"] == 1
@@ -0,0 +1,74 @@
+"""Tests for the incremental directory index."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from docs_server.file_index import DirectoryIndex
+
+
+@pytest.fixture
+def docs_tree(tmp_path):
+    """Create a small documentation tree."""
+    (tmp_path / "readme.md").write_text("# Readme")
+    (tmp_path / "notes.bin").write_text("not docs")
+    sub = tmp_path / "guide"
+    sub.mkdir()
+    (sub / "intro.md").write_text("Intro")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "config.md").write_text("hidden")
+    return tmp_path
+
+
+def make_index() -> DirectoryIndex:
+    return DirectoryIndex(lambda path: path.suffix == ".md", max_file_size=1024, watch=False)
+
+
+def bump_mtime(path: Path) -> None:
+    """Move a path's mtime forward so changes are visible on coarse-grained file systems."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_scan_lists_included_files(docs_tree):
+    """Test that only included files outside hidden directories are listed."""
+    files = make_index().scan([docs_tree])
+
+    assert sorted(p.relative_to(docs_tree).as_posix() for p in files) == ["guide/intro.md", "readme.md"]
+
+
+def test_rescan_only_relists_changed_directories(docs_tree, monkeypatch):
+    """Test that unchanged directories are served from the cached listing."""
+    index = make_index()
+    index.scan([docs_tree])
+
+    listed = []
+    original = index._list_dir
+    monkeypatch.setattr(index, "_list_dir", lambda path, mtime: listed.append(path) or original(path, mtime))
+
+    assert len(index.scan([docs_tree])) == 2
+    assert listed == []
+
+    (docs_tree / "guide" / "new.md").write_text("New")
+    bump_mtime(docs_tree / "guide")
+    files = index.scan([docs_tree])
+
+    assert listed == [docs_tree / "guide"]
+    assert docs_tree / "guide" / "new.md" in files
+
+
+def test_rescan_detects_content_changes_and_removals(docs_tree):
+    """Test that edited files get new signatures and removed directories disappear."""
+    index = make_index()
+    before = index.scan([docs_tree])
+
+    (docs_tree / "readme.md").write_text("# Readme, now longer")
+    for path in (docs_tree / "guide").iterdir():
+        path.unlink()
+    (docs_tree / "guide").rmdir()
+    bump_mtime(docs_tree)
+    after = index.scan([docs_tree])
+
+    assert after[docs_tree / "readme.md"] != before[docs_tree / "readme.md"]
+    assert list(after) == [docs_tree / "readme.md"]
@@ -1,6 +1,9 @@
 """Tests for the document loader."""
 
+import asyncio
 import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import pytest
@@ -117,3 +120,153 @@ async def test_cache_functionality(loader, temp_docs_dir):
     loader.clear_cache()
     content3 = await loader.load_file(file_path)
     assert content3 == "Modified content"
+
+
+@pytest.mark.asyncio
+async def test_search_phrase_and_snippets(loader, temp_docs_dir):
+    """Test ranked search with phrase queries and multiple snippets."""
+    (temp_docs_dir / "long.md").write_text("install first. " + "filler " * 60 + "then install again.")
+
+    results = await loader.search('"step 1"')
+    assert [file_path.name for file_path, _, _ in results] == ["guide.txt"]
+
+    results = await loader.search("install", max_results=5, max_snippets=3)
+    names = [file_path.name for file_path, _, _ in results]
+    assert set(names) == {"guide.txt", "long.md"}
+    snippets = dict((file_path.name, snippets) for file_path, _, snippets in results)
+    assert len(snippets["long.md"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_search_index_updates_incrementally(loader, temp_docs_dir):
+    """Test that changed, added and removed files are reflected in search."""
+    await loader.get_file_index()
+    assert len(loader.search_index) == 3
+
+    (temp_docs_dir / "readme.md").write_text("# Renamed Project\n\nNothing here.")
+    (temp_docs_dir / "new.md").write_text("A brand new document.")
+    (temp_docs_dir / "guide.txt").unlink()
+    loader._index_time = None  # force the next lookup to rescan
+
+    assert await loader.search_files("test") == []
+    assert [f.name for f, _ in await loader.search_files("brand")] == ["new.md"]
+    assert await loader.search_files("install") == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_refresh_once(loader, monkeypatch):
+    """Test that concurrent lookups share one index refresh instead of scanning in parallel."""
+    scans = 0
+    scan = loader._scan_local_paths
+
+    def counting_scan(paths):
+        nonlocal scans
+        scans += 1
+        return scan(paths)
+
+    monkeypatch.setattr(loader, "_scan_local_paths", counting_scan)
+    results = await asyncio.gather(*(loader.get_file_index() for _ in range(5)))
+
+    assert scans == 1
+    assert all(files == results[0] for files in results)
+
+
+@pytest.mark.asyncio
+async def test_search_index_persistence(temp_docs_dir, tmp_path):
+    """Test that the search index is saved and reused across loaders."""
+    index_path = tmp_path / "search-index.json"
+    settings = DocsServerSettings(
+        doc_paths=[temp_docs_dir],
+        include_patterns=["*.md", "*.txt"],
+        exclude_patterns=[".*", "hidden*"],
+        search_index_path=index_path,
+    )
+
+    await DocumentLoader(settings).get_file_index()
+    assert index_path.exists()
+
+    second = DocumentLoader(settings)
+    assert len(second.search_index) == 3
+    results = await second.search_files("API")
+    assert [f.name for f, _ in results] == ["api.md"]
+
+
+@pytest.mark.asyncio
+async def test_display_and_resolve_paths(temp_docs_dir):
+    """Test that index entries map to configured-relative paths and back."""
+    settings = DocsServerSettings(
+        doc_paths=[temp_docs_dir, temp_docs_dir / "docs" / "api.md"],
+        include_patterns=["*.md", "*.txt"],
+        exclude_patterns=[".*", "hidden*"],
+    )
+    loader = DocumentLoader(settings)
+    files = await loader.get_file_index()
+
+    api_path = (temp_docs_dir / "docs" / "api.md").resolve()
+    # The first configured doc_path containing the file wins
+    assert loader.display_path(api_path) == str(temp_docs_dir / "docs" / "api.md")
+    assert sorted(loader.display_path(f) for f in files) == sorted(
+        str(temp_docs_dir / name) for name in ["docs/api.md", "guide.txt", "readme.md"]
+    )
+
+    assert await loader.resolve_path(str(api_path)) == api_path
+    assert (
+        await loader.resolve_path(str(temp_docs_dir / "docs" / ".." / "readme.md"))
+        == (temp_docs_dir / "readme.md").resolve()
+    )
+    assert await loader.resolve_path(str(temp_docs_dir / "hidden.txt")) is None
+    assert await loader.resolve_path("https://example.com/missing.md") is None
+
+
+@pytest.fixture
+def etag_server():
+    """Serve documents over HTTP with ETag support, counting full and 304 responses."""
+    counts = {"full": 0, "not_modified": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == '"v1"':
+                counts["not_modified"] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            counts["full"] += 1
+            body = f"Remote document {self.path}".encode()
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", counts
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_url_revalidation_uses_etag(etag_server):
+    """Test that stale URLs are revalidated with If-None-Match and served from cache on 304."""
+    base_url, counts = etag_server
+    settings = DocsServerSettings(
+        doc_paths=[f"{base_url}/one.md", f"{base_url}/two.md"],
+        include_patterns=["*.md"],
+        cache_ttl=0,
+    )
+    loader = DocumentLoader(settings)
+
+    files = await loader.get_file_index()
+    assert len(files) == 2
+    assert counts["full"] == 2
+
+    content = await loader.load_file(f"{base_url}/one.md")
+    assert content == "Remote document /one.md"
+    assert counts["full"] == 2
+    assert counts["not_modified"] >= 1
+    assert loader.cache_metrics()["not_modified"] == counts["not_modified"]
+
+    await loader.aclose()
@@ -0,0 +1,101 @@
+"""Tests for the full-text search index."""
+
+from docs_server.search import SearchIndex, extract_snippets
+
+
+def build_index() -> SearchIndex:
+    index = SearchIndex()
+    index.add_document("loop.md", "The loop step iterates over items. Loop results keep item order.", "v1")
+    index.add_document("context.md", "Context overrides are applied before the sub-recipe runs.", "v1")
+    index.add_document("llm.md", "The llm step generates content. Results are stored in the context.", "v1")
+    return index
+
+
+def test_search_ranks_by_relevance():
+    """Documents with more occurrences of rarer terms rank first."""
+    index = build_index()
+
+    hits = index.search("loop results")
+
+    assert [hit.doc_id for hit in hits][0] == "loop.md"
+    assert {hit.doc_id for hit in hits} == {"loop.md", "llm.md"}
+    assert hits[0].score > hits[1].score
+
+
+def test_phrase_query_requires_exact_sequence():
+    """Quoted phrases only match consecutive tokens."""
+    index = build_index()
+
+    assert [hit.doc_id for hit in index.search('"context overrides"')] == ["context.md"]
+    assert index.search('"overrides context"') == []
+
+
+def test_incremental_update_and_remove():
+    """Replacing or removing a document updates postings without a rebuild."""
+    index = build_index()
+
+    index.add_document("loop.md", "Parallel execution of steps.", "v2")
+    assert "loop.md" not in [hit.doc_id for hit in index.search("iterates")]
+    assert [hit.doc_id for hit in index.search("parallel")] == ["loop.md"]
+    assert index.signature("loop.md") == "v2"
+
+    index.remove_document("llm.md")
+    assert len(index) == 2
+    assert index.search("generates") == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """A saved index answers queries identically after loading."""
+    index = build_index()
+    index.add_document("stat.md", "File with a stat signature.", (123, 45))
+    path = tmp_path / "index.json"
+
+    index.save(path)
+    loaded = SearchIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.signature("stat.md") == (123, 45)
+    assert [hit.doc_id for hit in loaded.search('"item order"')] == ["loop.md"]
+
+
+def test_load_missing_file_returns_empty_index(tmp_path):
+    """Loading a missing or corrupt file yields an empty index."""
+    assert len(SearchIndex.load(tmp_path / "missing.json")) == 0
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert len(SearchIndex.load(corrupt)) == 0
+
+
+def test_extract_multiple_snippets():
+    """Distant matches produce separate snippets in document order."""
+    content = "alpha " + "filler " * 100 + "beta " + "filler " * 100 + "alpha"
+
+    snippets = extract_snippets(content, "alpha beta", max_snippets=3, context_chars=20)
+
+    assert len(snippets) == 3
+    assert snippets[0].startswith("alpha")
+    assert "beta" in snippets[1]
+    assert snippets[2].endswith("alpha")
+
+
+def test_extract_snippets_limits_count():
+    """Windows with the most matches are kept when there are too many."""
+    content = "beta beta " + "filler " * 100 + "beta"
+
+    snippets = extract_snippets(content, "beta", max_snippets=1, context_chars=20)
+
+    assert len(snippets) == 1
+    assert snippets[0].startswith("beta beta")
+
+
+def test_extract_snippets_caps_dense_matches():
+    """Dense matches in a long document yield bounded snippets, not the whole document."""
+    content = "the server handles the request and the response " * 1300  # about 62 KB
+
+    snippets = extract_snippets(content, "the", max_snippets=3, context_chars=100)
+
+    assert len(snippets) == 3
+    for snippet in snippets:
+        assert len(snippet.strip(".")) <= 2 * 100 + len("the")
+    assert sum(len(snippet) for snippet in snippets) < len(content) // 50
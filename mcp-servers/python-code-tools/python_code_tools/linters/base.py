@@ -45,6 +45,12 @@ class ProjectLintResult(LintResult):
     fixed_issues_summary: Dict[str, Dict[str, Any]] = Field(
         default_factory=dict, description="Summary of fixed issues grouped by file"
     )
+    # Incremental linting statistics
+    files_linted: int = Field(0, description="Number of files Ruff checked in this run")
+    files_cached: int = Field(0, description="Number of unchanged files whose previous results were reused")
+    shard_timings: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Files, issues and seconds of each concurrent Ruff process"
+    )
 
 
 class BaseLinter(abc.ABC):
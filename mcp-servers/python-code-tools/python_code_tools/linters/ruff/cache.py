@@ -0,0 +1,194 @@
+"""Result caches for Ruff linting."""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def config_key(config: Optional[Dict[str, Any]]) -> str:
+    """Get a stable key for a Ruff configuration.
+
+    Args:
+        config: Configuration settings (may be None)
+
+    Returns:
+        A string that is equal for equivalent configurations
+    """
+    return json.dumps(config or {}, sort_keys=True, default=str)
+
+
+def content_hash(content: str) -> str:
+    """Get the SHA-256 hex digest of some source code.
+
+    Args:
+        content: The source code
+
+    Returns:
+        Hex digest of the UTF-8 encoded content
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LRUCache(Generic[V]):
+    """A small least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries to keep
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, V]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[V]:
+        """Get a cached value and mark it as recently used."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: V) -> None:
+        """Store a value, evicting the least recently used entries if needed."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class FileState:
+    """Last known lint state of a project file."""
+
+    mtime_ns: int
+    size: int
+    sha: str
+    issues: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ProjectLintState:
+    """Tracks per-file lint results for a project so unchanged files are not re-linted.
+
+    A file is considered unchanged when its mtime and size match the recorded state, or,
+    if those changed, when its content hash still matches (e.g. after a touch or checkout).
+    """
+
+    def __init__(self) -> None:
+        self._files: Dict[str, FileState] = {}
+
+    def partition(self, path: Path, py_files: List[str]) -> Tuple[List[str], List[str]]:
+        """Split files into those with reusable results and those that need linting.
+
+        Args:
+            path: Project directory path
+            py_files: Project-relative Python file paths
+
+        Returns:
+            Tuple of (unchanged files, changed files)
+        """
+        unchanged: List[str] = []
+        changed: List[str] = []
+
+        for file_path in py_files:
+            state = self._files.get(file_path)
+            if state is None:
+                changed.append(file_path)
+                continue
+            try:
+                stat = os.stat(path / file_path)
+            except OSError:
+                changed.append(file_path)
+                continue
+            if stat.st_mtime_ns == state.mtime_ns and stat.st_size == state.size:
+                unchanged.append(file_path)
+                continue
+            sha = _hash_file(path / file_path)
+            if sha is not None and sha == state.sha:
+                # Content is the same; only refresh the recorded timestamps
+                state.mtime_ns, state.size = stat.st_mtime_ns, stat.st_size
+                unchanged.append(file_path)
+            else:
+                changed.append(file_path)
+
+        # Forget files that are no longer part of the project
+        live = set(py_files)
+        for file_path in list(self._files):
+            if file_path not in live:
+                del self._files[file_path]
+
+        return unchanged, changed
+
+    def issues_for(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """Get the recorded issues of the given files."""
+        issues: List[Dict[str, Any]] = []
+        for file_path in file_paths:
+            state = self._files.get(file_path)
+            if state is not None:
+                issues.extend(dict(issue) for issue in state.issues)
+        return issues
+
+    def record(self, path: Path, file_paths: List[str], issues: List[Dict[str, Any]]) -> None:
+        """Record fresh lint results for files that were just linted.
+
+        Args:
+            path: Project directory path
+            file_paths: Project-relative paths of the files that were linted
+            issues: Issues reported by Ruff for those files (with absolute or relative "file")
+        """
+        by_file: Dict[str, List[Dict[str, Any]]] = {file_path: [] for file_path in file_paths}
+        for issue in issues:
+            file_path = relative_issue_path(issue.get("file", ""), path)
+            if file_path in by_file:
+                by_file[file_path].append(dict(issue))
+
+        for file_path, file_issues in by_file.items():
+            full_path = path / file_path
+            sha = _hash_file(full_path)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                self._files.pop(file_path, None)
+                continue
+            if sha is None:
+                self._files.pop(file_path, None)
+                continue
+            self._files[file_path] = FileState(stat.st_mtime_ns, stat.st_size, sha, file_issues)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+def _hash_file(path: Path) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def relative_issue_path(file_path: str, project_path: Path) -> str:
+    """Convert the file of a Ruff issue to a normalized project-relative path."""
+    if not os.path.isabs(file_path):
+        return os.path.normpath(file_path)
+    try:
+        return os.path.relpath(file_path, str(project_path.resolve()))
+    except ValueError:
+        return file_path
@@ -1,9 +1,11 @@
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from python_code_tools.linters.base import ProjectLinter, ProjectLintResult
+from python_code_tools.linters.ruff.cache import ProjectLintState, config_key, relative_issue_path
 from python_code_tools.linters.ruff.config import get_config
 from python_code_tools.linters.ruff.reporter import create_issues_summary, identify_fixed_issues, print_final_report
-from python_code_tools.linters.ruff.runner import get_python_files, run_ruff_check, run_ruff_fix
+from python_code_tools.linters.ruff.runner import get_python_files, run_ruff_check_sharded, run_ruff_fix
 from python_code_tools.linters.ruff.utils import (
     convert_issue_paths_to_relative,
     convert_summary_paths_to_relative,
@@ -15,8 +17,19 @@ from python_code_tools.linters.ruff.utils import (
 class RuffProjectLinter(ProjectLinter):
     def __init__(self, **kwargs) -> None:
         super().__init__(name="ruff-project", **kwargs)
-
-    async def lint_project(self, project_path: str, file_patterns=None, fix=True, config=None) -> ProjectLintResult:
+        # Per (project, configuration) file states for incremental linting
+        self._states: Dict[Tuple[str, str], ProjectLintState] = {}
+
+    def _get_state(self, path: Path, config: Dict) -> ProjectLintState:
+        key = (str(path.resolve()), config_key(config))
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = ProjectLintState()
+        return state
+
+    async def lint_project(
+        self, project_path: str, file_patterns=None, fix=True, config=None, incremental: bool = True
+    ) -> ProjectLintResult:
         path = Path(project_path)
         effective_config, config_source = await get_config(config)
         has_ruff_config = config_source != "default"
@@ -42,8 +55,23 @@ class RuffProjectLinter(ProjectLinter):
                 fixed_issues_summary={},
             )
 
+        # Incremental mode only lints files whose content changed since the last call
+        state: Optional[ProjectLintState] = self._get_state(path, effective_config) if incremental else None
+        if state is not None:
+            unchanged_files, changed_files = state.partition(path, py_files)
+            print(f"Incremental lint: {len(changed_files)} changed, {len(unchanged_files)} unchanged files")
+        else:
+            unchanged_files, changed_files = [], py_files
+
         # Initial scan - find all issues before fixing
-        initial_issues = await run_ruff_check(path, py_files, effective_config)
+        shard_timings: List[Dict[str, Any]] = []
+        fresh_issues, timings = await run_ruff_check_sharded(path, changed_files, effective_config)
+        shard_timings.extend({"phase": "check", **timing} for timing in timings)
+        if state is not None:
+            state.record(path, changed_files, fresh_issues)
+            initial_issues = state.issues_for(unchanged_files) + fresh_issues
+        else:
+            initial_issues = fresh_issues
         total_issues_count = len(initial_issues)
 
         # Create a copy of initial issues for tracking
@@ -53,17 +81,22 @@ class RuffProjectLinter(ProjectLinter):
 
         # Only run the fixer if requested and there are issues to fix
         if fix and initial_issues:
-            before_hashes = await get_file_hashes(path, py_files)
+            # In incremental mode only files with issues need fixing and re-checking
+            fix_files = _files_with_issues(path, py_files, initial_issues) if state is not None else py_files
+            before_hashes = await get_file_hashes(path, fix_files)
 
             # Run the auto-fix
-            await run_ruff_fix(path, py_files, effective_config)
+            await run_ruff_fix(path, fix_files, effective_config)
 
             # Check what's changed
-            after_hashes = await get_file_hashes(path, py_files)
+            after_hashes = await get_file_hashes(path, fix_files)
             modified_files = get_modified_files(before_hashes, after_hashes)
 
             # Get remaining issues after fixing
-            remaining_issues_list = await run_ruff_check(path, py_files, effective_config)
+            remaining_issues_list, timings = await run_ruff_check_sharded(path, fix_files, effective_config)
+            shard_timings.extend({"phase": "recheck", **timing} for timing in timings)
+            if state is not None:
+                state.record(path, fix_files, remaining_issues_list)
 
             # Identify which issues were actually fixed
             fixed_issues_list = identify_fixed_issues(initial_issues, remaining_issues_list)
@@ -127,4 +160,13 @@ class RuffProjectLinter(ProjectLinter):
             files_summary=relative_files_summary,
             fixed_issues=relative_fixed_issues,
             fixed_issues_summary=relative_fixed_summary,
+            files_linted=len(changed_files),
+            files_cached=len(unchanged_files),
+            shard_timings=shard_timings,
         )
+
+
+def _files_with_issues(path: Path, py_files: List[str], issues: List[Dict]) -> List[str]:
+    """Get the project files (in py_files order) that have at least one issue."""
+    with_issues = {relative_issue_path(issue.get("file", ""), path) for issue in issues}
+    return [file_path for file_path in py_files if file_path in with_issues]
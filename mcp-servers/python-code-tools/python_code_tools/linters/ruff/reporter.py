@@ -76,6 +76,33 @@ def identify_fixed_issues(
     return fixed_issues
 
 
+def merge_shard_issues(shard_issues: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Merge the issues of concurrently checked shards into one deterministic list.
+
+    Args:
+        shard_issues: Issues of each shard, in shard order
+
+    Returns:
+        All issues ordered by file, line and column
+    """
+    merged = [issue for issues in shard_issues for issue in issues]
+    merged.sort(key=lambda issue: (issue.get("file", ""), issue.get("line", 0), issue.get("column", 0)))
+    return merged
+
+
+def print_shard_progress(timing: Dict[str, Any], shard_count: int) -> None:
+    """Print the result of a finished check shard.
+
+    Args:
+        timing: Timing entry of the shard (shard, files, issues, seconds)
+        shard_count: Total number of shards
+    """
+    print(
+        f"Shard {timing['shard'] + 1}/{shard_count}: {timing['files']} files, "
+        f"{timing['issues']} issues in {timing['seconds']:.2f}s"
+    )
+
+
 def print_final_report(
     total_issue_count: int,
     fixed_count: int,
@@ -1,15 +1,45 @@
 import asyncio
 import glob
 import json
+import math
 import os
+import re
 import subprocess
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from python_code_tools.linters.ruff.reporter import merge_shard_issues, print_shard_progress
+from python_code_tools.linters.ruff.stdin import RuffError, check_returncode, ruff_config_args
+
+# Directories that are never descended into when looking for Python files
+EXCLUDED_DIRS = frozenset({
+    ".git",
+    ".hg",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "node_modules",
+    "venv",
+})
+
+# Files per Ruff process below which another process is not worth its start-up cost
+MIN_FILES_PER_SHARD = 50
+
+# Upper bound for the file arguments of one Ruff command line (well below typical ARG_MAX)
+MAX_ARGV_CHARS = 100_000
 
 
 async def get_python_files(path: Path, patterns: Optional[List[str]] = None) -> List[str]:
     """Get a list of Python files to lint.
 
+    Recursive (``**``) patterns are resolved with a directory walk that prunes excluded and
+    hidden directories before descending into them, so virtual environments and caches are
+    never traversed.
+
     Args:
         path: Project directory path
         file_patterns: Optional list of file patterns to include
@@ -18,7 +48,6 @@ async def get_python_files(path: Path, patterns: Optional[List[str]] = None) ->
         List of Python file paths
     """
     print(f"Looking for Python files in {path}")
-    py_files = []
 
     if not patterns:
         patterns = ["**/*.py"]  # Default to all Python files
@@ -26,7 +55,21 @@ async def get_python_files(path: Path, patterns: Optional[List[str]] = None) ->
     else:
         print(f"Using provided patterns: {patterns}")
 
-    # Use Python's glob to find files matching patterns
+    # Walking the file system is blocking I/O, so keep it off the event loop
+    unique_files = await asyncio.to_thread(_find_python_files, path, patterns)
+
+    print(f"Found {len(unique_files)} Python files to lint")
+    if len(unique_files) < 10:  # Only print all files if there are few
+        print(f"Files to lint: {unique_files}")
+    else:
+        print(f"First 5 files: {unique_files[:5]}")
+
+    return unique_files
+
+
+def _find_python_files(path: Path, patterns: List[str]) -> List[str]:
+    py_files = []
+
     for pattern in patterns:
         # Handle both absolute and relative paths in patterns
         if os.path.isabs(pattern):
@@ -34,11 +77,10 @@ async def get_python_files(path: Path, patterns: Optional[List[str]] = None) ->
         else:
             glob_pattern = os.path.join(str(path), pattern)
 
-        print(f"Searching with glob pattern: {glob_pattern}")
+        print(f"Searching with pattern: {glob_pattern}")
 
-        # Use glob.glob with recursive=True for ** patterns
         if "**" in pattern:
-            matched_files = glob.glob(glob_pattern, recursive=True)
+            matched_files = _walk_pattern(glob_pattern)
         else:
             matched_files = glob.glob(glob_pattern)
 
@@ -55,20 +97,111 @@ async def get_python_files(path: Path, patterns: Optional[List[str]] = None) ->
                     print(f"Skipping file not relative to project path: {file}")
 
     # Remove duplicates while preserving order
-    unique_files = []
-    seen = set()
-    for file in py_files:
-        if file not in seen:
-            unique_files.append(file)
-            seen.add(file)
+    return list(dict.fromkeys(py_files))
 
-    print(f"Found {len(unique_files)} Python files to lint")
-    if len(unique_files) < 10:  # Only print all files if there are few
-        print(f"Files to lint: {unique_files}")
-    else:
-        print(f"First 5 files: {unique_files[:5]}")
 
-    return unique_files
+def _walk_pattern(glob_pattern: str) -> List[str]:
+    """Find files matching a recursive glob pattern with a pruned directory walk."""
+    parts = glob_pattern.replace(os.sep, "/").split("/")
+
+    # Start walking at the longest directory prefix without wildcards
+    literal: List[str] = []
+    for part in parts[:-1]:
+        if _has_wildcard(part):
+            break
+        literal.append(part)
+    root = "/".join(literal) or "/"
+    if not os.path.isdir(root):
+        return []
+
+    matcher = _pattern_regex(parts)
+    matched_files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Prune in place so excluded trees are never listed
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS and not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            file_path = os.path.join(dirpath, filename)
+            if matcher.fullmatch(file_path.replace(os.sep, "/")):
+                matched_files.append(file_path)
+    return matched_files
+
+
+def _has_wildcard(part: str) -> bool:
+    return any(char in part for char in "*?[")
+
+
+def _pattern_regex(parts: List[str]) -> "re.Pattern[str]":
+    """Translate glob pattern segments into a regex with glob.glob(recursive=True) semantics."""
+    regex = ""
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            # Zero or more directories (or anything, as the final segment)
+            regex += ".*" if last else "(?:[^/]+/)*"
+            continue
+        regex += _segment_regex(part) + ("" if last else "/")
+    return re.compile(regex)
+
+
+def _segment_regex(segment: str) -> str:
+    regex = ""
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[" and "]" in segment[i + 2 :]:
+            end = segment.index("]", i + 2)
+            body = segment[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            regex += "[" + body.replace("\\", "\\\\") + "]"
+            i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
+
+
+def shard_files(py_files: List[str], max_shards: Optional[int] = None) -> List[List[str]]:
+    """Split files into contiguous shards for concurrent Ruff processes.
+
+    The number of shards is bounded by the CPU count and by MIN_FILES_PER_SHARD; shards
+    whose command line would exceed MAX_ARGV_CHARS are split further.
+
+    Args:
+        py_files: Files to split
+        max_shards: Maximum number of shards (defaults to the CPU count)
+
+    Returns:
+        List of non-empty shards, in file order
+    """
+    if not py_files:
+        return []
+    max_shards = max_shards or os.cpu_count() or 1
+    shard_count = max(1, min(max_shards, math.ceil(len(py_files) / MIN_FILES_PER_SHARD)))
+    shard_size = math.ceil(len(py_files) / shard_count)
+
+    shards: List[List[str]] = []
+    for start in range(0, len(py_files), shard_size):
+        shard: List[str] = []
+        shard_chars = 0
+        for file_path in py_files[start : start + shard_size]:
+            if shard and shard_chars + len(file_path) + 1 > MAX_ARGV_CHARS:
+                shards.append(shard)
+                shard, shard_chars = [], 0
+            shard.append(file_path)
+            shard_chars += len(file_path) + 1
+        shards.append(shard)
+    return shards
+
+
+def _existing_files(path: Path, py_files: List[str]) -> List[str]:
+    return [file_path for file_path in py_files if (path / file_path).exists()]
 
 
 async def run_ruff_check(path: Path, py_files: List[str], config: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -82,53 +215,93 @@ async def run_ruff_check(path: Path, py_files: List[str], config: Dict[str, Any]
     Returns:
         List of issues found
     """
+    issues, _ = await run_ruff_check_sharded(path, py_files, config)
+    return issues
+
+
+async def run_ruff_check_sharded(
+    path: Path, py_files: List[str], config: Dict[str, Any], max_workers: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Run Ruff in check mode across concurrent processes, one per shard of files.
+
+    Results are reported as each shard finishes and merged in a deterministic order.
+
+    Args:
+        path: Project directory path
+        py_files: List of Python files to check
+        config: Configuration to use
+        max_workers: Maximum number of concurrent Ruff processes (defaults to the CPU count)
+
+    Returns:
+        Tuple of (issues found, per-shard timings)
+
+    Raises:
+        RuffError: If any Ruff process could not be run or failed (other shards are cancelled)
+    """
     # Make sure we have files to check
     if not py_files:
         print("No Python files found to check")
-        return []
+        return [], []
 
     # Verify the files exist
-    existing_files = []
-    for file_path in py_files:
-        full_path = path / file_path
-        if full_path.exists():
-            existing_files.append(file_path)
-
-    if not existing_files:
+    py_files = await asyncio.to_thread(_existing_files, path, py_files)
+    if not py_files:
         print(f"None of the specified Python files exist in {path}")
-        return []
-
-    py_files = existing_files
-    print(f"Found {len(py_files)} Python files to check")
-
+        return [], []
+
+    shards = shard_files(py_files, max_workers)
+    print(f"Found {len(py_files)} Python files to check in {len(shards)} shard(s)")
+
+    semaphore = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+
+    async def check_shard(index: int, shard: List[str]) -> Tuple[int, List[Dict[str, Any]], Dict[str, Any]]:
+        async with semaphore:
+            start = time.perf_counter()
+            shard_issues = await _check_files(path, shard, config)
+            timing = {
+                "shard": index,
+                "files": len(shard),
+                "issues": len(shard_issues),
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+            return index, shard_issues, timing
+
+    tasks = [asyncio.create_task(check_shard(index, shard)) for index, shard in enumerate(shards)]
+    shard_results: Dict[int, List[Dict[str, Any]]] = {}
+    timings: List[Dict[str, Any]] = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            index, shard_issues, timing = await finished
+            shard_results[index] = shard_issues
+            timings.append(timing)
+            print_shard_progress(timing, len(shards))
+    except BaseException:
+        # A partial report would look like clean files, so fail the whole check
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    issues = merge_shard_issues([shard_results[index] for index in range(len(shards))])
+    print(f"Ruff found {len(issues)} issues")
+    timings.sort(key=lambda timing: timing["shard"])
+    return issues, timings
+
+
+async def _check_files(path: Path, py_files: List[str], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Run one Ruff check process on a list of files.
+
+    Raises:
+        RuffError: If Ruff could not be run, failed, or produced unreadable output
+    """
     # Build the command
     cmd = ["ruff", "check", "--output-format=json"]
-
-    # Add configuration options
-    if "select" in config:
-        select_value = config["select"]
-        if isinstance(select_value, list):
-            select_str = ",".join(select_value)
-        else:
-            select_str = str(select_value)
-        cmd.extend(["--select", select_str])
-
-    if "ignore" in config and config["ignore"]:
-        if isinstance(config["ignore"], list):
-            ignore_str = ",".join(config["ignore"])
-        else:
-            ignore_str = str(config["ignore"])
-        cmd.extend(["--ignore", ignore_str])
-
-    if "line-length" in config:
-        cmd.extend(["--line-length", str(config["line-length"])])
+    cmd.extend(ruff_config_args(config))
 
     # Add files to check
     cmd.extend(py_files)
 
     try:
-        # Now run the actual check command
-        print(f"Running ruff command: {' '.join(cmd)}")
         proc = await asyncio.create_subprocess_exec(*cmd, cwd=str(path), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         stdout_bytes, stderr_bytes = await proc.communicate()
 
@@ -137,7 +310,8 @@ async def run_ruff_check(path: Path, py_files: List[str], config: Dict[str, Any]
 
         if proc.returncode != 0 and stderr_text:
             print(f"Ruff command failed with exit code {proc.returncode}: {stderr_text}")
-            # Continue processing anyway - non-zero could just mean issues were found
+        # Exit code 1 only means issues were found; anything else means no report
+        check_returncode(proc.returncode if proc.returncode is not None else -1, stderr_text)
 
         issues = []
 
@@ -145,7 +319,6 @@ async def run_ruff_check(path: Path, py_files: List[str], config: Dict[str, Any]
         if stdout_text:
             try:
                 json_data = json.loads(stdout_text)
-                print(f"Ruff found {len(json_data)} issues")
 
                 for item in json_data:
                     try:
@@ -176,22 +349,29 @@ async def run_ruff_check(path: Path, py_files: List[str], config: Dict[str, Any]
             except json.JSONDecodeError as e:
                 print(f"Failed to parse Ruff JSON output: {e}")
                 print(f"Raw output: {stdout_text[:200]}...")  # Print first 200 chars
-                return []
+                raise RuffError(f"Failed to parse Ruff JSON output: {e}") from e
 
         return issues
 
+    except RuffError:
+        raise
     except Exception as e:
         print(f"Error running Ruff check: {e}")
-        return []
+        raise RuffError(f"Error running Ruff check: {e}") from e
 
 
-async def run_ruff_fix(path: Path, py_files: List[str], config: Dict[str, Any]) -> bool:
+async def run_ruff_fix(
+    path: Path, py_files: List[str], config: Dict[str, Any], max_workers: Optional[int] = None
+) -> bool:
     """Run Ruff in fix mode.
 
+    Files are fixed in concurrent shards; each file belongs to exactly one shard.
+
     Args:
         path: Project directory path
         py_files: List of Python files to fix
         config: Configuration to use
+        max_workers: Maximum number of concurrent Ruff processes (defaults to the CPU count)
 
     Returns:
         True if fixing succeeded, False otherwise
@@ -201,38 +381,25 @@ async def run_ruff_fix(path: Path, py_files: List[str], config: Dict[str, Any])
         return False
 
     # Verify the files exist
-    existing_files = []
-    for file_path in py_files:
-        full_path = path / file_path
-        if full_path.exists():
-            existing_files.append(file_path)
-
-    if not existing_files:
+    py_files = await asyncio.to_thread(_existing_files, path, py_files)
+    if not py_files:
         return False
 
-    py_files = existing_files
+    semaphore = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
 
-    # Build the command
-    cmd = ["ruff", "check", "--fix"]
+    async def fix_shard(shard: List[str]) -> bool:
+        async with semaphore:
+            return await _fix_files(path, shard, config)
 
-    # Add configuration options
-    if "select" in config:
-        select_value = config["select"]
-        if isinstance(select_value, list):
-            select_str = ",".join(select_value)
-        else:
-            select_str = str(select_value)
-        cmd.extend(["--select", select_str])
+    results = await asyncio.gather(*(fix_shard(shard) for shard in shard_files(py_files, max_workers)))
+    return all(results)
 
-    if "ignore" in config and config["ignore"]:
-        if isinstance(config["ignore"], list):
-            ignore_str = ",".join(config["ignore"])
-        else:
-            ignore_str = str(config["ignore"])
-        cmd.extend(["--ignore", ignore_str])
 
-    if "line-length" in config:
-        cmd.extend(["--line-length", str(config["line-length"])])
+async def _fix_files(path: Path, py_files: List[str], config: Dict[str, Any]) -> bool:
+    """Run one Ruff fix process on a list of files."""
+    # Build the command
+    cmd = ["ruff", "check", "--fix"]
+    cmd.extend(ruff_config_args(config))
 
     # Add files to fix
     cmd.extend(py_files)
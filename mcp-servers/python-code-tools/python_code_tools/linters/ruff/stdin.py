@@ -0,0 +1,301 @@
+"""Run Ruff on in-memory code over stdin, batching concurrent snippet checks."""
+
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple
+
+from python_code_tools.linters.ruff.cache import config_key
+
+# Snippets are linted as if they lived in the temp directory, so that (as with the previous
+# temp-file approach) no project configuration from the server's working directory applies.
+SNIPPET_FILENAME = os.path.join(tempfile.gettempdir(), "snippet.py")
+
+
+class RuffError(RuntimeError):
+    """Ruff could not be run or did not produce a lint report.
+
+    Raised instead of returning an empty issue list, so a failed run is never mistaken for
+    (and cached as) clean code.
+    """
+
+
+def check_returncode(returncode: int, stderr_text: str) -> None:
+    """Raise RuffError unless a `ruff check` exit code means the check completed.
+
+    Args:
+        returncode: Exit code of the Ruff process (0: no issues, 1: issues found)
+        stderr_text: Standard error of the Ruff process
+    """
+    if returncode not in (0, 1):
+        raise RuffError(f"Ruff check failed with exit code {returncode}: {stderr_text or 'no error output'}")
+
+
+def ruff_config_args(config: Optional[Dict[str, Any]]) -> List[str]:
+    """Convert a configuration dictionary into Ruff command line arguments.
+
+    Args:
+        config: Optional configuration settings for Ruff
+
+    Returns:
+        List of command line arguments
+    """
+    args: List[str] = []
+    if not config:
+        return args
+    for key, value in config.items():
+        if key == "select":
+            value_str = ",".join(value) if isinstance(value, list) else str(value)
+            args.extend(["--select", value_str])
+        elif key == "ignore":
+            value_str = ",".join(value) if isinstance(value, list) else str(value)
+            if value_str:
+                args.extend(["--ignore", value_str])
+        elif key == "line-length":
+            args.extend(["--line-length", str(value)])
+    return args
+
+
+def parse_issues(stdout_text: str) -> List[Dict[str, Any]]:
+    """Parse Ruff JSON output into issue dictionaries.
+
+    Args:
+        stdout_text: JSON output of `ruff check --output-format=json`
+
+    Returns:
+        List of issues, each with the file it was reported for
+
+    Raises:
+        RuffError: If the output is not valid JSON
+    """
+    issues: List[Dict[str, Any]] = []
+    if not stdout_text:
+        return issues
+
+    try:
+        data = json.loads(stdout_text)
+    except json.JSONDecodeError as e:
+        print(f"ERROR: Failed to parse JSON output: {e}")
+        print(f"Raw output: {stdout_text[:200]}...")
+        raise RuffError(f"Failed to parse Ruff JSON output: {e}") from e
+
+    for item in data:
+        # Extract location data
+        location = item.get("location") or {}
+        row = location.get("row", 0) if isinstance(location, dict) else 0
+        column = location.get("column", 0) if isinstance(location, dict) else 0
+
+        # Extract fix data
+        fix_data = item.get("fix") or {}
+        fix_applicable = fix_data.get("applicability", "") == "applicable" if isinstance(fix_data, dict) else False
+
+        issues.append({
+            "file": item.get("filename", ""),
+            "line": row,
+            "column": column,
+            "code": item.get("code", ""),
+            "message": item.get("message", ""),
+            "fix_available": fix_applicable,
+        })
+    return issues
+
+
+async def _run(cmd: List[str], stdin: Optional[str] = None) -> Tuple[int, str, str]:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=subprocess.PIPE if stdin is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate(stdin.encode("utf-8") if stdin is not None else None)
+    return (
+        proc.returncode if proc.returncode is not None else -1,
+        stdout.decode("utf-8") if stdout else "",
+        stderr.decode("utf-8").strip() if stderr else "",
+    )
+
+
+async def check_code(code: str, config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Check a code snippet by piping it to Ruff over stdin.
+
+    Args:
+        code: The Python code to check
+        config: Optional configuration settings for Ruff
+
+    Returns:
+        List of issues found (without the "file" key)
+
+    Raises:
+        RuffError: If Ruff could not be run or failed
+    """
+    cmd = ["ruff", "check", "--output-format=json", "--stdin-filename", SNIPPET_FILENAME]
+    cmd.extend(ruff_config_args(config))
+    cmd.append("-")
+
+    try:
+        returncode, stdout_text, stderr_text = await _run(cmd, code)
+    except Exception as e:
+        print(f"ERROR: Failed to run ruff check: {e}")
+        raise RuffError(f"Failed to run ruff check: {e}") from e
+
+    if stderr_text:
+        print(f"WARNING: Ruff stderr: {stderr_text}")
+    check_returncode(returncode, stderr_text)
+
+    issues = parse_issues(stdout_text.strip())
+    for issue in issues:
+        issue.pop("file", None)
+    return issues
+
+
+async def fix_code(code: str, config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Apply Ruff's automatic fixes to a code snippet over stdin.
+
+    Args:
+        code: The Python code to fix
+        config: Optional configuration settings for Ruff
+
+    Returns:
+        The fixed code, or None if Ruff failed
+    """
+    cmd = ["ruff", "check", "--fix", "--stdin-filename", SNIPPET_FILENAME]
+    cmd.extend(ruff_config_args(config))
+    cmd.append("-")
+
+    try:
+        returncode, stdout_text, stderr_text = await _run(cmd, code)
+    except Exception as e:
+        print(f"ERROR: Failed to run ruff fix: {e}")
+        return None
+
+    # Exit code 1 only means unfixable issues remain; the fixed source is still on stdout
+    if returncode not in (0, 1):
+        if stderr_text:
+            print(f"WARNING: Ruff fix stderr: {stderr_text}")
+        return None
+    return stdout_text
+
+
+class SnippetCheckBatcher:
+    """Coalesces concurrent snippet checks into a single Ruff invocation.
+
+    Checks that arrive within a short window and share a configuration are written to one
+    temporary directory and linted by one `ruff check` process. A lone check is piped over
+    stdin without touching the file system.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 64) -> None:
+        """Initialize the batcher.
+
+        Args:
+            window: Seconds to wait for more checks before running Ruff
+            max_batch: Maximum number of snippets per Ruff invocation
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[str, List[Tuple[str, "asyncio.Future[List[Dict[str, Any]]]"]]] = {}
+        self._configs: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.invocations = 0
+
+    async def check(self, code: str, config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Check a code snippet, possibly together with other concurrent checks.
+
+        Args:
+            code: The Python code to check
+            config: Optional configuration settings for Ruff
+
+        Returns:
+            List of issues found
+
+        Raises:
+            RuffError: If Ruff could not be run or failed
+        """
+        key = config_key(config)
+        future: "asyncio.Future[List[Dict[str, Any]]]" = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((code, future))
+        self._configs[key] = config
+        if len(batch) == 1:
+            self._spawn(self._flush_later(key))
+        elif len(batch) >= self.max_batch:
+            self._start(key)
+        return await future
+
+    async def _flush_later(self, key: str) -> None:
+        await asyncio.sleep(self.window)
+        self._start(key)
+
+    def _start(self, key: str) -> None:
+        batch = self._pending.pop(key, None)
+        if batch:
+            self._spawn(self._run_batch(batch, self._configs.get(key)))
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        # Keep a reference so pending tasks are not garbage collected
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(
+        self,
+        batch: List[Tuple[str, "asyncio.Future[List[Dict[str, Any]]]"]],
+        config: Optional[Dict[str, Any]],
+    ) -> None:
+        # Identical snippets in the same batch are linted once
+        unique: Dict[str, List["asyncio.Future[List[Dict[str, Any]]]"]] = {}
+        for code, future in batch:
+            unique.setdefault(code, []).append(future)
+
+        self.invocations += 1
+        try:
+            if len(unique) == 1:
+                code = next(iter(unique))
+                results = {code: await check_code(code, config)}
+            else:
+                results = await self._check_many(list(unique), config)
+        except Exception as e:
+            print(f"ERROR: Batched ruff check failed: {e}")
+            error = e if isinstance(e, RuffError) else RuffError(f"Batched ruff check failed: {e}")
+            for futures in unique.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+            return
+
+        for code, futures in unique.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result([dict(issue) for issue in results.get(code, [])])
+
+    async def _check_many(
+        self, snippets: List[str], config: Optional[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        with tempfile.TemporaryDirectory(prefix="ruff-batch-") as tmpdir:
+            files: Dict[str, str] = {}
+            for index, code in enumerate(snippets):
+                file_path = os.path.join(tmpdir, f"snippet_{index}.py")
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(code)
+                files[os.path.realpath(file_path)] = code
+
+            cmd = ["ruff", "check", "--output-format=json"]
+            cmd.extend(ruff_config_args(config))
+            cmd.extend(files)
+            try:
+                returncode, stdout_text, stderr_text = await _run(cmd)
+            except Exception as e:
+                print(f"ERROR: Failed to run ruff check: {e}")
+                raise RuffError(f"Failed to run ruff check: {e}") from e
+            if stderr_text:
+                print(f"WARNING: Ruff stderr: {stderr_text}")
+            check_returncode(returncode, stderr_text)
+
+            results: Dict[str, List[Dict[str, Any]]] = {code: [] for code in snippets}
+            for issue in parse_issues(stdout_text.strip()):
+                code = files.get(os.path.realpath(issue.pop("file", "")))
+                if code is not None:
+                    results[code].append(issue)
+            return results
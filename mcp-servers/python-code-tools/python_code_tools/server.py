@@ -38,8 +38,18 @@ def create_mcp_server(host: str = "localhost", port: int = 3001) -> FastMCP:
         Returns:
             A dictionary containing the fixed code, issues found, and fix counts
         """
-        result = await ruff_linter.lint_code(code, fix, config)
-        return result.model_dump()
+        try:
+            result = await ruff_linter.lint_code(code, fix, config)
+            return result.model_dump()
+        except Exception as e:
+            # Report the failure instead of an empty (clean-looking) issue list
+            return {
+                "error": str(e),
+                "fixed_code": code,
+                "issues": [],
+                "fixed_count": 0,
+                "remaining_count": 0,
+            }
 
     @mcp.tool()
     async def lint_project(
@@ -47,6 +57,7 @@ def create_mcp_server(host: str = "localhost", port: int = 3001) -> FastMCP:
         file_patterns: Optional[List[str]] = None,
         fix: bool = True,
         config: Optional[Dict[str, Any]] = None,
+        incremental: bool = True,
     ) -> Dict[str, Any]:
         """Lint a Python project directory and optionally fix issues.
 
@@ -55,12 +66,13 @@ def create_mcp_server(host: str = "localhost", port: int = 3001) -> FastMCP:
             file_patterns: Optional list of file patterns to include (e.g., ["*.py", "src/**/*.py"])
             fix: Whether to automatically fix issues when possible
             config: Optional configuration settings for the linter
+            incremental: Reuse results for files unchanged since the previous call
 
         Returns:
             A dictionary containing issues found, fix counts, and modified files
         """
         try:
-            result = await project_linter.lint_project(project_path, file_patterns, fix, config)
+            result = await project_linter.lint_project(project_path, file_patterns, fix, config, incremental)
             # Explicitly convert to dict to ensure proper serialization
             return result.model_dump()
         except Exception as e:
@@ -74,6 +86,15 @@ def create_mcp_server(host: str = "localhost", port: int = 3001) -> FastMCP:
                 "modified_files": [],
             }
 
+    @mcp.tool()
+    async def get_lint_cache_stats() -> Dict[str, Any]:
+        """Get hit/miss statistics of the code snippet lint caches.
+
+        Returns:
+            A dictionary of cache sizes, hit and miss counts, and Ruff invocations
+        """
+        return ruff_linter.cache_stats()
+
     return mcp
 
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for Recipe Executor startup.
+
+Spawns fresh interpreters that import the executor and resolve the steps a simple
+read_files/write_files recipe needs, and reports the median wall time together with
+the heavy dependencies that ended up loaded. Pass --steps to resolve other step types
+(for example `--steps llm_generate`) and compare.
+
+Usage:
+    uv run python benchmarks/bench_import_time.py --runs 10
+    uv run python -X importtime -c "import recipe_executor.executor" 2> importtime.log
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import List
+
+# Modules that should only be imported when a recipe needs them
+HEAVY_MODULES = ["pydantic_ai", "openai", "anthropic", "azure.identity", "mcp", "yaml", "docpack_file"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from recipe_executor.executor import Executor
+from recipe_executor.steps.registry import STEP_REGISTRY
+for step_type in {steps!r}:
+    STEP_REGISTRY[step_type]
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_probe(steps: List[str]) -> dict:
+    code = _PROBE.format(steps=steps, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Recipe Executor import time")
+    parser.add_argument("--runs", type=int, default=10, help="Number of fresh interpreter runs")
+    parser.add_argument(
+        "--steps",
+        nargs="*",
+        default=["read_files", "write_files"],
+        help="Step types to resolve after importing the executor",
+    )
+    args = parser.parse_args()
+
+    results = [run_probe(args.steps) for _ in range(args.runs)]
+    timings = [result["elapsed"] for result in results]
+
+    print(f"Steps resolved: {', '.join(args.steps) or '(none)'}")
+    print(f"Import time over {args.runs} runs: median={statistics.median(timings) * 1000:.1f} ms")
+    print(f"  min={min(timings) * 1000:.1f} ms max={max(timings) * 1000:.1f} ms")
+    print(f"Heavy modules loaded: {', '.join(results[-1]['loaded']) or '(none)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -70,6 +70,81 @@ class RecipeExecutorConfig(BaseSettings):
         description="Base URL for Ollama API",
     )
 
+    # Hedged LLM requests (disabled unless LLM_HEDGE_PERCENTILE is set)
+    llm_hedge_percentile: Optional[float] = Field(
+        default=None,
+        alias="LLM_HEDGE_PERCENTILE",
+        description="Latency percentile of a model after which a duplicate request is sent",
+    )
+    llm_hedge_max: Optional[int] = Field(
+        default=None,
+        alias="LLM_HEDGE_MAX",
+        description="Maximum duplicate requests per LLM call (default 1)",
+    )
+    llm_hedge_budget: Optional[float] = Field(
+        default=None,
+        alias="LLM_HEDGE_BUDGET",
+        description="Maximum fraction of LLM calls that may be hedged (default 0.1)",
+    )
+    llm_hedge_model: Optional[str] = Field(
+        default=None,
+        alias="LLM_HEDGE_MODEL",
+        description="Model id for duplicate requests (default: the request's own model)",
+    )
+    llm_hedge_min_samples: Optional[int] = Field(
+        default=None,
+        alias="LLM_HEDGE_MIN_SAMPLES",
+        description="Latency samples a model needs before its calls are hedged (default 20)",
+    )
+
+    # Model fallback chains
+    llm_breaker_failures: Optional[int] = Field(
+        default=None,
+        alias="LLM_BREAKER_FAILURES",
+        description="Consecutive failures that open a provider's circuit breaker (default 3)",
+    )
+    llm_breaker_cooldown: Optional[float] = Field(
+        default=None,
+        alias="LLM_BREAKER_COOLDOWN",
+        description="Seconds an open circuit breaker rejects calls before a trial call (default 30)",
+    )
+    llm_quotas: Optional[str] = Field(
+        default=None,
+        alias="LLM_QUOTAS",
+        description="Requests per minute per provider or model, e.g. 'azure=60,openai/gpt-4o=200'",
+    )
+
+    # Provider prompt caching
+    llm_prompt_cache: Optional[bool] = Field(
+        default=None,
+        alias="LLM_PROMPT_CACHE",
+        description="Mark system prompts for provider caching where it must be requested (default true)",
+    )
+
+    # Batch loops
+    llm_batch_poll_interval: Optional[float] = Field(
+        default=None,
+        alias="LLM_BATCH_POLL_INTERVAL",
+        description="Seconds between status checks of a submitted LLM batch (default 30)",
+    )
+    llm_batch_max_requests: Optional[int] = Field(
+        default=None,
+        alias="LLM_BATCH_MAX_REQUESTS",
+        description="Maximum requests per submitted LLM batch (default 10000)",
+    )
+    llm_batch_backend: Optional[str] = Field(
+        default=None,
+        alias="LLM_BATCH_BACKEND",
+        description="Batch backend for every model, e.g. 'fake' for the local test endpoint",
+    )
+
+    # Prompt token budgets
+    llm_context_windows: Optional[str] = Field(
+        default=None,
+        alias="LLM_CONTEXT_WINDOWS",
+        description="Context window sizes in tokens per model, e.g. 'ollama/phi4=16384,gpt-4o=128000'",
+    )
+
     model_config = SettingsConfigDict(
         env_prefix="RECIPE_EXECUTOR_",
         env_file=".env",
@@ -4,6 +4,7 @@ import copy
 import json
 
 from recipe_executor.protocols import ContextProtocol
+from recipe_executor.utils.accumulator import materialize
 
 __all__ = ["Context"]
 
@@ -27,9 +28,10 @@ class Context(ContextProtocol):
     def __getitem__(self, key: str) -> Any:
         """
         Retrieve an artifact by key. Raises KeyError if not found.
+        Accumulated values are materialized before being returned.
         """
         try:
-            return self._artifacts[key]
+            return materialize(self._artifacts[key])
         except KeyError:
             raise KeyError(f"Key '{key}' not found in Context.")
 
@@ -73,6 +75,14 @@ class Context(ContextProtocol):
         """
         Get the value for key if present, otherwise return default.
         """
+        if key not in self._artifacts:
+            return default
+        return materialize(self._artifacts[key])
+
+    def get_raw(self, key: str, default: Any = None) -> Any:
+        """
+        Get the stored value for key without materializing accumulators.
+        """
         return self._artifacts.get(key, default)
 
     def clone(self) -> ContextProtocol:
@@ -86,7 +96,7 @@ class Context(ContextProtocol):
         """
         Return a deep copy of the artifacts as a standard dict.
         """
-        return copy.deepcopy(self._artifacts)
+        return copy.deepcopy({key: materialize(value) for key, value in self._artifacts.items()})
 
     def json(self) -> str:
         """
@@ -3,22 +3,54 @@ import os
 import json
 import logging
 import inspect
+import contextvars
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Union, Dict, Any
+from typing import Callable, Optional, Tuple, Union, Dict, Any
 
 from recipe_executor.protocols import ExecutorProtocol, ContextProtocol
 from recipe_executor.models import Recipe
 from recipe_executor.steps.registry import STEP_REGISTRY
 
 
+@dataclass(frozen=True)
+class StepEvent:
+    """
+    A recipe or step lifecycle event reported to step-event callbacks.
+
+    kind is "recipe_started" (with recipe_path when the recipe was loaded from a file),
+    "step_started", "step_completed" or "step_failed" (with step_index, step_type and,
+    for failures, error).
+    """
+
+    kind: str
+    recipe_path: Optional[str] = None
+    step_index: Optional[int] = None
+    step_type: Optional[str] = None
+    error: Optional[BaseException] = None
+
+
+StepCallback = Callable[[StepEvent], None]
+
+# Callbacks of the executors this code runs under; nested executors (loop, parallel and
+# sub-recipe steps) inherit them, so one callback observes a whole run
+_step_callbacks: contextvars.ContextVar[Tuple[StepCallback, ...]] = contextvars.ContextVar(
+    "recipe_executor_step_callbacks", default=()
+)
+
+
 class Executor(ExecutorProtocol):
     """
     Concrete implementation of ExecutorProtocol. Loads, validates, and executes
     recipes step by step using a shared context. Stateless between runs.
+
+    An optional on_step callback receives a StepEvent for the recipe and every step it
+    runs, including the steps of nested recipes, loops and parallel blocks.
     """
 
-    def __init__(self, logger: logging.Logger) -> None:
+    def __init__(self, logger: logging.Logger, on_step: Optional[StepCallback] = None) -> None:
         self.logger = logger
+        self.on_step = on_step
 
     async def execute(
         self,
@@ -76,6 +108,18 @@ class Executor(ExecutorProtocol):
         step_count = len(recipe_model.steps or [])  # type: ignore
         self.logger.debug(f"Recipe loaded: {{'steps': {step_count}}}. Full recipe: {summary}")
 
+        callbacks = _step_callbacks.get()
+        if self.on_step is not None:
+            callbacks = callbacks + (self.on_step,)
+        token = _step_callbacks.set(callbacks)
+        try:
+            recipe_path = str(recipe) if isinstance(recipe, (str, Path)) and os.path.isfile(str(recipe)) else None
+            self._emit(StepEvent("recipe_started", recipe_path=recipe_path))
+            await self._execute_steps(recipe_model, context)
+        finally:
+            _step_callbacks.reset(token)
+
+    async def _execute_steps(self, recipe_model: Recipe, context: ContextProtocol) -> None:
         # Execute steps sequentially
         for idx, step in enumerate(recipe_model.steps or []):  # type: ignore
             step_type = step.type
@@ -88,14 +132,25 @@ class Executor(ExecutorProtocol):
             step_cls = STEP_REGISTRY[step_type]
             step_instance = step_cls(self.logger, config)
 
+            self._emit(StepEvent("step_started", step_index=idx, step_type=step_type))
             try:
                 result = step_instance.execute(context)
                 if inspect.isawaitable(result):  # type: ignore
                     await result
             except Exception as e:
+                self._emit(StepEvent("step_failed", step_index=idx, step_type=step_type, error=e))
                 msg = f"Error executing step {idx} ('{step_type}'): {e}"
                 raise ValueError(msg) from e
 
             self.logger.debug(f"Step {idx} ('{step_type}') completed successfully.")
+            self._emit(StepEvent("step_completed", step_index=idx, step_type=step_type))
 
         self.logger.debug("All recipe steps completed successfully.")
+
+    def _emit(self, event: StepEvent) -> None:
+        # Observers must not be able to break a run
+        for callback in _step_callbacks.get():
+            try:
+                callback(event)
+            except Exception as e:
+                self.logger.warning(f"Step event callback failed on {event.kind}: {e}")
@@ -0,0 +1,548 @@
+"""
+Provider batch-API execution for LLM calls made inside a batch loop.
+
+A `loop` step with `batch: true` runs every item at once under a `BatchCollector`. Each
+`LLM.generate` call made by an item is parked instead of being sent; once every running
+item is waiting on a parked call, the collector submits them as provider batches (one per
+model: OpenAI/Azure Batch, Anthropic Message Batches), polls until they end and resolves
+each waiting call with its own result. Items then carry on, so a second LLM call per item
+forms the next batch round.
+
+Batches trade latency (minutes to hours) for roughly half the token price and much higher
+throughput limits, which suits large overnight generation jobs.
+
+`FakeBatchBackend` (selected with `LLM_BATCH_BACKEND=fake`) answers requests locally, for
+exercising batch recipes without provider calls.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Type, Union
+
+from pydantic import BaseModel
+
+from recipe_executor.protocols import ContextProtocol
+
+__all__ = [
+    "BATCH_BACKENDS",
+    "BatchBackend",
+    "BatchCollector",
+    "BatchRequest",
+    "BatchResult",
+    "FakeBatchBackend",
+    "current_batch",
+]
+
+# Providers whose requests can go through a batch API
+BATCH_PROVIDERS = ("openai", "azure", "anthropic")
+
+# Name of the tool used to request structured output, as PydanticAI does for direct calls
+_OUTPUT_TOOL = "final_result"
+
+_fake_batch_ids = itertools.count(1)
+
+_current_collector: contextvars.ContextVar[Optional["BatchCollector"]] = contextvars.ContextVar(
+    "recipe_executor_batch_collector", default=None
+)
+_current_item: contextvars.ContextVar[Optional[object]] = contextvars.ContextVar(
+    "recipe_executor_batch_item", default=None
+)
+
+
+def current_batch() -> Optional["BatchCollector"]:
+    """The collector of the batch loop item this code runs in, if any."""
+    if _current_item.get() is None:
+        return None
+    return _current_collector.get()
+
+
+@dataclass
+class BatchRequest:
+    """A rendered LLM call waiting to be sent in a batch."""
+
+    custom_id: str
+    model_id: str
+    prompt: str
+    system_prompt: Optional[str]
+    max_tokens: Optional[int]
+    output_type: Type[Union[str, BaseModel]]
+
+    @property
+    def model_name(self) -> str:
+        return self.model_id.split("/")[1]
+
+    def output_schema(self) -> Optional[Dict[str, Any]]:
+        """JSON schema of a structured output type, None for text."""
+        if isinstance(self.output_type, type) and issubclass(self.output_type, BaseModel):
+            return self.output_type.model_json_schema()
+        return None
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of one request in a batch: text, the arguments of the structured-output
+    tool call (dict or JSON string), or an error message.
+    """
+
+    output: Any = None
+    error: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+
+
+class BatchBackend(ABC):
+    """Submits one batch of requests for a single model and collects the results."""
+
+    def __init__(self, model_id: str, context: ContextProtocol, logger: logging.Logger) -> None:
+        self.model_id = model_id
+        self.context = context
+        self.logger = logger
+
+    @abstractmethod
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        """Submit requests and return the provider's batch id."""
+
+    @abstractmethod
+    async def poll(self, batch_id: str) -> bool:
+        """Return True once the batch has ended (completed, failed, expired or cancelled)."""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        """Results of an ended batch keyed by custom_id; missing ids count as failed."""
+
+    async def cancel(self, batch_id: str) -> None:
+        """Best-effort cancellation of a batch nobody is waiting for any more."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI and Azure OpenAI Batch API over chat completions."""
+
+    def __init__(self, model_id: str, context: ContextProtocol, logger: logging.Logger) -> None:
+        super().__init__(model_id, context, logger)
+        from recipe_executor.llm_utils.llm import get_model
+
+        self.client: Any = get_model(model_id, context, logger).client  # type: ignore[union-attr]
+        parts = model_id.split("/")
+        self.is_azure = parts[0].lower() == "azure"
+        if self.is_azure:
+            # Azure batch requests name the (global batch) deployment instead of the model
+            config = context.get_config()
+            self.model = parts[2] if len(parts) == 3 else config.get("azure_openai_deployment_name") or parts[1]
+            self.url = "/chat/completions"
+        else:
+            self.model = parts[1]
+            self.url = "/v1/chat/completions"
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        lines = [
+            json.dumps({"custom_id": request.custom_id, "method": "POST", "url": self.url, "body": self._body(request)})
+            for request in requests
+        ]
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        input_file = await self.client.files.create(file=("batch.jsonl", payload), purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.url,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> bool:
+        batch = await self.client.batches.retrieve(batch_id)
+        return batch.status in ("completed", "failed", "expired", "cancelled")
+
+    async def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        batch = await self.client.batches.retrieve(batch_id)
+        results: Dict[str, BatchResult] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry["custom_id"]] = self._result(entry)
+        if batch.status != "completed":
+            self.logger.warning("OpenAI batch %s ended with status %s", batch_id, batch.status)
+        return results
+
+    async def cancel(self, batch_id: str) -> None:
+        await self.client.batches.cancel(batch_id)
+
+    def _body(self, request: BatchRequest) -> Dict[str, Any]:
+        messages: List[Dict[str, Any]] = []
+        if request.system_prompt:
+            messages.append({"role": "system", "content": request.system_prompt})
+        messages.append({"role": "user", "content": request.prompt})
+        body: Dict[str, Any] = {"model": self.model, "messages": messages}
+        if request.max_tokens is not None:
+            body["max_completion_tokens"] = request.max_tokens
+        schema = request.output_schema()
+        if schema is not None:
+            body["tools"] = [
+                {
+                    "type": "function",
+                    "function": {"name": _OUTPUT_TOOL, "description": "The final response", "parameters": schema},
+                }
+            ]
+            body["tool_choice"] = {"type": "function", "function": {"name": _OUTPUT_TOOL}}
+        return body
+
+    @staticmethod
+    def _result(entry: Dict[str, Any]) -> BatchResult:
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            error = entry.get("error") or body.get("error") or f"status {response.get('status_code')}"
+            return BatchResult(error=str(error))
+        usage = {
+            "request_tokens": (body.get("usage") or {}).get("prompt_tokens", 0),
+            "response_tokens": (body.get("usage") or {}).get("completion_tokens", 0),
+        }
+        message = (body.get("choices") or [{}])[0].get("message") or {}
+        for tool_call in message.get("tool_calls") or []:
+            if tool_call.get("function", {}).get("name") == _OUTPUT_TOOL:
+                return BatchResult(output=tool_call["function"].get("arguments"), usage=usage)
+        return BatchResult(output=message.get("content") or "", usage=usage)
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API."""
+
+    def __init__(self, model_id: str, context: ContextProtocol, logger: logging.Logger) -> None:
+        super().__init__(model_id, context, logger)
+        from recipe_executor.llm_utils.llm import get_model
+
+        self.client: Any = get_model(model_id, context, logger).client  # type: ignore[union-attr]
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        batch = await self.client.messages.batches.create(
+            requests=[{"custom_id": request.custom_id, "params": self._params(request)} for request in requests]
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> bool:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        results: Dict[str, BatchResult] = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != "succeeded":
+                error = getattr(result, "error", None) or result.type
+                results[entry.custom_id] = BatchResult(error=str(error))
+                continue
+            message = result.message
+            usage = {
+                "request_tokens": message.usage.input_tokens,
+                "response_tokens": message.usage.output_tokens,
+            }
+            tool_inputs = [block.input for block in message.content if block.type == "tool_use"]
+            if tool_inputs:
+                results[entry.custom_id] = BatchResult(output=tool_inputs[0], usage=usage)
+            else:
+                text = "".join(block.text for block in message.content if block.type == "text")
+                results[entry.custom_id] = BatchResult(output=text, usage=usage)
+        return results
+
+    async def cancel(self, batch_id: str) -> None:
+        await self.client.messages.batches.cancel(batch_id)
+
+    @staticmethod
+    def _params(request: BatchRequest) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "model": request.model_name,
+            "max_tokens": request.max_tokens or 4096,
+            "messages": [{"role": "user", "content": request.prompt}],
+        }
+        if request.system_prompt:
+            # Batched requests share prompt caching with direct ones
+            params["system"] = [{"type": "text", "text": request.system_prompt, "cache_control": {"type": "ephemeral"}}]
+        schema = request.output_schema()
+        if schema is not None:
+            params["tools"] = [{"name": _OUTPUT_TOOL, "description": "The final response", "input_schema": schema}]
+            params["tool_choice"] = {"type": "tool", "name": _OUTPUT_TOOL}
+        return params
+
+
+class FakeBatchBackend(BatchBackend):
+    """
+    Local stand-in for a provider batch endpoint.
+
+    Each request is answered by `responder(request)` when given, otherwise text requests
+    echo their prompt and structured requests get a minimal object matching their schema.
+    A batch ends `delay` seconds after submission.
+    """
+
+    responder: Optional[Callable[[BatchRequest], Any]] = None
+    delay: float = 0.0
+
+    def __init__(self, model_id: str, context: ContextProtocol, logger: logging.Logger) -> None:
+        super().__init__(model_id, context, logger)
+        self._batches: Dict[str, Any] = {}
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        batch_id = f"fake-batch-{next(_fake_batch_ids)}"
+        self._batches[batch_id] = (time.monotonic() + self.delay, list(requests))
+        return batch_id
+
+    async def poll(self, batch_id: str) -> bool:
+        return time.monotonic() >= self._batches[batch_id][0]
+
+    async def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        results: Dict[str, BatchResult] = {}
+        for request in self._batches.pop(batch_id)[1]:
+            try:
+                output = self._respond(request)
+            except Exception as err:
+                results[request.custom_id] = BatchResult(error=str(err))
+            else:
+                results[request.custom_id] = BatchResult(output=output)
+        return results
+
+    def _respond(self, request: BatchRequest) -> Any:
+        responder = type(self).responder
+        if responder is not None:
+            return responder(request)
+        schema = request.output_schema()
+        if schema is None:
+            return request.prompt
+        return _example_value(schema, schema)
+
+
+def _example_value(schema: Dict[str, Any], root: Dict[str, Any]) -> Any:
+    """Smallest value of a JSON schema, following local $refs."""
+    if "$ref" in schema:
+        target: Any = root
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        return _example_value(target, root)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if schema.get(combinator):
+            return _example_value(schema[combinator][0], root)
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+    if schema_type == "object" or "properties" in schema:
+        return {name: _example_value(sub, root) for name, sub in (schema.get("properties") or {}).items()}
+    return {"array": [], "string": "", "integer": 0, "number": 0.0, "boolean": False}.get(str(schema_type))
+
+
+# Batch backend classes by provider. LLM_BATCH_BACKEND names an entry to use for every model.
+BATCH_BACKENDS: Dict[str, Type[BatchBackend]] = {
+    "openai": OpenAIBatchBackend,
+    "azure": OpenAIBatchBackend,
+    "anthropic": AnthropicBatchBackend,
+    "fake": FakeBatchBackend,
+}
+
+
+@dataclass
+class _Pending:
+    request: BatchRequest
+    item: object
+    future: "asyncio.Future[Any]"
+
+
+class BatchCollector:
+    """
+    Parks the LLM calls of concurrently running loop items and sends them as batches once
+    every running item is waiting on one.
+    """
+
+    def __init__(self, context: ContextProtocol, logger: logging.Logger) -> None:
+        config = context.get_config()
+        self.context = context
+        self.logger = logger
+        self.poll_interval = float(config.get("llm_batch_poll_interval") or 30.0)
+        self.max_requests = int(config.get("llm_batch_max_requests") or 10000)
+        self.backend_name: Optional[str] = config.get("llm_batch_backend") or None
+        if self.backend_name is not None and self.backend_name not in BATCH_BACKENDS:
+            raise ValueError(
+                f"Unsupported batch backend: {self.backend_name!r}. Supported: {', '.join(BATCH_BACKENDS)}"
+            )
+        self._active: Set[object] = set()
+        self._expected = 0
+        # Items waiting on nested batch loop items, and how many of those each has running
+        self._suspended: Set[object] = set()
+        self._children: Dict[object, int] = {}
+        self._pending: List[_Pending] = []
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._next_id = 0
+        self.rounds = 0
+
+    def accepts(self, model_id: str) -> bool:
+        """Whether calls to model_id can be batched (others run directly)."""
+        if self.backend_name is not None:
+            return True
+        return model_id.split("/", 1)[0].lower() in BATCH_PROVIDERS
+
+    def expect(self, count: int) -> None:
+        """Announce items that are scheduled but not started, so no batch is sent without them."""
+        self._expected += count
+
+    @asynccontextmanager
+    async def item(self) -> AsyncIterator[None]:
+        """Run one loop item under this collector; must be entered in the item's own task."""
+        token = object()
+        parent = _current_item.get()
+        if parent is not None:
+            self._children[parent] = self._children.get(parent, 0) + 1
+        collector_token = _current_collector.set(self)
+        item_token = _current_item.set(token)
+        self._expected = max(self._expected - 1, 0)
+        self._active.add(token)
+        try:
+            yield
+        finally:
+            self._active.discard(token)
+            if parent is not None:
+                self._children[parent] -= 1
+                if not self._children[parent]:
+                    del self._children[parent]
+            _current_item.reset(item_token)
+            _current_collector.reset(collector_token)
+            self._maybe_flush()
+
+    @asynccontextmanager
+    async def suspend_item(self) -> AsyncIterator[None]:
+        """
+        Leave the current item out of the flush condition while it waits on nested batch
+        loop items, which join this collector so a whole outline level batches together.
+        Once those have all finished, the item holds back flushes again until it resumes.
+        """
+        token = _current_item.get()
+        self._active.discard(token)
+        if token is not None:
+            self._suspended.add(token)
+        try:
+            yield
+        finally:
+            if token is not None:
+                self._suspended.discard(token)
+                self._active.add(token)
+
+    async def generate(
+        self,
+        prompt: str,
+        model_id: str,
+        max_tokens: Optional[int],
+        output_type: Type[Union[str, BaseModel]],
+        system_prompt: Optional[str] = None,
+    ) -> Union[str, BaseModel]:
+        """Park a call until its batch has ended and return its output."""
+        self._next_id += 1
+        request = BatchRequest(
+            custom_id=f"req-{self._next_id}",
+            model_id=model_id,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            output_type=output_type,
+        )
+        pending = _Pending(request, _current_item.get(), asyncio.get_running_loop().create_future())
+        self._pending.append(pending)
+        self._maybe_flush()
+        try:
+            return await pending.future
+        finally:
+            if pending in self._pending:
+                self._pending.remove(pending)
+
+    async def close(self) -> None:
+        """Cancel batches still in flight (after a fail-fast loop abort)."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _maybe_flush(self) -> None:
+        waiting = {pending.item for pending in self._pending}
+        if not self._pending or self._expected or not self._active <= waiting:
+            return
+        if any(token not in self._children for token in self._suspended):
+            return
+        batch, self._pending = self._pending, []
+        self.rounds += 1
+        groups: Dict[str, List[_Pending]] = {}
+        for pending in batch:
+            groups.setdefault(pending.request.model_id, []).append(pending)
+        for model_id, group in groups.items():
+            for start in range(0, len(group), self.max_requests):
+                task = asyncio.create_task(self._run(model_id, group[start : start + self.max_requests]))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, model_id: str, group: List[_Pending]) -> None:
+        backend_name = self.backend_name or model_id.split("/", 1)[0].lower()
+        batch_id: Optional[str] = None
+        backend: Optional[BatchBackend] = None
+        start = time.time()
+        try:
+            backend = BATCH_BACKENDS[backend_name](model_id, self.context, self.logger)
+            batch_id = await backend.submit([pending.request for pending in group])
+            self.logger.info(
+                "LLM batch %s submitted: model_id=%s requests=%d round=%d",
+                batch_id,
+                model_id,
+                len(group),
+                self.rounds,
+            )
+            while not await backend.poll(batch_id):
+                await asyncio.sleep(self.poll_interval)
+            results = await backend.results(batch_id)
+        except asyncio.CancelledError:
+            if backend is not None and batch_id is not None:
+                try:
+                    await backend.cancel(batch_id)
+                except Exception as err:
+                    self.logger.warning("Could not cancel LLM batch %s: %s", batch_id, err)
+            raise
+        except Exception as err:
+            self.logger.error("LLM batch for model_id=%s failed: %s", model_id, err)
+            for pending in group:
+                if not pending.future.done():
+                    pending.future.set_exception(err)
+            return
+
+        failed = 0
+        request_tokens = response_tokens = 0
+        for pending in group:
+            result = results.get(pending.request.custom_id) or BatchResult(error="no result returned by the batch")
+            request_tokens += result.usage.get("request_tokens", 0)
+            response_tokens += result.usage.get("response_tokens", 0)
+            if pending.future.done():
+                continue
+            try:
+                if result.error is not None:
+                    raise RuntimeError(f"Batch request {pending.request.custom_id} failed: {result.error}")
+                pending.future.set_result(_to_output(pending.request, result.output))
+            except Exception as err:
+                failed += 1
+                pending.future.set_exception(err)
+        self.logger.info(
+            "LLM batch %s ended: time=%.3f sec requests=%d failed=%d tokens (req=%d res=%d)",
+            batch_id,
+            time.time() - start,
+            len(group),
+            failed,
+            request_tokens,
+            response_tokens,
+        )
+
+
+def _to_output(request: BatchRequest, output: Any) -> Union[str, BaseModel]:
+    if request.output_schema() is None:
+        return output if isinstance(output, str) else json.dumps(output)
+    model: Type[BaseModel] = request.output_type  # type: ignore[assignment]
+    if isinstance(output, str):
+        return model.model_validate_json(output)
+    return model.model_validate(output)
@@ -0,0 +1,299 @@
+"""
+Prompt token budgets for LLM calls.
+
+`PromptBudget` counts a rendered prompt locally and, when it is over budget, shrinks the
+reference material it was rendered from (the context values named in `keys`) and renders it
+again, instead of letting the provider reject the request:
+
+- "error": raise before sending.
+- "truncate": drop trailing list items (retrieved chunks are ranked, so the least relevant
+  go first) or cut text, largest value first.
+- "summarize": replace the material with LLM summaries sized to fit, truncating any remainder.
+- "split": send the prompt once per part of the largest value; the caller merges the outputs.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from recipe_executor.llm_utils.tokens import count_tokens
+from recipe_executor.protocols import ContextProtocol
+
+__all__ = ["BUDGET_STRATEGIES", "PromptBudget"]
+
+BUDGET_STRATEGIES = ("error", "truncate", "summarize", "split")
+
+# Tokens added per message by chat formatting
+_MESSAGE_OVERHEAD = 8
+# Shrink rounds before giving up on a prompt
+_MAX_ROUNDS = 8
+
+RenderedPrompt = Tuple[Optional[str], str]
+Render = Callable[[ContextProtocol], RenderedPrompt]
+Summarize = Callable[[str, int], Awaitable[str]]
+
+
+class PromptBudget:
+    """Fits the prompt of one LLM call into a token budget."""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        model_id: str,
+        limit: int,
+        strategy: str = "error",
+        keys: Optional[Sequence[str]] = None,
+    ) -> None:
+        if strategy not in BUDGET_STRATEGIES:
+            raise ValueError(f"Unsupported budget strategy: {strategy!r}. Supported: {', '.join(BUDGET_STRATEGIES)}")
+        self.logger = logger
+        self.model_id = model_id
+        self.limit = limit
+        self.strategy = strategy
+        self.keys: List[str] = list(keys or [])
+        # Filled in by fit()
+        self.prompt_tokens = 0
+        self.applied: Optional[str] = None
+        self.sent_tokens: List[int] = []
+
+    def count(self, system_prompt: Optional[str], prompt: str) -> int:
+        tokens = count_tokens(prompt, self.model_id) + _MESSAGE_OVERHEAD
+        if system_prompt:
+            tokens += count_tokens(system_prompt, self.model_id) + _MESSAGE_OVERHEAD
+        return tokens
+
+    async def fit(
+        self,
+        render: Render,
+        context: ContextProtocol,
+        summarize: Optional[Summarize] = None,
+    ) -> List[RenderedPrompt]:
+        """
+        Render the prompt and return the prompts to send: one, or several with "split".
+
+        Raises:
+            ValueError: The prompt is over budget and cannot be brought under it.
+        """
+        rendered = render(context)
+        self.prompt_tokens = self.count(*rendered)
+        if self.prompt_tokens <= self.limit:
+            self.sent_tokens = [self.prompt_tokens]
+            return [rendered]
+
+        values = {key: context.get(key) for key in self.keys if _has_content(context.get(key))}
+        if self.strategy == "error" or not values:
+            raise ValueError(
+                f"Prompt for {self.model_id} is {self.prompt_tokens} tokens, over its budget of {self.limit}"
+                + ("" if values or self.strategy == "error" else f"; none of {self.keys} can be shrunk")
+            )
+
+        self.logger.info(
+            "Prompt for model_id=%s is %d tokens, over its budget of %d; applying %s to %s",
+            self.model_id,
+            self.prompt_tokens,
+            self.limit,
+            self.strategy,
+            sorted(values),
+        )
+        self.applied = self.strategy
+        if self.strategy == "split":
+            prompts = self._split(render, context, values)
+        else:
+            if self.strategy == "summarize":
+                if summarize is None:
+                    raise ValueError("The summarize budget strategy needs a summarizer")
+                values = await self._summarize(render, context, values, summarize)
+            prompts = [self._truncate(render, context, values)]
+        self.sent_tokens = [self.count(*prompt) for prompt in prompts]
+        return prompts
+
+    def _render_with(self, render: Render, context: ContextProtocol, values: Dict[str, Any]) -> RenderedPrompt:
+        trimmed = context.clone()
+        for key, value in values.items():
+            trimmed[key] = value
+        return render(trimmed)
+
+    def _truncate(self, render: Render, context: ContextProtocol, values: Dict[str, Any]) -> RenderedPrompt:
+        values = dict(values)
+        rendered = self._render_with(render, context, values)
+        tokens = self.count(*rendered)
+        for _ in range(_MAX_ROUNDS):
+            if tokens <= self.limit:
+                return rendered
+            candidates = [key for key in values if _has_content(values[key])]
+            if not candidates:
+                break
+            key = max(candidates, key=lambda name: self._value_tokens(values[name]))
+            values[key] = self._shrink(values[key], tokens - self.limit)
+            rendered = self._render_with(render, context, values)
+            tokens = self.count(*rendered)
+        if tokens <= self.limit:
+            return rendered
+        raise ValueError(
+            f"Prompt for {self.model_id} is still {tokens} tokens after truncating {sorted(values)}, "
+            f"over its budget of {self.limit}"
+        )
+
+    async def _summarize(
+        self,
+        render: Render,
+        context: ContextProtocol,
+        values: Dict[str, Any],
+        summarize: Summarize,
+    ) -> Dict[str, Any]:
+        values = dict(values)
+        overflow = self.prompt_tokens - self.limit
+        for key in sorted(values, key=lambda name: self._value_tokens(values[name]), reverse=True):
+            value_tokens = self._value_tokens(values[key])
+            target = max(value_tokens - overflow, 64)
+            values[key] = await self._summarize_value(values[key], target / max(value_tokens, 1), summarize)
+            overflow = self.count(*self._render_with(render, context, values)) - self.limit
+            if overflow <= 0:
+                break
+        return values
+
+    async def _summarize_value(self, value: Any, ratio: float, summarize: Summarize) -> Any:
+        async def shorten(text: str) -> str:
+            # Pieces are kept well inside the budget so each summary request fits
+            pieces = _split_text(text, self.model_id, max(self.limit // 2, 256))
+            summaries = await asyncio.gather(
+                *(summarize(piece, max(int(count_tokens(piece, self.model_id) * ratio), 32)) for piece in pieces)
+            )
+            return "\n\n".join(summaries)
+
+        if isinstance(value, str):
+            return await shorten(value)
+        items = copy.deepcopy(list(value))
+        texts = await asyncio.gather(*(shorten(_item_text(item)) for item in items))
+        return [_with_text(item, text) for item, text in zip(items, texts)]
+
+    def _split(self, render: Render, context: ContextProtocol, values: Dict[str, Any]) -> List[RenderedPrompt]:
+        key = max(values, key=lambda name: self._value_tokens(values[name]))
+        value = values[key]
+        empty: Any = "" if isinstance(value, str) else []
+        base_tokens = self.count(*self._render_with(render, context, {key: empty}))
+        available = self.limit - base_tokens
+        if available <= 0:
+            raise ValueError(
+                f"Prompt for {self.model_id} is {base_tokens} tokens without {key!r}, over its budget of {self.limit}"
+            )
+
+        # Leave headroom for the markup the template adds around each item
+        capacity = int(available * 0.9)
+        if isinstance(value, str):
+            parts: List[Any] = _split_text(value, self.model_id, capacity)
+        else:
+            parts = []
+            current: List[Any] = []
+            used = 0
+            for item in value:
+                item_tokens = count_tokens(_item_text(item), self.model_id)
+                if current and used + item_tokens > capacity:
+                    parts.append(current)
+                    current, used = [], 0
+                current.append(item)
+                used += item_tokens
+            if current:
+                parts.append(current)
+
+        prompts = [self._truncate(render, context, {**values, key: part}) for part in parts]
+        self.logger.info("Split prompt for model_id=%s into %d parts along %r", self.model_id, len(prompts), key)
+        return prompts
+
+    def _value_tokens(self, value: Any) -> int:
+        if isinstance(value, str):
+            return count_tokens(value, self.model_id)
+        return sum(count_tokens(_item_text(item), self.model_id) for item in value)
+
+    def _shrink(self, value: Any, overflow: int) -> Any:
+        """
+        Remove at least `overflow` tokens from a value (with some slack for markup when cutting
+        text). Lists first lose trailing items; their last item is only cut in a later round,
+        against the overflow left after re-rendering.
+        """
+        if isinstance(value, str):
+            return _cut(value, self._keep_ratio(value, overflow))
+        items = list(value)
+        if len(items) > 1:
+            # Dropped items take their markup with them, so no slack is needed
+            removed = 0
+            while len(items) > 1 and removed < overflow:
+                removed += count_tokens(_item_text(items.pop()), self.model_id)
+            return items
+        # A single item is left: cut its text instead
+        item = items[0]
+        text = _item_text(item)
+        return [_with_text(copy.deepcopy(item), _cut(text, self._keep_ratio(text, overflow)))]
+
+    def _keep_ratio(self, text: str, overflow: int) -> float:
+        """Fraction of text to keep so that at least `overflow` tokens (plus slack) are removed."""
+        target = int(overflow * 1.1) + 16
+        text_tokens = count_tokens(text, self.model_id)
+        return max(text_tokens - target, 0) / max(text_tokens, 1)
+
+
+def _has_content(value: Any) -> bool:
+    if isinstance(value, str):
+        return bool(value)
+    return isinstance(value, list) and bool(value)
+
+
+def _item_text(item: Any) -> str:
+    """The text of a list item: itself, the longest string field of a dict, or its JSON."""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        strings = [value for value in item.values() if isinstance(value, str)]
+        if strings:
+            return max(strings, key=len)
+    return json.dumps(item, default=str)
+
+
+def _with_text(item: Any, text: str) -> Any:
+    """Replace the text of a list item (see _item_text)."""
+    if isinstance(item, dict):
+        strings = [key for key, value in item.items() if isinstance(value, str)]
+        if strings:
+            item[max(strings, key=lambda key: len(item[key]))] = text
+            return item
+    return text if isinstance(item, str) else item
+
+
+def _cut(text: str, keep: float) -> str:
+    """Keep the leading `keep` fraction of text, ending at a line break where possible."""
+    if keep <= 0:
+        return ""
+    end = int(len(text) * keep)
+    if end >= len(text):
+        return text
+    newline = text.rfind("\n", 0, end)
+    if newline > end * 0.8:
+        end = newline
+    return text[:end] + "\n[truncated]"
+
+
+def _split_text(text: str, model_id: str, max_tokens: int) -> List[str]:
+    """Split text at paragraph (or line) breaks into pieces of at most about max_tokens."""
+    pieces: List[str] = []
+    current: List[str] = []
+    used = 0
+    for paragraph in text.split("\n\n"):
+        paragraph_tokens = count_tokens(paragraph, model_id)
+        if paragraph_tokens > max_tokens:
+            # Hard-wrap oversized paragraphs by characters
+            chars = max(int(len(paragraph) * max_tokens / paragraph_tokens), 1)
+            subparts = [paragraph[start : start + chars] for start in range(0, len(paragraph), chars)]
+        else:
+            subparts = [paragraph]
+        for part in subparts:
+            part_tokens = count_tokens(part, model_id)
+            if current and used + part_tokens > max_tokens:
+                pieces.append("\n\n".join(current))
+                current, used = [], 0
+            current.append(part)
+            used += part_tokens
+    if current:
+        pieces.append("\n\n".join(current))
+    return pieces
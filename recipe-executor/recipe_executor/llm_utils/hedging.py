@@ -0,0 +1,235 @@
+"""
+Hedged LLM requests for the Recipe Executor.
+
+When a request has not completed within a high percentile of its model's observed latency,
+a duplicate is sent (to the same model or a fallback model) and the first successful result
+wins. Thresholds come from per-model latency histograms, so they adapt to each provider, and
+a budget caps the share of requests that may be duplicated.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+__all__ = ["HedgePolicy", "LatencyHistogram", "HedgeTracker", "hedge_tracker", "run_hedged"]
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with exponential decay.
+
+    Buckets grow by `growth` from `min_seconds`, so percentiles are accurate to within one
+    bucket (about 15% by default). Once `window` samples have been recorded all counts are
+    halved, which keeps the histogram tracking recent latency.
+    """
+
+    def __init__(self, min_seconds: float = 0.05, growth: float = 1.15, buckets: int = 80, window: int = 500):
+        self.min_seconds = min_seconds
+        self.growth = growth
+        self.window = window
+        self._counts: List[float] = [0.0] * buckets
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> float:
+        return self._total
+
+    def record(self, seconds: float) -> None:
+        index = self._bucket(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            if self._total >= self.window:
+                self._counts = [count / 2 for count in self._counts]
+                self._total /= 2
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile, or None when empty."""
+        with self._lock:
+            if self._total <= 0:
+                return None
+            target = self._total * min(max(percent, 0.0), 100.0) / 100.0
+            cumulative = 0.0
+            for index, count in enumerate(self._counts):
+                cumulative += count
+                if count and cumulative >= target:
+                    return self._upper_bound(index)
+            return self._upper_bound(len(self._counts) - 1)
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.min_seconds:
+            return 0
+        index = int(math.log(seconds / self.min_seconds, self.growth)) + 1
+        return min(index, len(self._counts) - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        return self.min_seconds * self.growth**index
+
+
+@dataclass
+class HedgePolicy:
+    """
+    When and how to duplicate slow LLM requests.
+
+    Fields:
+        percentile: Latency percentile of the model after which a duplicate is sent.
+        max_hedges: Maximum duplicates per request.
+        budget: Maximum fraction of requests that may be hedged.
+        fallback_model: Model for duplicates; the request's own model when None.
+        min_samples: Latency samples a model needs before its requests are hedged.
+        min_delay: Lower bound in seconds for the hedge threshold.
+    """
+
+    percentile: float = 95.0
+    max_hedges: int = 1
+    budget: float = 0.1
+    fallback_model: Optional[str] = None
+    min_samples: int = 20
+    min_delay: float = 1.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["HedgePolicy"]:
+        """Build a policy from executor configuration; None when hedging is not enabled."""
+        percentile = config.get("llm_hedge_percentile")
+        if not percentile:
+            return None
+        policy = cls(percentile=float(percentile))
+        if config.get("llm_hedge_max") is not None:
+            policy.max_hedges = int(config["llm_hedge_max"])
+        if config.get("llm_hedge_budget") is not None:
+            policy.budget = float(config["llm_hedge_budget"])
+        if config.get("llm_hedge_model"):
+            policy.fallback_model = str(config["llm_hedge_model"])
+        if config.get("llm_hedge_min_samples") is not None:
+            policy.min_samples = int(config["llm_hedge_min_samples"])
+        return policy
+
+
+class HedgeTracker:
+    """Process-wide latency histograms per model and the hedge budget accounting."""
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def histogram(self, model_id: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self._histograms.get(model_id)
+            if histogram is None:
+                histogram = self._histograms[model_id] = LatencyHistogram()
+            return histogram
+
+    def threshold(self, model_id: str, policy: HedgePolicy) -> Optional[float]:
+        """Seconds to wait before hedging a request to model_id, or None if it has too few samples."""
+        histogram = self.histogram(model_id)
+        if histogram.count < policy.min_samples:
+            return None
+        value = histogram.percentile(policy.percentile)
+        return None if value is None else max(value, policy.min_delay)
+
+    def start_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_hedge(self, policy: HedgePolicy) -> bool:
+        """Reserve a hedge if the budget allows one."""
+        with self._lock:
+            if self.hedges + 1 > policy.budget * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_win(self, hedged: bool) -> None:
+        if hedged:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = dict(self._histograms)
+            stats: Dict[str, Any] = {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+        stats["p50"] = {model_id: histogram.percentile(50) for model_id, histogram in models.items()}
+        stats["p95"] = {model_id: histogram.percentile(95) for model_id, histogram in models.items()}
+        return stats
+
+
+hedge_tracker = HedgeTracker()
+
+
+async def run_hedged(
+    call: Callable[[str], Awaitable[T]],
+    model_id: str,
+    policy: Optional[HedgePolicy],
+    logger: logging.Logger,
+    tracker: Optional[HedgeTracker] = None,
+) -> Tuple[T, str]:
+    """
+    Run call(model_id), sending duplicates when it is slower than the policy's threshold.
+
+    Returns the first successful result and the model that produced it. Latency of every
+    attempt is recorded; attempts cancelled because another won are recorded with their
+    elapsed time, a lower bound that keeps thresholds from drifting down. If every attempt
+    fails, the error of the original request is raised.
+    """
+    tracker = tracker or hedge_tracker
+    tracker.start_request()
+
+    attempts: Dict["asyncio.Task[T]", Tuple[str, float]] = {}
+
+    def launch(target_model: str) -> None:
+        attempts[asyncio.ensure_future(call(target_model))] = (target_model, time.monotonic())
+
+    launch(model_id)
+    primary = next(iter(attempts))
+    hedges = 0
+    pending = set(attempts)
+    try:
+        while pending:
+            timeout = None
+            if policy is not None and hedges < policy.max_hedges:
+                threshold = tracker.threshold(model_id, policy)
+                if threshold is not None:
+                    timeout = max(0.0, attempts[primary][1] + threshold * (hedges + 1) - time.monotonic())
+
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                attempt_model, started = attempts[task]
+                if task.exception() is None:
+                    tracker.histogram(attempt_model).record(time.monotonic() - started)
+                    tracker.record_win(task is not primary)
+                    if task is not primary:
+                        logger.info("Hedged LLM request won model_id=%s after %d hedge(s)", attempt_model, hedges)
+                    return task.result(), attempt_model
+                logger.debug("LLM attempt failed model_id=%s error=%s", attempt_model, task.exception())
+
+            if not done and policy is not None and tracker.try_hedge(policy):
+                hedges += 1
+                hedge_model = policy.fallback_model or model_id
+                logger.info(
+                    "LLM request model_id=%s exceeded p%g latency, hedging to model_id=%s",
+                    model_id,
+                    policy.percentile,
+                    hedge_model,
+                )
+                launch(hedge_model)
+                pending = {task for task in attempts if not task.done()}
+            elif not done and policy is not None:
+                hedges = policy.max_hedges  # Budget exhausted; wait without further hedges
+
+        raise primary.exception() or RuntimeError("LLM request failed")
+    finally:
+        for task, (attempt_model, started) in attempts.items():
+            if not task.done():
+                task.cancel()
+                tracker.histogram(attempt_model).record(time.monotonic() - started)
@@ -1,28 +1,31 @@
 # This file was generated by Codebase-Generator, do not edit directly
+from __future__ import annotations
+
 import time
 import logging
-from typing import Optional, List, Type, Union, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Type, Union, Dict, Any
 
 from pydantic import BaseModel
-from pydantic_ai import Agent
-from pydantic_ai.settings import ModelSettings
-from pydantic_ai.models.openai import (
-    OpenAIModel,
-    OpenAIResponsesModel,
-    OpenAIResponsesModelSettings,
-)
-from pydantic_ai.models.anthropic import AnthropicModel
-from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.providers.anthropic import AnthropicProvider
-from pydantic_ai.mcp import MCPServer
-
-from openai.types.responses import WebSearchToolParam, FileSearchToolParam
 
-from recipe_executor.llm_utils.azure_openai import get_azure_openai_model
-from recipe_executor.llm_utils.responses import get_openai_responses_model
-from recipe_executor.llm_utils.azure_responses import get_azure_responses_model
+from recipe_executor.llm_utils.batch import current_batch
+from recipe_executor.llm_utils.hedging import HedgePolicy, run_hedged
+from recipe_executor.llm_utils.prompt_cache import (
+    cache_usage,
+    get_anthropic_caching_model,
+    prompt_cache_enabled,
+    prompt_cache_stats,
+)
+from recipe_executor.llm_utils.routing import get_router, parse_model_ids
 from recipe_executor.protocols import ContextProtocol
 
+# Provider SDKs (pydantic_ai models, openai, anthropic, azure.identity, mcp) are imported
+# inside the functions that use them, so importing this module stays cheap and only the
+# provider a recipe actually uses gets loaded.
+if TYPE_CHECKING:
+    from pydantic_ai.mcp import MCPServer
+    from pydantic_ai.models.anthropic import AnthropicModel
+    from pydantic_ai.models.openai import OpenAIModel, OpenAIResponsesModel
+
 
 def get_model(
     model_id: str,
@@ -64,6 +67,9 @@ def get_model(
     if provider == "openai":
         if len(parts) != 2:
             raise ValueError(f"Invalid OpenAI model_id: '{model_id}'")
+        from pydantic_ai.models.openai import OpenAIModel
+        from pydantic_ai.providers.openai import OpenAIProvider
+
         model_name = parts[1]
         api_key = config.get("openai_api_key")
         provider_obj = OpenAIProvider(api_key=api_key)
@@ -77,6 +83,8 @@ def get_model(
             model_name, deployment = parts[1], parts[2]
         else:
             raise ValueError(f"Invalid Azure model_id: '{model_id}'")
+        from recipe_executor.llm_utils.azure_openai import get_azure_openai_model
+
         return get_azure_openai_model(
             logger=logger,
             model_name=model_name,
@@ -88,6 +96,11 @@ def get_model(
     if provider == "anthropic":
         if len(parts) != 2:
             raise ValueError(f"Invalid Anthropic model_id: '{model_id}'")
+        if prompt_cache_enabled(config):
+            return get_anthropic_caching_model(parts[1], config.get("anthropic_api_key"))
+        from pydantic_ai.models.anthropic import AnthropicModel
+        from pydantic_ai.providers.anthropic import AnthropicProvider
+
         model_name = parts[1]
         api_key = config.get("anthropic_api_key")
         provider_obj = AnthropicProvider(api_key=api_key)
@@ -97,6 +110,9 @@ def get_model(
     if provider == "ollama":
         if len(parts) != 2:
             raise ValueError(f"Invalid Ollama model_id: '{model_id}'")
+        from pydantic_ai.models.openai import OpenAIModel
+        from pydantic_ai.providers.openai import OpenAIProvider
+
         model_name = parts[1]
         base_url = config.get("ollama_base_url") or "http://localhost:11434"
         provider_obj = OpenAIProvider(base_url=f"{base_url}/v1")
@@ -106,6 +122,8 @@ def get_model(
     if provider == "openai_responses":
         if len(parts) != 2:
             raise ValueError(f"Invalid OpenAI Responses model_id: '{model_id}'")
+        from recipe_executor.llm_utils.responses import get_openai_responses_model
+
         model_name = parts[1]
         return get_openai_responses_model(logger, model_name)
 
@@ -117,6 +135,8 @@ def get_model(
             model_name, deployment = parts[1], parts[2]
         else:
             raise ValueError(f"Invalid Azure Responses model_id: '{model_id}'")
+        from recipe_executor.llm_utils.azure_responses import get_azure_responses_model
+
         return get_azure_responses_model(logger, model_name, deployment)
 
     raise ValueError(f"Unsupported LLM provider: '{provider}' in model_id '{model_id}'")
@@ -132,47 +152,96 @@ class LLM:
         self,
         logger: logging.Logger,
         context: ContextProtocol,
-        model: str = "openai/gpt-4o",
+        model: Union[str, List[str]] = "openai/gpt-4o",
         max_tokens: Optional[int] = None,
         mcp_servers: Optional[List[MCPServer]] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
     ):
         self.logger: logging.Logger = logger
         self.context: ContextProtocol = context
-        self.default_model_id: str = model
+        self.default_model_id: Union[str, List[str]] = model
         self.default_max_tokens: Optional[int] = max_tokens
         self.default_mcp_servers: List[MCPServer] = mcp_servers or []
+        self.hedge_policy: Optional[HedgePolicy] = hedge_policy
+        # Token usage of the calls made through this client (batched calls are logged by the batch)
+        self.usage: Dict[str, int] = {"requests": 0, "request_tokens": 0, "response_tokens": 0, "cached_tokens": 0}
 
     async def generate(
         self,
         prompt: str,
-        model: Optional[str] = None,
+        model: Optional[Union[str, List[str]]] = None,
         max_tokens: Optional[int] = None,
         output_type: Type[Union[str, BaseModel]] = str,
         mcp_servers: Optional[List[MCPServer]] = None,
         openai_builtin_tools: Optional[List[Dict[str, Any]]] = None,
+        routing: str = "fallback",
+        system_prompt: Optional[str] = None,
     ) -> Union[str, BaseModel]:
         """
         Generate an output from the LLM based on the provided prompt.
 
+        Inside a batch loop, calls without MCP servers or built-in tools are sent through the
+        provider's batch API (to the first model of a fallback chain) instead.
+
         Args:
             prompt: The prompt to send to the model.
-            model: Optional model identifier to override default.
+            model: Optional model identifier to override default. A list (or comma-separated
+                string) of identifiers is a fallback chain, tried in the order chosen by the router.
             max_tokens: Optional max tokens override.
             output_type: Desired return type (str or BaseModel).
             mcp_servers: Optional MCP servers override.
             openai_builtin_tools: Optional built-in tools for Responses API.
+            routing: How a fallback chain is ordered: "fallback" (as listed) or "latency"
+                (fastest healthy model first).
+            system_prompt: Optional static instructions and context sent ahead of the prompt.
+                Calls that repeat the same system prompt can have it served from the
+                provider's prompt cache.
 
         Returns:
             The model output as plain text or structured data.
 
         Raises:
-            ValueError: Invalid model identifier.
+            ValueError: Invalid model identifier or routing strategy.
             Exception: On network, API, or MCP errors.
         """
-        model_id = model or self.default_model_id
+        model_ids = parse_model_ids(model or self.default_model_id)
+        if not model_ids:
+            raise ValueError("No model_id given")
         tokens = max_tokens if max_tokens is not None else self.default_max_tokens
         servers = mcp_servers if mcp_servers is not None else self.default_mcp_servers
 
+        batch = current_batch()
+        if batch is not None and not servers and not openai_builtin_tools and batch.accepts(model_ids[0]):
+            self.logger.debug("LLM request for model_id=%s added to the current batch", model_ids[0])
+            return await batch.generate(prompt, model_ids[0], tokens, output_type, system_prompt)
+
+        if len(model_ids) == 1:
+            return await self._generate_with_model(
+                prompt, model_ids[0], tokens, output_type, servers, openai_builtin_tools, system_prompt
+            )
+
+        router = get_router(self.context.get_config())
+        output, _ = await router.route(
+            model_ids,
+            lambda model_id: self._generate_with_model(
+                prompt, model_id, tokens, output_type, servers, openai_builtin_tools, system_prompt
+            ),
+            self.logger,
+            routing,
+        )
+        return output
+
+    async def _generate_with_model(
+        self,
+        prompt: str,
+        model_id: str,
+        tokens: Optional[int],
+        output_type: Type[Union[str, BaseModel]],
+        servers: List[MCPServer],
+        openai_builtin_tools: Optional[List[Dict[str, Any]]],
+        system_prompt: Optional[str] = None,
+    ) -> Union[str, BaseModel]:
+        """Generate with a single model, hedging slow requests when a policy is configured."""
         provider_name = model_id.split("/", 1)[0]
         self.logger.info(
             "LLM generate using provider=%s model_id=%s",
@@ -182,7 +251,8 @@ class LLM:
 
         output_name = getattr(output_type, "__name__", str(output_type))
         self.logger.debug(
-            "LLM request prompt=%r model_id=%s max_tokens=%s output_type=%s mcp_servers=%s",
+            "LLM request system_prompt=%r prompt=%r model_id=%s max_tokens=%s output_type=%s mcp_servers=%s",
+            system_prompt,
             prompt,
             model_id,
             tokens,
@@ -191,37 +261,31 @@ class LLM:
         )
 
         try:
-            model_instance = get_model(model_id, self.context, self.logger)
+            primary_agent = self._build_agent(
+                model_id, output_type, servers, tokens, openai_builtin_tools, system_prompt
+            )
         except ValueError as err:
             self.logger.error("Invalid model_id '%s': %s", model_id, err)
             raise
 
-        agent_kwargs: Dict[str, Any] = {
-            "model": model_instance,
-            "output_type": output_type,
-            "mcp_servers": servers,
-        }
-
-        # Configure built-in tools for Responses API
-        if provider_name in ("openai_responses", "azure_responses") and openai_builtin_tools:
-            typed_tools: List[Union[WebSearchToolParam, FileSearchToolParam]] = []
-            for tool in openai_builtin_tools:
-                try:
-                    typed_tools.append(WebSearchToolParam(**tool))
-                except TypeError:
-                    typed_tools.append(FileSearchToolParam(**tool))
-            settings = OpenAIResponsesModelSettings(openai_builtin_tools=typed_tools)
-            agent_kwargs["model_settings"] = settings
-        # Configure token limit for non-Responses providers
-        elif tokens is not None:
-            agent_kwargs["model_settings"] = ModelSettings(max_tokens=tokens)
+        async def run_attempt(attempt_model_id: str) -> Any:
+            if attempt_model_id == model_id:
+                agent = primary_agent
+            else:
+                agent = self._build_agent(
+                    attempt_model_id, output_type, servers, tokens, openai_builtin_tools, system_prompt
+                )
+            async with agent.run_mcp_servers():
+                return await agent.run(prompt)
 
-        agent: Agent = Agent(**agent_kwargs)  # type: ignore
+        # MCP tool calls may have side effects, so requests using them are never duplicated
+        policy: Optional[HedgePolicy] = None
+        if not servers:
+            policy = self.hedge_policy or HedgePolicy.from_config(self.context.get_config())
 
         start = time.time()
         try:
-            async with agent.run_mcp_servers():
-                result = await agent.run(prompt)
+            result, result_model_id = await run_hedged(run_attempt, model_id, policy, self.logger)
         except Exception as err:
             self.logger.error(
                 "LLM call failed model_id=%s error=%s",
@@ -230,6 +294,8 @@ class LLM:
             )
             raise
         end = time.time()
+        if result_model_id != model_id:
+            self.logger.info("LLM result produced by hedge model_id=%s", result_model_id)
 
         duration = end - start
         try:
@@ -238,13 +304,21 @@ class LLM:
             usage = None
 
         if usage:
+            cache = cache_usage(usage)
+            prompt_cache_stats.record(result_model_id, usage.request_tokens or 0, cache)
+            self.usage["requests"] += usage.requests or 0
+            self.usage["request_tokens"] += usage.request_tokens or 0
+            self.usage["response_tokens"] += usage.response_tokens or 0
+            self.usage["cached_tokens"] += cache.read_tokens
             self.logger.info(
-                "LLM result time=%.3f sec requests=%d tokens_total=%d (req=%d res=%d)",
+                "LLM result time=%.3f sec requests=%d tokens_total=%d (req=%d res=%d cached=%d cache_write=%d)",
                 duration,
                 usage.requests,
                 usage.total_tokens,
                 usage.request_tokens,
                 usage.response_tokens,
+                cache.read_tokens,
+                cache.write_tokens,
             )
         else:
             self.logger.info(
@@ -255,3 +329,54 @@ class LLM:
         self.logger.debug("LLM raw result data=%r", result.data)
 
         return result.output
+
+    def _build_agent(
+        self,
+        model_id: str,
+        output_type: Type[Union[str, BaseModel]],
+        servers: List[MCPServer],
+        tokens: Optional[int],
+        openai_builtin_tools: Optional[List[Dict[str, Any]]],
+        system_prompt: Optional[str] = None,
+    ) -> Any:
+        """
+        Create a PydanticAI Agent for a model with the request's output type, tools and limits.
+
+        The system prompt is sent before the user prompt, so it forms a stable prefix that
+        providers can cache across calls.
+
+        Raises:
+            ValueError: Invalid model identifier.
+        """
+        model_instance = get_model(model_id, self.context, self.logger)
+        provider_name = model_id.split("/", 1)[0]
+
+        from pydantic_ai import Agent
+        from pydantic_ai.settings import ModelSettings
+
+        agent_kwargs: Dict[str, Any] = {
+            "model": model_instance,
+            "output_type": output_type,
+            "mcp_servers": servers,
+        }
+        if system_prompt:
+            agent_kwargs["system_prompt"] = system_prompt
+
+        # Configure built-in tools for Responses API
+        if provider_name in ("openai_responses", "azure_responses") and openai_builtin_tools:
+            from openai.types.responses import FileSearchToolParam, WebSearchToolParam
+            from pydantic_ai.models.openai import OpenAIResponsesModelSettings
+
+            typed_tools: List[Union[WebSearchToolParam, FileSearchToolParam]] = []
+            for tool in openai_builtin_tools:
+                try:
+                    typed_tools.append(WebSearchToolParam(**tool))
+                except TypeError:
+                    typed_tools.append(FileSearchToolParam(**tool))
+            settings = OpenAIResponsesModelSettings(openai_builtin_tools=typed_tools)
+            agent_kwargs["model_settings"] = settings
+        # Configure token limit for non-Responses providers
+        elif tokens is not None:
+            agent_kwargs["model_settings"] = ModelSettings(max_tokens=tokens)
+
+        return Agent(**agent_kwargs)  # type: ignore
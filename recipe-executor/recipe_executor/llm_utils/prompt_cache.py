@@ -0,0 +1,126 @@
+"""
+Provider prompt-prefix caching for the Recipe Executor.
+
+Calls that share a static system prompt (for example an outline and reference material
+repeated for every section of a document) can have that prefix cached by the provider, so
+later calls skip reprocessing it and are billed at the cached rate. OpenAI and Azure cache
+long prompt prefixes automatically once the static part comes first; Anthropic needs an
+explicit `cache_control` breakpoint, which the model returned by
+`get_anthropic_caching_model` adds after the system prompt.
+
+Cached-token counts reported by the providers are collected per model in `prompt_cache_stats`.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+__all__ = [
+    "CacheUsage",
+    "PromptCacheStats",
+    "cache_usage",
+    "get_anthropic_caching_model",
+    "prompt_cache_enabled",
+    "prompt_cache_stats",
+]
+
+_caching_model_class: Optional[type] = None
+
+
+def prompt_cache_enabled(config: Dict[str, Any]) -> bool:
+    """Whether system prompts should be marked for caching (LLM_PROMPT_CACHE, default on)."""
+    value = config.get("llm_prompt_cache")
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "off")
+    return bool(value)
+
+
+def get_anthropic_caching_model(model_name: str, api_key: Optional[str]) -> Any:
+    """
+    Create an Anthropic model whose system prompt carries an ephemeral cache breakpoint.
+
+    The breakpoint caches the tool definitions and the system prompt together, so requests
+    that repeat them (and the turns of a tool-calling run) read them from the cache.
+    """
+    from pydantic_ai.providers.anthropic import AnthropicProvider
+
+    return _anthropic_caching_model_class()(model_name=model_name, provider=AnthropicProvider(api_key=api_key))
+
+
+def _anthropic_caching_model_class() -> type:
+    global _caching_model_class
+    if _caching_model_class is None:
+        from pydantic_ai.models.anthropic import AnthropicModel
+
+        class AnthropicCachingModel(AnthropicModel):
+            async def _map_message(self, messages: Any) -> Any:  # type: ignore[override]
+                system_prompt, anthropic_messages = await super()._map_message(messages)
+                if isinstance(system_prompt, str) and system_prompt:
+                    system_prompt = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+                return system_prompt, anthropic_messages
+
+        _caching_model_class = AnthropicCachingModel
+    return _caching_model_class
+
+
+@dataclass
+class CacheUsage:
+    """Prompt tokens of one call that were read from, or written to, the provider cache."""
+
+    read_tokens: int = 0
+    write_tokens: int = 0
+
+
+def cache_usage(usage: Any) -> CacheUsage:
+    """
+    Extract cached-token counts from a PydanticAI usage object.
+
+    OpenAI and Azure report `cached_tokens`; Anthropic reports `cache_read_input_tokens`
+    and `cache_creation_input_tokens`.
+    """
+    details = getattr(usage, "details", None) or {}
+    read = details.get("cached_tokens") or details.get("cache_read_input_tokens") or 0
+    write = details.get("cache_creation_input_tokens") or 0
+    return CacheUsage(read_tokens=int(read), write_tokens=int(write))
+
+
+@dataclass
+class _ModelCacheTotals:
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+class PromptCacheStats:
+    """Process-wide totals of prompt and cached tokens per model id."""
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, _ModelCacheTotals] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_id: str, prompt_tokens: int, cache: CacheUsage) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(model_id, _ModelCacheTotals())
+            totals.requests += 1
+            totals.prompt_tokens += prompt_tokens
+            totals.cached_tokens += cache.read_tokens
+            totals.cache_write_tokens += cache.write_tokens
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model_id: {
+                    "requests": totals.requests,
+                    "prompt_tokens": totals.prompt_tokens,
+                    "cached_tokens": totals.cached_tokens,
+                    "cache_write_tokens": totals.cache_write_tokens,
+                    "hit_ratio": round(totals.cached_tokens / totals.prompt_tokens, 3) if totals.prompt_tokens else 0.0,
+                }
+                for model_id, totals in self._totals.items()
+            }
+
+
+prompt_cache_stats = PromptCacheStats()
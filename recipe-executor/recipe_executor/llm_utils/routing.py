@@ -0,0 +1,343 @@
+"""
+Model fallback chains and health-aware routing for the Recipe Executor.
+
+A request can name several model ids. The router orders them by health: providers whose
+circuit breaker is open or whose request quota is used up are skipped, and with the
+"latency" strategy healthy models are tried fastest first (by recent latency and error
+rate). Each model is tried in turn until one succeeds, so runs keep going while one
+provider is throttling or down.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+from recipe_executor.llm_utils.hedging import HedgeTracker, hedge_tracker
+
+__all__ = [
+    "ROUTING_STRATEGIES",
+    "CircuitBreaker",
+    "ModelRouter",
+    "is_transient_error",
+    "parse_model_ids",
+    "parse_quotas",
+    "get_router",
+]
+
+T = TypeVar("T")
+
+ROUTING_STRATEGIES = ("fallback", "latency")
+
+# Smoothing of the per-model error rate; each call moves it this far towards 0 or 1
+_ERROR_RATE_ALPHA = 0.2
+
+
+def parse_model_ids(model: Union[str, Sequence[str]]) -> List[str]:
+    """Split a model id, a comma-separated list of model ids, or a list of either into ids."""
+    items = [model] if isinstance(model, str) else list(model)
+    model_ids: List[str] = []
+    for item in items:
+        for part in str(item).split(","):
+            part = part.strip()
+            if part and part not in model_ids:
+                model_ids.append(part)
+    return model_ids
+
+
+def parse_quotas(value: Any) -> Dict[str, int]:
+    """Parse quotas given as a dict or a "provider=N,provider/model=N" string (requests per minute)."""
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return {str(key): int(limit) for key, limit in value.items()}
+    quotas: Dict[str, int] = {}
+    for part in str(value).split(","):
+        if "=" in part:
+            key, limit = part.split("=", 1)
+            quotas[key.strip()] = int(limit.strip())
+    return quotas
+
+
+def _provider(model_id: str) -> str:
+    return model_id.split("/", 1)[0].lower()
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether an LLM call failed because of the provider rather than the request: throttling
+    (429), server errors (5xx), timeouts and connection errors, also when wrapped in another
+    exception. Provider SDK errors are recognized by their `status_code` and class names, so
+    no SDK has to be imported.
+    """
+    seen: Set[int] = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (TimeoutError, ConnectionError)):
+            return True
+        status = getattr(current, "status_code", None)
+        if status is None:
+            status = getattr(getattr(current, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status in (408, 429) or status >= 500
+        names = [cls.__name__ for cls in type(current).__mro__]
+        if any("Timeout" in name or "Connect" in name for name in names) or "NetworkError" in names:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures and rejects calls for `cooldown`
+    seconds; then lets one trial call through (half-open) and closes again if it succeeds.
+    """
+
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+    failures: int = 0
+    opened_at: Optional[float] = None
+    trial_in_flight: bool = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class _Claim:
+    """A call claimed by `ModelRouter.acquire`: the quota slots taken and whether it is a breaker trial."""
+
+    model_id: str
+    at: float
+    quota_keys: List[str]
+    trial: bool
+
+
+@dataclass
+class _ModelHealth:
+    error_rate: float = 0.0
+    calls: int = 0
+
+
+class ModelRouter:
+    """Process-wide health tracking and ordering of candidate models."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        quotas: Optional[Dict[str, int]] = None,
+        latency: Optional[HedgeTracker] = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.quotas: Dict[str, int] = dict(quotas or {})
+        self.latency = latency or hedge_tracker
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._health: Dict[str, _ModelHealth] = {}
+        self._quota_windows: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Apply breaker and quota settings from executor configuration."""
+        with self._lock:
+            if config.get("llm_breaker_failures") is not None:
+                self.failure_threshold = int(config["llm_breaker_failures"])
+            if config.get("llm_breaker_cooldown") is not None:
+                self.cooldown = float(config["llm_breaker_cooldown"])
+            if config.get("llm_quotas") is not None:
+                self.quotas = parse_quotas(config["llm_quotas"])
+            for breaker in self._breakers.values():
+                breaker.failure_threshold = self.failure_threshold
+                breaker.cooldown = self.cooldown
+
+    def order(self, model_ids: Sequence[str], strategy: str = "fallback") -> List[str]:
+        """
+        Candidates in the order they should be tried.
+
+        Models whose provider breaker is open or whose quota is used up go last. With
+        "latency", the others are sorted by expected latency: recent p50 scaled up by the
+        recent error rate.
+        """
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unsupported routing strategy: {strategy!r}. Supported: {', '.join(ROUTING_STRATEGIES)}")
+        with self._lock:
+            available = [model_id for model_id in model_ids if self._available(model_id)]
+            blocked = [model_id for model_id in model_ids if model_id not in available]
+            if strategy == "latency":
+                positions = {model_id: index for index, model_id in enumerate(model_ids)}
+                available.sort(key=lambda model_id: (self._expected_latency(model_id), positions[model_id]))
+        return available + blocked
+
+    def acquire(self, model_id: str) -> Optional[_Claim]:
+        """
+        Claim a call to model_id: None if its provider breaker or a quota rejects it.
+
+        A claim must end in `record` (the call completed) or `release` (it did not).
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = [key for key in (model_id, _provider(model_id)) if key in self.quotas]
+            if any(len(self._quota_window(key, now)) >= self.quotas[key] for key in keys):
+                return None
+            breaker = self._breaker(model_id)
+            if not breaker.allow():
+                return None
+            for key in keys:
+                self._quota_windows[key].append(now)
+            return _Claim(model_id, now, keys, trial=breaker.trial_in_flight)
+
+    def release(self, claim: _Claim) -> None:
+        """Give back a claim whose call ended without a result (cancelled or invalid)."""
+        with self._lock:
+            if claim.trial:
+                # Let the next call be the half-open trial instead of blocking the provider for good
+                self._breaker(claim.model_id).trial_in_flight = False
+            for key in claim.quota_keys:
+                window = self._quota_windows.get(key)
+                if window is not None and claim.at in window:
+                    window.remove(claim.at)
+
+    def record(self, model_id: str, ok: bool) -> None:
+        with self._lock:
+            health = self._health.setdefault(model_id, _ModelHealth())
+            health.calls += 1
+            health.error_rate += _ERROR_RATE_ALPHA * ((0.0 if ok else 1.0) - health.error_rate)
+            breaker = self._breaker(model_id)
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "breakers": {provider: breaker.state for provider, breaker in self._breakers.items()},
+                "error_rates": {model_id: round(health.error_rate, 3) for model_id, health in self._health.items()},
+                "quota_usage": {
+                    key: len(self._quota_window(key, time.monotonic())) for key in list(self._quota_windows)
+                },
+            }
+
+    async def route(
+        self,
+        model_ids: Sequence[str],
+        call: Callable[[str], Awaitable[T]],
+        logger: logging.Logger,
+        strategy: str = "fallback",
+    ) -> Tuple[T, str]:
+        """
+        Call the candidates in routed order until one succeeds; return its result and model id.
+
+        Candidates rejected by their provider's breaker or a quota are skipped. Transient
+        failures (see `is_transient_error`) count against the model's health and fall back to
+        the next candidate. Request errors (an invalid model id, a rejected prompt) and
+        cancellation are raised immediately without being counted, giving back the claim
+        (breaker trial and quota slot) of the interrupted call. If every candidate fails the
+        last error is raised, and if none could be called a RuntimeError is raised.
+        """
+        last_error: Optional[BaseException] = None
+        ordered = self.order(model_ids, strategy)
+        for index, model_id in enumerate(ordered):
+            is_last = index == len(ordered) - 1
+            claim = self.acquire(model_id)
+            if claim is None:
+                logger.info("Skipping model_id=%s (provider circuit open or quota reached)", model_id)
+                continue
+            settled = False
+            try:
+                result = await call(model_id)
+                settled = True
+            except Exception as err:
+                if not is_transient_error(err):
+                    # The request itself was bad; another model or a healthy provider would not help
+                    raise
+                settled = True
+                self.record(model_id, ok=False)
+                last_error = err
+                if not is_last:
+                    logger.warning("LLM call to model_id=%s failed, falling back: %s", model_id, err)
+                continue
+            finally:
+                # Calls that end without a health outcome (cancelled, request errors) give back their claim
+                if not settled:
+                    self.release(claim)
+            self.record(model_id, ok=True)
+            if model_id != model_ids[0]:
+                logger.info("LLM call routed to model_id=%s", model_id)
+            return result, model_id
+
+        if last_error is not None:
+            raise last_error
+        raise RuntimeError(f"No model available: all of {list(model_ids)} are circuit-open or over quota")
+
+    def _breaker(self, model_id: str) -> CircuitBreaker:
+        provider = _provider(model_id)
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = self._breakers[provider] = CircuitBreaker(self.failure_threshold, self.cooldown)
+        return breaker
+
+    def _available(self, model_id: str) -> bool:
+        if self._breaker(model_id).state == "open":
+            return False
+        now = time.monotonic()
+        for key in (model_id, _provider(model_id)):
+            if key in self.quotas and len(self._quota_window(key, now)) >= self.quotas[key]:
+                return False
+        return True
+
+    def _quota_window(self, key: str, now: float) -> Deque[float]:
+        window = self._quota_windows.setdefault(key, deque())
+        while window and now - window[0] >= 60.0:
+            window.popleft()
+        return window
+
+    def _expected_latency(self, model_id: str) -> float:
+        p50 = self.latency.histogram(model_id).percentile(50)
+        if p50 is None:
+            return 0.0  # Unknown models are tried early so they get measured
+        health = self._health.get(model_id)
+        error_rate = health.error_rate if health else 0.0
+        return p50 / max(1.0 - error_rate, 0.05)
+
+
+_router = ModelRouter()
+
+
+def get_router(config: Optional[Dict[str, Any]] = None) -> ModelRouter:
+    """The shared router, with breaker and quota settings from config applied."""
+    if config:
+        _router.configure(config)
+    return _router
@@ -0,0 +1,153 @@
+"""
+Local prompt token counting and context-window sizes for the Recipe Executor.
+
+Prompts are counted before they are sent so oversized ones can be shrunk or rejected
+without a provider round trip. OpenAI-family models are counted exactly with tiktoken when
+it is installed; other models (and OpenAI without tiktoken) use a character-based estimate
+for their family. Tokenizers are loaded once per encoding and counts are cached by content
+hash, so static prompt parts repeated across calls are only counted once.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+__all__ = [
+    "context_window",
+    "count_tokens",
+    "parse_context_windows",
+    "tokenizer_name",
+]
+
+# Providers whose models use OpenAI tokenizers
+_OPENAI_FAMILY = ("openai", "azure", "openai_responses", "azure_responses")
+
+# Characters per token used when no exact tokenizer is available
+_CHARS_PER_TOKEN = {"anthropic": 3.5}
+_DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Context windows by model name prefix, most specific first. A prefix matches the whole name
+# or a name continuing with "-", so "gpt-4" covers "gpt-4-0613" but not "gpt-4.5-preview".
+_CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("gpt-4.1", 1_047_576),
+    ("gpt-4.5", 128_000),
+    ("gpt-4o", 128_000),
+    ("gpt-4-turbo", 128_000),
+    ("gpt-4-1106", 128_000),
+    ("gpt-4-0125", 128_000),
+    ("gpt-4-vision", 128_000),
+    ("gpt-4-32k", 32_768),
+    ("gpt-4", 8_192),
+    ("gpt-3.5", 16_385),
+    ("gpt-5", 400_000),
+    ("o1-mini", 128_000),
+    ("o1", 200_000),
+    ("o3", 200_000),
+    ("o4", 200_000),
+    ("claude", 200_000),
+)
+_DEFAULT_CONTEXT_WINDOW = 128_000
+
+_COUNT_CACHE_SIZE = 4096
+_count_cache: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+_count_lock = threading.Lock()
+
+
+def parse_context_windows(value: Any) -> Dict[str, int]:
+    """Parse context-window overrides given as a dict or a "model_id=N,model_name=N" string."""
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return {str(key): int(size) for key, size in value.items()}
+    windows: Dict[str, int] = {}
+    for part in str(value).split(","):
+        if "=" in part:
+            key, size = part.split("=", 1)
+            windows[key.strip()] = int(size.strip())
+    return windows
+
+
+def context_window(model_id: str, config: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Context window of a model in tokens: an `llm_context_windows` override for the model
+    id or name, else the known size for the model name prefix, else 128k (so models newer
+    than the table are not held to an older sibling's smaller window).
+    """
+    parts = model_id.split("/")
+    model_name = parts[1].lower() if len(parts) > 1 else model_id.lower()
+    overrides = parse_context_windows((config or {}).get("llm_context_windows"))
+    for key in (model_id, model_name):
+        if key in overrides:
+            return overrides[key]
+    for prefix, size in _CONTEXT_WINDOWS:
+        if model_name == prefix or model_name.startswith(prefix + "-"):
+            return size
+    return _DEFAULT_CONTEXT_WINDOW
+
+
+def tokenizer_name(model_id: str) -> str:
+    """Name of the tokenizer used for a model: a tiktoken encoding or "<family>-estimate"."""
+    provider = model_id.split("/", 1)[0].lower()
+    if provider in _OPENAI_FAMILY:
+        parts = model_id.split("/")
+        encoding = _encoding_for_model(parts[1] if len(parts) > 1 else model_id)
+        if encoding is not None:
+            return encoding.name
+    return f"{provider}-estimate"
+
+
+def count_tokens(text: str, model_id: str) -> int:
+    """Number of tokens text takes for model_id (exact for OpenAI models with tiktoken)."""
+    if not text:
+        return 0
+    name = tokenizer_name(model_id)
+    key = (name, hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest())
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            _count_cache.move_to_end(key)
+            return cached
+
+    encoding = _get_encoding(name)
+    if encoding is not None:
+        count = len(encoding.encode(text, disallowed_special=()))
+    else:
+        provider = name[: -len("-estimate")] if name.endswith("-estimate") else name
+        count = int(len(text) / _CHARS_PER_TOKEN.get(provider, _DEFAULT_CHARS_PER_TOKEN)) + 1
+
+    with _count_lock:
+        _count_cache[key] = count
+        if len(_count_cache) > _COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return count
+
+
+@lru_cache(maxsize=64)
+def _encoding_for_model(model_name: str) -> Any:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Models tiktoken does not know yet: recent families use o200k, older ones cl100k
+        recent = model_name.startswith(("gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4"))
+        return _get_encoding("o200k_base" if recent else "cl100k_base")
+    except Exception:
+        # Encodings are downloaded on first use; without network fall back to estimates
+        return None
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(name: str) -> Any:
+    if name.endswith("-estimate"):
+        return None
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception:
+        return None
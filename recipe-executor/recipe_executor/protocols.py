@@ -36,6 +36,8 @@ class ContextProtocol(Protocol):
 
     def get(self, key: str, default: Any = None) -> Any: ...
 
+    def get_raw(self, key: str, default: Any = None) -> Any: ...
+
     def clone(self) -> "ContextProtocol": ...
 
     def dict(self) -> Dict[str, Any]: ...
@@ -1,17 +1,8 @@
 # This file was generated by Codebase-Generator, do not edit directly
 
+from typing import Any
+
 from recipe_executor.steps.registry import STEP_REGISTRY
-from recipe_executor.steps.conditional import ConditionalStep
-from recipe_executor.steps.docpack_create import DocpackCreateStep
-from recipe_executor.steps.docpack_extract import DocpackExtractStep
-from recipe_executor.steps.execute_recipe import ExecuteRecipeStep
-from recipe_executor.steps.llm_generate import LLMGenerateStep
-from recipe_executor.steps.loop import LoopStep
-from recipe_executor.steps.mcp import MCPStep
-from recipe_executor.steps.parallel import ParallelStep
-from recipe_executor.steps.read_files import ReadFilesStep
-from recipe_executor.steps.set_context import SetContextStep
-from recipe_executor.steps.write_files import WriteFilesStep
 
 __all__ = [
     "STEP_REGISTRY",
@@ -24,21 +15,31 @@ __all__ = [
     "MCPStep",
     "ParallelStep",
     "ReadFilesStep",
+    "RetrieveChunksStep",
     "SetContextStep",
     "WriteFilesStep",
 ]
 
-# Register steps by updating the registry
-STEP_REGISTRY.update({
-    "conditional": ConditionalStep,
-    "docpack_create": DocpackCreateStep,
-    "docpack_extract": DocpackExtractStep,
-    "execute_recipe": ExecuteRecipeStep,
-    "llm_generate": LLMGenerateStep,
-    "loop": LoopStep,
-    "mcp": MCPStep,
-    "parallel": ParallelStep,
-    "read_files": ReadFilesStep,
-    "set_context": SetContextStep,
-    "write_files": WriteFilesStep,
-})
+# Step classes exported by this package, resolved through the lazy registry so that
+# importing recipe_executor.steps does not import every step module.
+_STEP_TYPES_BY_CLASS = {
+    "ConditionalStep": "conditional",
+    "DocpackCreateStep": "docpack_create",
+    "DocpackExtractStep": "docpack_extract",
+    "ExecuteRecipeStep": "execute_recipe",
+    "LLMGenerateStep": "llm_generate",
+    "LoopStep": "loop",
+    "MCPStep": "mcp",
+    "ParallelStep": "parallel",
+    "ReadFilesStep": "read_files",
+    "RetrieveChunksStep": "retrieve_chunks",
+    "SetContextStep": "set_context",
+    "WriteFilesStep": "write_files",
+}
+
+
+def __getattr__(name: str) -> Any:
+    step_type = _STEP_TYPES_BY_CLASS.get(name)
+    if step_type is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return STEP_REGISTRY[step_type]
@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from recipe_executor.protocols import ContextProtocol
 from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.utils.lazy_files import ensure_file
 from recipe_executor.utils.templates import render_template
 
 from docpack_file import DocpackHandler
@@ -111,6 +112,8 @@ class DocpackCreateStep(BaseStep[DocpackCreateConfig]):
         # Validate existence, warn and skip missing
         valid_paths: List[Path] = []
         for p in paths:
+            # Materialize resources of lazily extracted docpacks
+            ensure_file(str(p))
             if p.is_file():
                 valid_paths.append(p)
             else:
@@ -3,12 +3,14 @@
 DocpackExtractStep: Unpack .docpack archives to extract outline JSON and resources.
 """
 
+import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
 from recipe_executor.protocols import ContextProtocol
 from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.utils.lazy_files import register_lazy_file
 from recipe_executor.utils.templates import render_template
 
 # Attempt to import DocpackHandler from the docpack-file library
@@ -27,12 +29,15 @@ class DocpackExtractConfig(StepConfig):
         extract_dir (str): Directory to extract files to (may be templated).
         outline_key (str): Context key to store outline JSON (default "outline_data").
         resources_key (str): Context key to store resource file paths (default "resource_files").
+        lazy (bool): Only write outline.json up front; each resource is extracted the first time
+            a step reads it (default False).
     """
 
     docpack_path: str
     extract_dir: str
     outline_key: str = "outline_data"
     resources_key: str = "resource_files"
+    lazy: bool = False
 
 
 class DocpackExtractStep(BaseStep[DocpackExtractConfig]):
@@ -89,7 +94,10 @@ class DocpackExtractStep(BaseStep[DocpackExtractConfig]):
 
         # Perform extraction
         try:
-            outline_data, resource_files = DocpackHandler.extract_package(docpack_path, extract_dir)
+            if self.config.lazy:
+                outline_data, resource_files = self._extract_lazily(docpack_path, extract_dir)
+            else:
+                outline_data, resource_files = DocpackHandler.extract_package(docpack_path, extract_dir)
         except Exception as e:
             msg = f"Failed to extract .docpack archive at {docpack_path}: {e}"
             self.logger.error(msg)
@@ -122,4 +130,47 @@ class DocpackExtractStep(BaseStep[DocpackExtractConfig]):
         context[resources_key] = abs_resources
 
         count = len(abs_resources)
-        self.logger.info(f"Successfully extracted {count} resource file(s) from {docpack_path} into {extract_dir}")
+        if self.config.lazy:
+            self.logger.info(f"Opened {docpack_path} with {count} lazily extracted resource file(s) in {extract_dir}")
+        else:
+            self.logger.info(f"Successfully extracted {count} resource file(s) from {docpack_path} into {extract_dir}")
+
+    def _extract_lazily(self, docpack_path: Path, extract_dir: Path) -> Tuple[Dict[str, Any], List[Path]]:
+        """
+        Write outline.json and register each resource to be extracted on first read.
+
+        Resource paths point to the same locations as a full extraction would produce.
+        """
+        with DocpackHandler.open_package(docpack_path) as reader:
+            outline_data = reader.outline
+            resource_names = set(reader.resource_names())
+
+        with open(extract_dir / "outline.json", "w", encoding="utf-8") as f:
+            json.dump(outline_data, f, indent=2)
+
+        files_dir = extract_dir / "files"
+        resource_files: List[Path] = []
+        resources_list = outline_data.get("resources") if isinstance(outline_data, dict) else None
+        for resource in resources_list if isinstance(resources_list, list) else []:
+            if not isinstance(resource, dict) or not resource.get("path"):
+                continue
+            name = str(resource["path"])
+            if name not in resource_names:
+                continue
+            target = files_dir / name
+            register_lazy_file(str(target), _resource_extractor(docpack_path, name, files_dir))
+            resource["path"] = str(target)
+            resource_files.append(target)
+
+        self.logger.debug(f"Registered {len(resource_files)} lazy resource file(s) from {docpack_path}")
+        return outline_data, resource_files
+
+
+def _resource_extractor(docpack_path: Path, name: str, files_dir: Path) -> Callable[[], Path]:
+    """Create a callable that extracts a single resource from a docpack."""
+
+    def extract() -> Path:
+        with DocpackHandler.open_package(docpack_path) as reader:
+            return reader.extract_resource(name, files_dir)
+
+    return extract
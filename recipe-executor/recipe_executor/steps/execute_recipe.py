@@ -10,15 +10,46 @@ from recipe_executor.utils.templates import render_template
 
 __all__ = ["ExecuteRecipeConfig", "ExecuteRecipeStep"]
 
+# Key of the structured override form {"context_path": "outline.sections"}
+CONTEXT_PATH_KEY = "context_path"
+
+
+def _is_context_path(value: Any) -> bool:
+    """
+    Return True if the value is a structured context-path reference.
+    """
+    return isinstance(value, dict) and list(value.keys()) == [CONTEXT_PATH_KEY]  # type: ignore
+
+
+def _resolve_context_path(path: str, context: ContextProtocol) -> Any:
+    """
+    Resolve a dot-notated path (mapping keys or list indexes) against the context,
+    returning the existing object without copying or stringifying it.
+    """
+    current: Any = context
+    for part in path.split("."):
+        if isinstance(current, (ContextProtocol, dict)) and part in current:
+            current = current[part]  # type: ignore
+        elif isinstance(current, list) and part.isdigit() and int(part) < len(current):  # type: ignore
+            current = current[int(part)]  # type: ignore
+        else:
+            raise KeyError(f"Context path '{path}' not found (missing '{part}').")
+    return current
+
 
 def _render_override(value: Any, context: ContextProtocol) -> Any:
     """
     Recursively render and parse override values:
+    - Structured references ({"context_path": "a.b"}) bind the referenced object directly.
     - Strings are template-rendered, then if the result is a valid Python literal
       (dict or list), parsed into Python objects using ast.literal_eval.
     - Lists and dicts are processed recursively.
     - Other types are returned unchanged.
     """
+    if _is_context_path(value):
+        path = render_template(str(value[CONTEXT_PATH_KEY]), context).strip()
+        return _resolve_context_path(path, context)
+
     if isinstance(value, str):
         # Render the string template against the context
         rendered = render_template(value, context)
@@ -47,7 +78,8 @@ class ExecuteRecipeConfig(StepConfig):
 
     Fields:
         recipe_path: Path to the sub-recipe to execute (templateable).
-        context_overrides: Optional values to override in the context.
+        context_overrides: Optional values to override in the context. A value of the
+            form {"context_path": "a.b"} binds the referenced context object as-is.
     """
 
     recipe_path: str
@@ -1,11 +1,14 @@
 # This file was generated by Codebase-Generator, do not edit directly
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 from pydantic import BaseModel
 
+from recipe_executor.llm_utils.budget import PromptBudget
 from recipe_executor.llm_utils.llm import LLM
-from recipe_executor.llm_utils.mcp import get_mcp_server
+from recipe_executor.llm_utils.routing import ROUTING_STRATEGIES, parse_model_ids
+from recipe_executor.llm_utils.tokens import context_window, tokenizer_name
 from recipe_executor.models import FileSpec
 from recipe_executor.protocols import ContextProtocol
 from recipe_executor.steps.base import BaseStep, StepConfig
@@ -19,21 +22,49 @@ class LLMGenerateConfig(StepConfig):
 
     Fields:
         prompt: The prompt to send to the LLM (templated beforehand).
-        model: The model identifier to use (provider/model_name format).
+        system_prompt: Optional static instructions and context sent ahead of the prompt.
+            Keep the parts shared by many calls here so providers can cache them.
+        model: The model identifier to use (provider/model_name format), or an ordered list
+            (or comma-separated string) of identifiers to fall back through.
+        routing: How a list of models is ordered: "fallback" (as listed) or "latency".
         max_tokens: The maximum number of tokens for the LLM response.
         mcp_servers: List of MCP server configurations for access to tools.
         openai_builtin_tools: Built-in OpenAI tools for Responses API models.
         output_format: The format of the LLM output (text, files, or JSON/list schemas).
         output_key: The name under which to store the LLM output in context.
+        max_input_tokens: Token budget for the rendered prompt (default: the model's context
+            window minus max_tokens, or 4096 tokens for the response).
+        budget_strategy: What to do with an over-budget prompt: "error", "truncate",
+            "summarize" or "split".
+        budget_keys: Context keys holding reference material the budget strategy may shrink.
+        budget_model: Model for "summarize" (default: the step's model).
+        record_tokens: Also store the step's token counts under `<output_key>__tokens`.
     """
 
     prompt: str
-    model: str = "openai/gpt-4o"
+    system_prompt: Optional[str] = None
+    model: Union[str, List[str]] = "openai/gpt-4o"
+    routing: str = "fallback"
     max_tokens: Optional[Union[str, int]] = None
     mcp_servers: Optional[List[Dict[str, Any]]] = None  # type: ignore
     openai_builtin_tools: Optional[List[Dict[str, Any]]] = None
     output_format: Union[str, Dict[str, Any], List[Any]]
     output_key: str = "llm_output"
+    max_input_tokens: Optional[Union[str, int]] = None
+    budget_strategy: str = "error"
+    budget_keys: Optional[List[str]] = None
+    budget_model: Optional[str] = None
+    record_tokens: bool = False
+
+
+# Tokens kept free for the response when the budget is derived from the context window
+_RESPONSE_RESERVE = 4096
+
+_SUMMARY_PROMPT = (
+    "Summarize the following reference material in at most {tokens} tokens. Keep the facts, names, "
+    "numbers and terminology a writer would need; leave out everything else.\n\n"
+    "<MATERIAL>\n{text}\n</MATERIAL>"
+)
 
 
 class FileSpecCollection(BaseModel):  # used for "files" output
@@ -73,8 +104,13 @@ class LLMGenerateStep(BaseStep[LLMGenerateConfig]):
 
     async def execute(self, context: ContextProtocol) -> None:
         # Render templated fields
-        prompt: str = render_template(self.config.prompt, context)
-        model_id: str = render_template(self.config.model, context)
+        raw_models = self.config.model if isinstance(self.config.model, list) else [self.config.model]
+        model_ids: List[str] = parse_model_ids([render_template(str(item), context) for item in raw_models])
+        if not model_ids:
+            raise ValueError("No model specified for llm_generate")
+        routing: str = render_template(self.config.routing, context)
+        if routing not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unsupported routing: {routing!r}. Supported: {', '.join(ROUTING_STRATEGIES)}")
         output_key: str = render_template(self.config.output_key, context)
 
         # Parse max_tokens
@@ -87,6 +123,28 @@ class LLMGenerateStep(BaseStep[LLMGenerateConfig]):
             except ValueError:
                 raise ValueError(f"Invalid max_tokens value: {raw_max!r}")
 
+        # Token budget for the prompt
+        if self.config.max_input_tokens is not None:
+            rendered = render_template(str(self.config.max_input_tokens), context)
+            try:
+                input_budget = int(rendered)
+            except ValueError:
+                raise ValueError(f"Invalid max_input_tokens value: {self.config.max_input_tokens!r}")
+        else:
+            window = min(context_window(model_id, context.get_config()) for model_id in model_ids)
+            input_budget = window - (max_tokens or _RESPONSE_RESERVE)
+        budget_strategy: str = render_template(self.config.budget_strategy, context)
+        output_format = self.config.output_format
+        if budget_strategy == "split" and isinstance(output_format, dict):
+            raise ValueError("The split budget strategy needs text, files or list output, not an object")
+        budget = PromptBudget(
+            self.logger,
+            model_ids[0],
+            input_budget,
+            budget_strategy,
+            [render_template(key, context) for key in self.config.budget_keys or []],
+        )
+
         # Collect MCP server configs: from step config and context config
         mcp_cfgs: List[Dict[str, Any]] = []
         if self.config.mcp_servers:
@@ -95,19 +153,22 @@ class LLMGenerateStep(BaseStep[LLMGenerateConfig]):
         if isinstance(ctx_mcp, list):
             mcp_cfgs.extend(ctx_mcp)  # type: ignore
 
-        # Instantiate MCP servers
+        # Instantiate MCP servers (MCP support is only imported when servers are configured)
         mcp_servers: List[Any] = []
-        for cfg in mcp_cfgs:
-            rendered_cfg = _render_config(cfg, context)
-            server = get_mcp_server(logger=self.logger, config=rendered_cfg)
-            mcp_servers.append(server)
+        if mcp_cfgs:
+            from recipe_executor.llm_utils.mcp import get_mcp_server
+
+            for cfg in mcp_cfgs:
+                rendered_cfg = _render_config(cfg, context)
+                server = get_mcp_server(logger=self.logger, config=rendered_cfg)
+                mcp_servers.append(server)
         servers_arg = mcp_servers or None
 
         # Prepare OpenAI built-in tools
         validated_tools: Optional[List[Dict[str, Any]]] = None
         if self.config.openai_builtin_tools:
-            provider = model_id.split("/")[0]
-            if provider not in ("openai_responses", "azure_responses"):
+            providers = {item.split("/")[0] for item in model_ids}
+            if not providers <= {"openai_responses", "azure_responses"}:
                 raise ValueError(
                     "Built-in tools only supported with Responses API models (openai_responses/* or azure_responses/*)"
                 )
@@ -121,15 +182,61 @@ class LLMGenerateStep(BaseStep[LLMGenerateConfig]):
         llm = LLM(
             logger=self.logger,
             context=context,
-            model=model_id,
+            model=model_ids,
             mcp_servers=servers_arg,
         )
 
-        output_format = self.config.output_format
+        def render_prompts(prompt_context: ContextProtocol) -> Tuple[Optional[str], str]:
+            system_text: Optional[str] = None
+            if self.config.system_prompt:
+                system_text = render_template(self.config.system_prompt, prompt_context) or None
+            return system_text, render_template(self.config.prompt, prompt_context)
+
+        async def summarize(text: str, tokens: int) -> str:
+            summary = await llm.generate(
+                _SUMMARY_PROMPT.format(tokens=tokens, text=text),
+                model=render_template(self.config.budget_model, context) if self.config.budget_model else model_ids,
+                output_type=str,
+                mcp_servers=[],
+                routing=routing,
+            )
+            return str(summary)
+
+        async def generate_all(output_type: Any) -> List[Any]:
+            if len(prompts) == 1:
+                system_text, prompt_text = prompts[0]
+                return [await generate_one(output_type, system_text, prompt_text)]
+            return list(
+                await asyncio.gather(
+                    *(generate_one(output_type, system_text, prompt_text) for system_text, prompt_text in prompts)
+                )
+            )
+
+        async def generate_one(output_type: Any, system_text: Optional[str], prompt_text: str) -> Any:
+            return await llm.generate(
+                prompt_text,
+                output_type=output_type,
+                max_tokens=max_tokens,
+                openai_builtin_tools=validated_tools,
+                routing=routing,
+                system_prompt=system_text,
+            )
+
         try:
+            prompts = await budget.fit(render_prompts, context, summarize)
+            self.logger.info(
+                "LLM prompt tokens=%d budget=%d model_id=%s tokenizer=%s%s",
+                budget.prompt_tokens,
+                budget.limit,
+                model_ids[0],
+                tokenizer_name(model_ids[0]),
+                f" strategy={budget.applied} sent={budget.sent_tokens}" if budget.applied else "",
+            )
+
             self.logger.debug(
-                "Calling LLM: model=%s, format=%r, max_tokens=%s, mcp_servers=%r, tools=%r",
-                model_id,
+                "Calling LLM: model=%s, routing=%s, format=%r, max_tokens=%s, mcp_servers=%r, tools=%r",
+                ",".join(model_ids),
+                routing,
                 output_format,
                 max_tokens,
                 mcp_servers,
@@ -138,33 +245,20 @@ class LLMGenerateStep(BaseStep[LLMGenerateConfig]):
 
             # Dispatch based on output_format
             if output_format == "text":
-                result = await llm.generate(
-                    prompt,
-                    output_type=str,
-                    max_tokens=max_tokens,
-                    openai_builtin_tools=validated_tools,
-                )
-                context[output_key] = result
+                results = await generate_all(str)
+                context[output_key] = "\n\n".join(str(result) for result in results)
 
             elif output_format == "files":
-                result = await llm.generate(
-                    prompt,
-                    output_type=FileSpecCollection,
-                    max_tokens=max_tokens,
-                    openai_builtin_tools=validated_tools,
-                )
-                # Ensure correct type
-                assert isinstance(result, FileSpecCollection), f"Expected FileSpecCollection, got {type(result)}"
-                context[output_key] = result.files
+                files: List[FileSpec] = []
+                for result in await generate_all(FileSpecCollection):
+                    # Ensure correct type
+                    assert isinstance(result, FileSpecCollection), f"Expected FileSpecCollection, got {type(result)}"
+                    files.extend(result.files)
+                context[output_key] = files
 
             elif isinstance(output_format, dict):  # JSON object schema
                 schema_model: Type[BaseModel] = json_object_to_pydantic_model(output_format, model_name="LLMObject")
-                result = await llm.generate(
-                    prompt,
-                    output_type=schema_model,
-                    max_tokens=max_tokens,
-                    openai_builtin_tools=validated_tools,
-                )
+                result = (await generate_all(schema_model))[0]
                 if not isinstance(result, BaseModel):
                     raise ValueError(f"Expected BaseModel for object output, got {type(result)}")
                 context[output_key] = result.model_dump()
@@ -179,20 +273,29 @@ class LLMGenerateStep(BaseStep[LLMGenerateConfig]):
                     "required": ["items"],
                 }
                 schema_model = json_object_to_pydantic_model(wrapper_schema, model_name="LLMListWrapper")
-                result = await llm.generate(
-                    prompt,
-                    output_type=schema_model,
-                    max_tokens=max_tokens,
-                    openai_builtin_tools=validated_tools,
-                )
-                if not isinstance(result, BaseModel):
-                    raise ValueError(f"Expected BaseModel for list output, got {type(result)}")
-                wrapper = result.model_dump()
-                context[output_key] = wrapper.get("items", [])
+                items: List[Any] = []
+                for result in await generate_all(schema_model):
+                    if not isinstance(result, BaseModel):
+                        raise ValueError(f"Expected BaseModel for list output, got {type(result)}")
+                    wrapper = result.model_dump()
+                    items.extend(wrapper.get("items", []))
+                context[output_key] = items
 
             else:
                 raise ValueError(f"Unsupported output_format: {output_format!r}")
 
+            # Token accounting for this step, next to its output, when asked for
+            if self.config.record_tokens:
+                context[f"{output_key}__tokens"] = {
+                    "model": model_ids[0],
+                    "tokenizer": tokenizer_name(model_ids[0]),
+                    "prompt_tokens": budget.prompt_tokens,
+                    "budget": budget.limit,
+                    "strategy": budget.applied,
+                    "sent_prompt_tokens": budget.sent_tokens,
+                    "usage": dict(llm.usage),
+                }
+
         except Exception as exc:
             self.logger.error("LLM generate failed: %r", exc, exc_info=True)
             raise
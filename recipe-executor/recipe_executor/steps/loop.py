@@ -5,8 +5,10 @@ Supports template rendering, context isolation, error handling, and configurable
 """
 
 import asyncio
+import contextvars
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Union
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from recipe_executor.protocols import ContextProtocol
 from recipe_executor.steps.base import BaseStep, StepConfig
@@ -22,20 +24,88 @@ class LoopStepConfig(StepConfig):
     Fields:
         items: Union[str, List[Any], Dict[Any, Any]]
         item_key: str
-        max_concurrency: int = 1
+        max_concurrency: Union[int, str] = 1 (templateable)
         delay: float = 0.0
         substeps: List[Dict[str, Any]]
         result_key: str
         fail_fast: bool = True
+        batch: Union[bool, str] = False (templateable)
+        shared_concurrency: Union[bool, str] = False (templateable)
     """
 
     items: Union[str, List[Any], Dict[Any, Any]]
     item_key: str
-    max_concurrency: int = 1
+    max_concurrency: Union[int, str] = 1
     delay: float = 0.0
     substeps: List[Dict[str, Any]]
     result_key: str
     fail_fast: bool = True
+    batch: Union[bool, str] = False
+    shared_concurrency: Union[bool, str] = False
+
+
+class _SlotPool:
+    """
+    Concurrency slots shared by a loop and the shared loops nested in its items, so
+    max_concurrency caps the whole tree of items and the peak covers all of them.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.semaphore = asyncio.Semaphore(size)
+        self.active = 0
+        self.peak = 0
+
+    async def acquire(self) -> None:
+        await self.semaphore.acquire()
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+
+    def release(self) -> None:
+        self.active -= 1
+        self.semaphore.release()
+
+
+class _Slot:
+    """The slot held by one loop item; `held` is False while the item waits on nested items."""
+
+    def __init__(self, pool: _SlotPool) -> None:
+        self.pool = pool
+        self.held = False
+
+
+_current_slot: contextvars.ContextVar[Optional[_Slot]] = contextvars.ContextVar(
+    "recipe_executor_loop_slot", default=None
+)
+
+
+@asynccontextmanager
+async def _hold_slot(pool: _SlotPool) -> AsyncIterator[None]:
+    """Run one loop item in a pool slot; must be entered in the item's own task."""
+    slot = _Slot(pool)
+    await pool.acquire()
+    slot.held = True
+    token = _current_slot.set(slot)
+    try:
+        yield
+    finally:
+        _current_slot.reset(token)
+        if slot.held:
+            pool.release()
+
+
+@asynccontextmanager
+async def _suspend_slot(slot: _Slot) -> AsyncIterator[None]:
+    """
+    Give back the current item's slot while it waits on nested items that use the same pool;
+    otherwise parents holding every slot would wait forever on their children.
+    """
+    slot.pool.release()
+    slot.held = False
+    try:
+        yield
+    finally:
+        await slot.pool.acquire()
+        slot.held = True
 
 
 class LoopStep(BaseStep[LoopStepConfig]):
@@ -79,8 +149,21 @@ class LoopStep(BaseStep[LoopStepConfig]):
             items_list = list(items_obj.items())  # type: ignore
 
         total: int = len(items_list)
-        max_conc: int = cfg.max_concurrency
-        self.logger.info(f"LoopStep: Starting processing of {total} items (max_concurrency={max_conc}).")
+        max_conc: int = _render_max_concurrency(cfg.max_concurrency, context)
+        batch_mode: bool = _render_batch(cfg.batch, context)
+        # A shared loop inside an item of another shared loop draws from that loop's slots
+        parent_slot: Optional[_Slot] = None
+        pool: Optional[_SlotPool] = None
+        if not batch_mode and _render_batch(cfg.shared_concurrency, context):
+            parent_slot = _current_slot.get()
+            if parent_slot is not None:
+                pool = parent_slot.pool
+            elif max_conc > 0:
+                pool = _SlotPool(max_conc)
+        if batch_mode:
+            self.logger.info(f"LoopStep: Starting processing of {total} items (batch mode).")
+        else:
+            self.logger.info(f"LoopStep: Starting processing of {total} items (max_concurrency={max_conc}).")
 
         # Handle empty collection
         if total == 0:
@@ -88,6 +171,7 @@ class LoopStep(BaseStep[LoopStepConfig]):
             context[cfg.result_key] = empty_res
             context[f"{cfg.result_key}__errors"] = []
             context[f"{cfg.result_key}__history"] = []
+            context[f"{cfg.result_key}__peak_concurrency"] = 0
             self.logger.info("LoopStep: No items to process.")
             return
 
@@ -96,8 +180,20 @@ class LoopStep(BaseStep[LoopStepConfig]):
         errors: List[Dict[str, Any]] = []
         history: List[Dict[str, Any]] = []
 
-        # Concurrency control: semaphore if max_concurrency > 0
-        semaphore: Optional[asyncio.Semaphore] = asyncio.Semaphore(max_conc) if max_conc > 0 else None
+        # Concurrency control: semaphore if max_concurrency > 0. In batch mode every item runs at
+        # once and their LLM calls are collected and sent through provider batch APIs.
+        semaphore: Optional[asyncio.Semaphore] = None
+        collector: Any = None
+        parent_batch: Any = None
+        if batch_mode:
+            from recipe_executor.llm_utils.batch import BatchCollector, current_batch
+
+            # A batch loop nested in another batch loop's item joins the outer batches
+            parent_batch = current_batch()
+            collector = parent_batch or BatchCollector(context, self.logger)
+            collector.expect(total)
+        elif pool is None and max_conc > 0:
+            semaphore = asyncio.Semaphore(max_conc)
 
         executor = Executor(self.logger)
         plan: Dict[str, Any] = {"steps": cfg.substeps}
@@ -105,9 +201,25 @@ class LoopStep(BaseStep[LoopStepConfig]):
         fail_fast: bool = cfg.fail_fast
         fail_fast_triggered: bool = False
         completed: int = 0
+        active: int = 0
+        peak_concurrency: int = 0
         tasks: List[asyncio.Task] = []
+        # Parallel results arrive in completion order; keep them by position to restore item order
+        ordered_outputs: Dict[int, Tuple[Any, Any]] = {}
 
         async def process_item(key: Any, value: Any) -> Tuple[Any, Any, Optional[str]]:
+            nonlocal active, peak_concurrency
+            active += 1
+            peak_concurrency = max(peak_concurrency, active)
+            try:
+                if collector is not None:
+                    async with collector.item():
+                        return await run_item(key, value)
+                return await run_item(key, value)
+            finally:
+                active -= 1
+
+        async def run_item(key: Any, value: Any) -> Tuple[Any, Any, Optional[str]]:
             # Clone context for isolation
             item_ctx = context.clone()
             item_ctx[cfg.item_key] = value
@@ -149,19 +261,22 @@ class LoopStep(BaseStep[LoopStepConfig]):
         async def run_parallel() -> None:
             nonlocal fail_fast_triggered, completed
 
-            async def schedule(k: Any, v: Any) -> Tuple[Any, Any, Optional[str]]:
+            async def schedule(position: int, k: Any, v: Any) -> Tuple[int, Any, Any, Optional[str]]:
+                if pool is not None:
+                    async with _hold_slot(pool):
+                        return (position, *await process_item(k, v))
                 if semaphore:
                     async with semaphore:
-                        return await process_item(k, v)
-                return await process_item(k, v)
+                        return (position, *await process_item(k, v))
+                return (position, *await process_item(k, v))
 
             # Schedule tasks with optional delay
             for idx, (k, v) in enumerate(items_list):
                 if fail_fast_triggered:
                     break
-                task = asyncio.create_task(schedule(k, v))
+                task = asyncio.create_task(schedule(idx, k, v))
                 tasks.append(task)
-                if cfg.delay and idx < total - 1:
+                if cfg.delay and not batch_mode and idx < total - 1:
                     await asyncio.sleep(cfg.delay)
 
             # Collect results as they complete
@@ -169,9 +284,9 @@ class LoopStep(BaseStep[LoopStepConfig]):
                 if fail_fast_triggered:
                     break
                 try:
-                    k, out, err = await t
+                    position, k, out, err = await t
                 except Exception as exc:
-                    k, out, err = None, None, str(exc)
+                    position, k, out, err = None, None, None, str(exc)
                     self.logger.error(f"LoopStep: Unexpected error: {err}")
                 history.append({"key": k, "result": out, "error": err})
                 if err:
@@ -180,10 +295,7 @@ class LoopStep(BaseStep[LoopStepConfig]):
                         fail_fast_triggered = True
                         break
                 else:
-                    if isinstance(results, list):
-                        results.append(out)
-                    else:
-                        results[k] = out  # type: ignore
+                    ordered_outputs[position] = (k, out)  # type: ignore
                     completed += 1
             # Cancel remaining tasks if aborting
             if fail_fast_triggered:
@@ -191,18 +303,69 @@ class LoopStep(BaseStep[LoopStepConfig]):
                     if not t.done():
                         t.cancel()
 
+            # Assemble results in the original item order
+            for position in sorted(ordered_outputs):
+                k, out = ordered_outputs[position]
+                if isinstance(results, list):
+                    results.append(out)
+                else:
+                    results[k] = out  # type: ignore
+
         # Choose execution mode
-        if max_conc == 1:
-            await run_sequential()
+        run_items = run_sequential if max_conc == 1 and not batch_mode and pool is None else run_parallel
+        if parent_slot is not None and pool is not None:
+            async with _suspend_slot(parent_slot):
+                await run_items()
+        elif parent_batch is not None:
+            async with parent_batch.suspend_item():
+                await run_items()
+        elif collector is not None:
+            try:
+                await run_items()
+            finally:
+                await collector.close()
         else:
-            await run_parallel()
+            await run_items()
 
         # Store outputs back to parent context
         context[cfg.result_key] = results
         context[f"{cfg.result_key}__errors"] = errors
         context[f"{cfg.result_key}__history"] = history
+        if pool is not None:
+            # Items of the whole shared tree, not only this loop's
+            peak_concurrency = pool.peak
+        context[f"{cfg.result_key}__peak_concurrency"] = peak_concurrency
+
+        self.logger.info(
+            f"LoopStep: Completed {completed}/{total} items. Errors: {len(errors)}. "
+            f"Peak concurrency: {peak_concurrency}."
+        )
+
 
-        self.logger.info(f"LoopStep: Completed {completed}/{total} items. Errors: {len(errors)}.")
+def _render_max_concurrency(raw: Union[int, str], context: ContextProtocol) -> int:
+    """
+    Render a templated max_concurrency value and validate it as a non-negative integer.
+    """
+    if isinstance(raw, int):
+        value: Any = raw
+    else:
+        rendered = render_template(raw, context).strip()
+        try:
+            value = int(rendered or "1")
+        except ValueError:
+            raise ValueError(f"LoopStep: Invalid max_concurrency value: {raw!r} (rendered: {rendered!r})")
+    if value < 0:
+        raise ValueError(f"LoopStep: max_concurrency must be >= 0, got {value}.")
+    return value
+
+
+def _render_batch(raw: Union[bool, str], context: ContextProtocol) -> bool:
+    """
+    Render a templated flag (batch, shared_concurrency): "true", "yes" or "1" (any case) enable it.
+    """
+    if isinstance(raw, bool):
+        return raw
+    return render_template(raw, context).strip().lower() in ("true", "yes", "1")
 
 
 def _resolve_path(path: str, context: ContextProtocol) -> Any:
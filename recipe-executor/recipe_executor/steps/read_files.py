@@ -1,14 +1,14 @@
 # This file was generated by Codebase-Generator, do not edit directly
 import os
 import glob
+import asyncio
 import json
 import logging
 from typing import Any, Dict, List, Union
 
-import yaml
-
 from recipe_executor.protocols import ContextProtocol
 from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.utils.lazy_files import ensure_file, is_lazy_file
 from recipe_executor.utils.templates import render_template
 
 
@@ -73,6 +73,10 @@ class ReadFilesStep(BaseStep[ReadFilesConfig]):
 
         for path in paths:
             self.logger.debug(f"Reading file at path: {path}")
+            # Materialize the file first if it was registered lazily (e.g. by docpack_extract),
+            # off the event loop so other steps keep running while it is extracted
+            if is_lazy_file(path) and await asyncio.to_thread(ensure_file, path):
+                self.logger.debug(f"Materialized lazy file: {path}")
             if not os.path.exists(path):
                 msg = f"File not found: {path}"
                 if cfg.optional:
@@ -95,6 +99,8 @@ class ReadFilesStep(BaseStep[ReadFilesConfig]):
                 except Exception as exc:
                     self.logger.warning(f"Failed to parse JSON from {path}: {exc}")
             elif ext in (".yaml", ".yml"):
+                import yaml
+
                 try:
                     content = yaml.safe_load(raw_text)
                 except Exception as exc:
@@ -2,13 +2,79 @@
 """
 Registry for mapping step type names to their implementation classes.
 
-This registry is a simple global dictionary. Steps register themselves by
-updating this mapping, allowing dynamic lookup based on the step type name.
+This registry is a global dictionary. Steps register themselves by updating this
+mapping, allowing dynamic lookup based on the step type name. Built-in steps are
+registered lazily by import path, so a step module (and its heavy dependencies such
+as LLM providers, MCP or docpack support) is only imported when a recipe uses it.
 """
 
-from typing import Dict, Type
+import importlib
+from typing import Dict, List, Optional, Type
 
 from recipe_executor.steps.base import BaseStep
 
+__all__ = ["STEP_REGISTRY", "StepRegistry"]
+
+# Built-in step types mapped to "module:ClassName", imported on first lookup.
+BUILTIN_STEPS: Dict[str, str] = {
+    "conditional": "recipe_executor.steps.conditional:ConditionalStep",
+    "docpack_create": "recipe_executor.steps.docpack_create:DocpackCreateStep",
+    "docpack_extract": "recipe_executor.steps.docpack_extract:DocpackExtractStep",
+    "execute_recipe": "recipe_executor.steps.execute_recipe:ExecuteRecipeStep",
+    "llm_generate": "recipe_executor.steps.llm_generate:LLMGenerateStep",
+    "loop": "recipe_executor.steps.loop:LoopStep",
+    "mcp": "recipe_executor.steps.mcp:MCPStep",
+    "parallel": "recipe_executor.steps.parallel:ParallelStep",
+    "read_files": "recipe_executor.steps.read_files:ReadFilesStep",
+    "retrieve_chunks": "recipe_executor.steps.retrieve_chunks:RetrieveChunksStep",
+    "set_context": "recipe_executor.steps.set_context:SetContextStep",
+    "write_files": "recipe_executor.steps.write_files:WriteFilesStep",
+}
+
+
+class StepRegistry(Dict[str, Type[BaseStep]]):
+    """
+    Dictionary of step type names to step classes that resolves lazily registered
+    entries on first lookup. Classes can still be registered directly with
+    `STEP_REGISTRY["name"] = StepClass`.
+    """
+
+    def __init__(self, lazy_steps: Optional[Dict[str, str]] = None) -> None:
+        super().__init__()
+        self._lazy_steps: Dict[str, str] = dict(lazy_steps or {})
+
+    def register_lazy(self, step_type: str, target: str) -> None:
+        """
+        Register a step class by import path ("module:ClassName") without importing it.
+        """
+        if ":" not in target:
+            raise ValueError(f"Invalid step import path '{target}', expected 'module:ClassName'")
+        self._lazy_steps[step_type] = target
+
+    def __missing__(self, step_type: str) -> Type[BaseStep]:
+        target = self._lazy_steps.get(step_type)
+        if target is None:
+            raise KeyError(step_type)
+        module_name, class_name = target.split(":", 1)
+        step_cls: Type[BaseStep] = getattr(importlib.import_module(module_name), class_name)
+        self[step_type] = step_cls
+        return step_cls
+
+    def __contains__(self, step_type: object) -> bool:
+        return super().__contains__(step_type) or step_type in self._lazy_steps
+
+    def get(self, step_type: str, default: Optional[Type[BaseStep]] = None) -> Optional[Type[BaseStep]]:  # type: ignore[override]
+        try:
+            return self[step_type]
+        except KeyError:
+            return default
+
+    def step_types(self) -> List[str]:
+        """
+        Return all registered step type names, including ones not yet imported.
+        """
+        return sorted(set(self.keys()) | set(self._lazy_steps))
+
+
 # Global registry mapping step type names to their implementation classes.
-STEP_REGISTRY: Dict[str, Type[BaseStep]] = {}
+STEP_REGISTRY: StepRegistry = StepRegistry(BUILTIN_STEPS)
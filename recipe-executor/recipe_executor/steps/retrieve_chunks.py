@@ -0,0 +1,125 @@
+# This file was generated by Codebase-Generator, do not edit directly
+"""
+RetrieveChunksStep: select the most relevant chunks of loaded resources for a query.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from recipe_executor.protocols import ContextProtocol
+from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.utils.retrieval import ChunkIndex
+from recipe_executor.utils.templates import render_template
+
+
+class RetrieveChunksConfig(StepConfig):
+    """
+    Configuration for RetrieveChunksStep.
+
+    Fields:
+        query (Optional[str]): Query text (may be templated). If empty, the step only builds the index.
+        resources_key (str): Context key holding the list of resources (`key`, `description`, `content`).
+        index_key (str): Context key where the chunk index is stored and reused.
+        output_key (str): Context key to store the selected chunks.
+        keys (Optional[Union[str, List[str]]]): Resource keys to search within (list, JSON list or
+            comma-separated string, may be templated). Searches all resources when not set;
+            selects nothing when set but rendered empty.
+        top_k (Union[int, str]): Maximum number of chunks to return (may be templated).
+        max_tokens (Union[int, str]): Estimated token budget for the returned chunks, 0 for no limit.
+        chunk_size (int): Words per chunk when building the index.
+        chunk_overlap (int): Words shared between consecutive chunks.
+        rebuild (bool): Rebuild the index even if one is already stored under index_key.
+    """
+
+    query: Optional[str] = None
+    resources_key: str = "resources"
+    index_key: str = "resource_index"
+    output_key: str = "retrieved_chunks"
+    keys: Optional[Union[str, List[str]]] = None
+    top_k: Union[int, str] = 5
+    max_tokens: Union[int, str] = 2000
+    chunk_size: int = 200
+    chunk_overlap: int = 40
+    rebuild: bool = False
+
+
+class RetrieveChunksStep(BaseStep[RetrieveChunksConfig]):
+    """
+    Step that builds an in-memory BM25 index over loaded resources once and stores the
+    top-ranked chunks for a query in the context.
+    """
+
+    def __init__(self, logger: logging.Logger, config: Dict[str, Any]) -> None:
+        super().__init__(logger, RetrieveChunksConfig.model_validate(config))
+
+    async def execute(self, context: ContextProtocol) -> None:
+        index_key = render_template(self.config.index_key, context)
+        index = context.get_raw(index_key)
+
+        if self.config.rebuild or not isinstance(index, ChunkIndex):
+            resources_key = render_template(self.config.resources_key, context)
+            resources = context.get(resources_key, [])
+            if isinstance(resources, dict):
+                resources = list(resources.values())
+            if not isinstance(resources, list):
+                raise ValueError(f"Resources at '{resources_key}' must be a list, got {type(resources).__name__}")
+            index = ChunkIndex.from_resources(
+                resources, chunk_size=self.config.chunk_size, chunk_overlap=self.config.chunk_overlap
+            )
+            context[index_key] = index
+            self.logger.debug(f"Built {index!r} from '{resources_key}' into '{index_key}'")
+
+        query = render_template(self.config.query or "", context).strip()
+        if not query:
+            return
+
+        top_k = self._render_int(self.config.top_k, context, "top_k")
+        max_tokens = self._render_int(self.config.max_tokens, context, "max_tokens")
+        keys = self._render_keys(context)
+        output_key = render_template(self.config.output_key, context)
+
+        # Configured keys that render empty (e.g. a section without refs) select nothing
+        if self.config.keys and not keys:
+            context[output_key] = []
+            self.logger.debug(f"No resource keys to search, stored empty result in '{output_key}'")
+            return
+
+        chunks = index.search(query, top_k=top_k, max_tokens=max_tokens or None, keys=keys or None)
+        if not chunks:
+            # Nothing matched the query terms; the start of the referenced resources beats no context
+            chunks = index.leading(top_k=top_k, max_tokens=max_tokens or None, keys=keys or None)
+            self.logger.debug(f"No chunks matched '{query[:60]}', falling back to {len(chunks)} leading chunk(s)")
+        context[output_key] = chunks
+
+        tokens = sum(chunk["tokens"] for chunk in chunks)
+        self.logger.info(
+            f"Retrieved {len(chunks)} chunk(s) (~{tokens} tokens) from {len(index)} for query "
+            f"'{query[:60]}' into '{output_key}'"
+        )
+
+    @staticmethod
+    def _render_int(value: Union[int, str], context: ContextProtocol, name: str) -> int:
+        if isinstance(value, int):
+            return value
+        rendered = render_template(value, context).strip()
+        try:
+            return int(rendered)
+        except ValueError:
+            raise ValueError(f"{name} must render to an integer, got '{rendered}'")
+
+    def _render_keys(self, context: ContextProtocol) -> List[str]:
+        raw = self.config.keys
+        if not raw:
+            return []
+        if isinstance(raw, list):
+            return [render_template(str(key), context).strip() for key in raw]
+        rendered = render_template(raw, context).strip()
+        if rendered.startswith("["):
+            try:
+                parsed = json.loads(rendered)
+            except json.JSONDecodeError:
+                parsed = None
+            if isinstance(parsed, list):
+                return [str(key) for key in parsed]
+        return [key.strip() for key in rendered.split(",") if key.strip()]
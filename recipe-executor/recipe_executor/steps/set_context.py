@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Union, Literal
 
 from recipe_executor.steps.base import BaseStep, StepConfig
 from recipe_executor.protocols import ContextProtocol
+from recipe_executor.utils.accumulator import Accumulator
 from recipe_executor.utils.templates import render_template
 
 # Regex to strip out raw blocks for nested rendering detection
@@ -60,7 +61,7 @@ class SetContextStep(BaseStep[SetContextConfig]):
             context[key] = value
         elif strategy == "merge":
             if existed:
-                old_value: Any = context[key]
+                old_value: Any = context.get_raw(key)
                 merged: Any = self._merge(old_value, value)
                 context[key] = merged
             else:
@@ -111,16 +112,22 @@ class SetContextStep(BaseStep[SetContextConfig]):
           - list + list or item => append/extend
           - dict + dict => shallow merge (new keys overwrite)
           - mismatched types => [old, new]
+
+        Strings and lists are collected in an Accumulator so repeated merges append
+        chunks instead of copying the whole value; it is joined lazily on read.
         """
-        # String concatenation
-        if isinstance(old, str) and isinstance(new, str):  # type: ignore
-            return old + new  # type: ignore
-
-        # List merge or append
-        if isinstance(old, list):  # type: ignore
-            if isinstance(new, list):  # type: ignore
-                return old + new  # type: ignore
-            return old + [new]  # type: ignore
+        # Append to an existing accumulator in place when the types line up
+        if isinstance(old, Accumulator):
+            if old.accepts(new):
+                old.append(new)
+                return old
+            old = old.materialize()
+
+        # String concatenation / list merge or append
+        if isinstance(old, list) or (isinstance(old, str) and isinstance(new, str)):  # type: ignore
+            accumulator = Accumulator(old)
+            accumulator.append(new)
+            return accumulator
 
         # Dict shallow merge
         if isinstance(old, dict) and isinstance(new, dict):  # type: ignore
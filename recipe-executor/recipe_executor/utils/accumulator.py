@@ -0,0 +1,90 @@
+"""
+Accumulator artifacts for the Recipe Executor.
+
+An `Accumulator` collects the chunks of a string or list that is built up through repeated
+merges (for example `set_context` with `if_exists: "merge"`) and only joins them when the value
+is actually read. This keeps each merge O(len(new)) instead of copying the whole accumulated value.
+"""
+
+import copy
+from typing import Any, Dict, List
+
+__all__ = ["Accumulator", "materialize"]
+
+
+class Accumulator:
+    """
+    Chunk list for a string or list artifact, materialized lazily on read.
+
+    Materializing joins the chunks once and compacts them into a single chunk, so repeated
+    reads without intervening appends are free.
+    """
+
+    __slots__ = ("_chunks", "_kind")
+
+    def __init__(self, initial: Any) -> None:
+        if isinstance(initial, Accumulator):
+            initial = initial.materialize()
+        if not isinstance(initial, (str, list)):
+            raise TypeError(f"Accumulator supports str or list values, got {type(initial).__name__}")
+        self._kind: type = type(initial)
+        self._chunks: List[Any] = [initial]
+
+    @property
+    def kind(self) -> type:
+        """The type of the accumulated value (`str` or `list`)."""
+        return self._kind
+
+    def accepts(self, value: Any) -> bool:
+        """
+        Return True if the value can be appended without changing the accumulated type.
+        Strings only accept strings; lists accept any item or list.
+        """
+        return self._kind is list or isinstance(value, str)
+
+    def append(self, value: Any) -> None:
+        """
+        Append a value. Lists are extended, any other item is appended to a list accumulator.
+        """
+        if not self.accepts(value):
+            raise TypeError(f"Cannot append {type(value).__name__} to a {self._kind.__name__} accumulator")
+        if self._kind is list and not isinstance(value, list):
+            value = [value]
+        self._chunks.append(value)
+
+    def materialize(self) -> Any:
+        """
+        Join all chunks into a single value and return it.
+        """
+        if len(self._chunks) > 1:
+            if self._kind is str:
+                joined: Any = "".join(self._chunks)
+            else:
+                joined = [item for chunk in self._chunks for item in chunk]
+            self._chunks = [joined]
+        return self._chunks[0]
+
+    def __str__(self) -> str:
+        return str(self.materialize())
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Accumulator":
+        clone = Accumulator.__new__(Accumulator)
+        clone._kind = self._kind
+        # Strings are immutable, so only list chunks need a deep copy
+        clone._chunks = list(self._chunks) if self._kind is str else copy.deepcopy(self._chunks, memo)
+        return clone
+
+    def __repr__(self) -> str:
+        return f"Accumulator(kind={self._kind.__name__}, chunks={len(self._chunks)}, length={len(self)})"
+
+
+def materialize(value: Any) -> Any:
+    """
+    Return the plain value for an artifact, joining it first if it is an Accumulator.
+    """
+    if isinstance(value, Accumulator):
+        return value.materialize()
+    return value
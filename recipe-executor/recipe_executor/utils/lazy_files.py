@@ -0,0 +1,98 @@
+"""
+Lazily materialized files for the Recipe Executor.
+
+Steps that can provide a file on demand (for example `docpack_extract` with `lazy: true`)
+register its path together with a callable that writes it. Steps that read files call
+`ensure_file()` first, so only the files a recipe actually reads are ever written to disk.
+"""
+
+import os
+import threading
+from typing import Callable, Dict
+
+__all__ = ["register_lazy_file", "ensure_file", "is_lazy_file", "forget_lazy_files"]
+
+_materializers: Dict[str, Callable[[], object]] = {}
+# Per-path locks of files being materialized, with the number of callers using each
+_path_locks: Dict[str, threading.Lock] = {}
+_path_users: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _normalize(path: str) -> str:
+    return os.path.abspath(os.fspath(path))
+
+
+def register_lazy_file(path: str, materialize: Callable[[], object]) -> None:
+    """
+    Register a file that is written by `materialize()` the first time it is needed.
+
+    Re-registering a path replaces its materializer.
+    """
+    with _lock:
+        _materializers[_normalize(path)] = materialize
+
+
+def is_lazy_file(path: str) -> bool:
+    """Return True if the path is registered and has not been materialized yet, or is being materialized."""
+    key = _normalize(path)
+    with _lock:
+        return key in _materializers or key in _path_locks
+
+
+def ensure_file(path: str) -> bool:
+    """
+    Materialize a registered lazy file and drop its registration.
+
+    The materializer runs even when the path already exists, since a file left there by an
+    earlier extraction may be stale; materializers skip files that are already current.
+    Returns True if a registered materializer ran. Paths that are not registered are left
+    alone, so callers can use this unconditionally before reading any file.
+
+    The materializer runs under a lock of its own path only, so files are extracted
+    concurrently while callers reading the same path wait for it to be written. It blocks,
+    so async callers should run this in a worker thread.
+    """
+    key = _normalize(path)
+    with _lock:
+        if key not in _materializers and key not in _path_locks:
+            return False
+        path_lock = _path_locks.setdefault(key, threading.Lock())
+        _path_users[key] = _path_users.get(key, 0) + 1
+
+    try:
+        with path_lock:
+            # Another caller may have materialized the file while this one waited
+            with _lock:
+                materialize = _materializers.pop(key, None)
+            if materialize is None:
+                return False
+            try:
+                materialize()
+            except Exception:
+                # Keep the registration so a later read can retry
+                with _lock:
+                    _materializers.setdefault(key, materialize)
+                raise
+        return True
+    finally:
+        with _lock:
+            _path_users[key] -= 1
+            if not _path_users[key]:
+                del _path_users[key]
+                del _path_locks[key]
+
+
+def forget_lazy_files(directory: str) -> int:
+    """
+    Drop the registrations of lazy files under a directory (for example a removed session).
+
+    Returns the number of registrations dropped.
+    """
+    root = _normalize(directory)
+    prefix = root.rstrip(os.sep) + os.sep
+    with _lock:
+        stale = [key for key in _materializers if key == root or key.startswith(prefix)]
+        for key in stale:
+            del _materializers[key]
+    return len(stale)
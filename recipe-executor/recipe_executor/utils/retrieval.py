@@ -0,0 +1,211 @@
+"""
+Local keyword retrieval over loaded resources for the Recipe Executor.
+
+`ChunkIndex` splits resource contents into overlapping word-window chunks and ranks them
+against a query with BM25, so prompts can include only the most relevant parts of large
+resources instead of their full text. Everything runs in-process; no embedding service
+is required.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+__all__ = ["ChunkIndex", "estimate_tokens", "resource_text", "tokenize"]
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common English words that carry no ranking signal.
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in is it its of on or that the this "
+    "to was were what when which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase text and split it into alphanumeric terms, dropping stopwords.
+    """
+    return [term for term in _TOKEN_PATTERN.findall(text.lower()) if term not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap model-agnostic token estimate (about four characters per token).
+    """
+    return (len(text) + 3) // 4
+
+
+def resource_text(content: Any) -> str:
+    """
+    Flatten resource content produced by read_files (string, list or path-keyed dict) to text.
+    """
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        return "\n\n".join(resource_text(value) for value in content.values())
+    if isinstance(content, (list, tuple)):
+        return "\n\n".join(resource_text(value) for value in content)
+    return str(content)
+
+
+class ChunkIndex:
+    """
+    In-memory BM25 index over resource chunks.
+
+    The index is immutable once built, so copies of a context (for example per loop item)
+    share a single instance instead of duplicating it.
+    """
+
+    def __init__(self, chunk_size: int = 200, chunk_overlap: int = 40, k1: float = 1.5, b: float = 0.75) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be between 0 and chunk_size - 1")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[Dict[str, Any]] = []
+        self._term_freqs: List[Counter] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._avg_length: float = 0.0
+
+    @classmethod
+    def from_resources(
+        cls, resources: Iterable[Dict[str, Any]], chunk_size: int = 200, chunk_overlap: int = 40
+    ) -> "ChunkIndex":
+        """
+        Build an index from resource dicts with `key`, optional `description` and `content`.
+        """
+        index = cls(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        for position, resource in enumerate(resources):
+            if not isinstance(resource, dict):
+                continue
+            key = str(resource.get("key") or f"resource_{position}")
+            index.add(key, resource_text(resource.get("content")), str(resource.get("description") or ""))
+        return index
+
+    def add(self, key: str, text: str, description: str = "") -> None:
+        """
+        Chunk a resource's text and add the chunks to the index.
+        """
+        for position, chunk_text in enumerate(self._split(text)):
+            terms = tokenize(chunk_text)
+            # Description terms count once per chunk so short queries can match the resource itself
+            freqs = Counter(terms + tokenize(description))
+            chunk_id = len(self.chunks)
+            self.chunks.append({
+                "key": key,
+                "description": description,
+                "position": position,
+                "text": chunk_text,
+            })
+            self._term_freqs.append(freqs)
+            self._lengths.append(sum(freqs.values()))
+            for term in freqs:
+                self._postings.setdefault(term, []).append(chunk_id)
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def _split(self, text: str) -> List[str]:
+        # Split on whitespace-delimited words so chunks keep the original formatting within them
+        spans = [match.span() for match in re.finditer(r"\S+", text)]
+        if not spans:
+            return []
+        step = self.chunk_size - self.chunk_overlap
+        pieces: List[str] = []
+        for start in range(0, len(spans), step):
+            window = spans[start : start + self.chunk_size]
+            pieces.append(text[window[0][0] : window[-1][1]])
+            if start + self.chunk_size >= len(spans):
+                break
+        return pieces
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def keys(self) -> List[str]:
+        """
+        Return the resource keys present in the index, in insertion order.
+        """
+        return list(dict.fromkeys(chunk["key"] for chunk in self.chunks))
+
+    def score(self, query: str, keys: Optional[Sequence[str]] = None) -> List[Tuple[int, float]]:
+        """
+        Return (chunk_id, score) pairs for chunks matching the query, best first.
+        """
+        allowed = set(keys) if keys else None
+        total = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id in postings:
+                if allowed is not None and self.chunks[chunk_id]["key"] not in allowed:
+                    continue
+                freq = self._term_freqs[chunk_id][term]
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / (self._avg_length or 1.0))
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+        return sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        max_tokens: Optional[int] = None,
+        keys: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return up to top_k best-matching chunks whose combined estimated tokens fit max_tokens.
+
+        Selected chunks are returned grouped by resource and in document order, each with its
+        BM25 `score` and estimated `tokens`.
+        """
+        return self._select(self.score(query, keys), top_k, max_tokens)
+
+    def leading(
+        self,
+        top_k: int = 5,
+        max_tokens: Optional[int] = None,
+        keys: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the opening chunks of the resources, for queries that match nothing.
+
+        Chunks are taken position by position across resources (every first chunk, then every
+        second one) within the same top_k and max_tokens limits as `search`, with a `score` of 0.
+        """
+        allowed = set(keys) if keys else None
+        candidates = [
+            chunk_id for chunk_id, chunk in enumerate(self.chunks) if allowed is None or chunk["key"] in allowed
+        ]
+        candidates.sort(key=lambda chunk_id: (self.chunks[chunk_id]["position"], chunk_id))
+        return self._select(((chunk_id, 0.0) for chunk_id in candidates), top_k, max_tokens)
+
+    def _select(
+        self, ranked: Iterable[Tuple[int, float]], top_k: int, max_tokens: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        selected: List[Dict[str, Any]] = []
+        budget_used = 0
+        for chunk_id, chunk_score in ranked:
+            if len(selected) >= top_k:
+                break
+            tokens = estimate_tokens(self.chunks[chunk_id]["text"])
+            if max_tokens is not None and budget_used + tokens > max_tokens:
+                continue
+            budget_used += tokens
+            selected.append({**self.chunks[chunk_id], "id": chunk_id, "score": round(chunk_score, 4), "tokens": tokens})
+        selected.sort(key=lambda chunk: chunk["id"])
+        return selected
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ChunkIndex":
+        return self
+
+    def __repr__(self) -> str:
+        return f"ChunkIndex(resources={len(self.keys())}, chunks={len(self.chunks)}, terms={len(self._postings)})"
@@ -8,7 +8,7 @@ extra filters via the environment.
 """
 
 import re
-from typing import Any
+from typing import Any, Dict
 
 from liquid import Environment
 from liquid.exceptions import LiquidError
@@ -62,9 +62,13 @@ def render_template(text: str, context: ContextProtocol) -> str:
     Raises:
         ValueError: If there is an error during template parsing or rendering.
     """
-    data = context.dict()
+    data: Dict[str, Any] = {}
     try:
         template = _env.from_string(text)
+        # Pass stored values through without a deep copy (templates are read-only), and only
+        # join the accumulators the template references, so unrelated merges stay cheap.
+        referenced = set(template.global_variables())
+        data = {key: context.get(key) if key in referenced else context.get_raw(key) for key in context.keys()}
         result = template.render(**data)
         return result
     except LiquidError as e:
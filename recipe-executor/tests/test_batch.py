@@ -0,0 +1,155 @@
+"""Tests for batch loops sending their LLM calls through the fake batch backend."""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.llm_utils.batch import BATCH_BACKENDS, BatchRequest, FakeBatchBackend
+from recipe_executor.protocols import ContextProtocol
+from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.steps.loop import LoopStep
+from recipe_executor.steps.registry import STEP_REGISTRY
+from recipe_executor.utils.templates import render_template
+
+
+class RecordingBackend(FakeBatchBackend):
+    """Fake backend that records the size of every submitted batch and every cancellation."""
+
+    submitted: List[int] = []
+    cancelled: List[str] = []
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        type(self).submitted.append(len(requests))
+        return await super().submit(requests)
+
+    async def cancel(self, batch_id: str) -> None:
+        type(self).cancelled.append(batch_id)
+
+
+class WaitConfig(StepConfig):
+    seconds: str = "0"
+    fail: str = ""
+
+
+class WaitStep(BaseStep[WaitConfig]):
+    """Works for a while without calling the LLM, optionally failing afterwards."""
+
+    def __init__(self, logger: logging.Logger, config: Dict[str, Any]) -> None:
+        super().__init__(logger, WaitConfig.model_validate(config))
+
+    async def execute(self, context: ContextProtocol) -> None:
+        await asyncio.sleep(float(render_template(self.config.seconds, context)))
+        if render_template(self.config.fail, context) == "true":
+            raise RuntimeError("item failed before its LLM call")
+
+
+@pytest.fixture(autouse=True)
+def fake_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(BATCH_BACKENDS, "fake", RecordingBackend)
+    monkeypatch.setitem(STEP_REGISTRY, "test_wait", WaitStep)
+    monkeypatch.setattr(RecordingBackend, "submitted", [])
+    monkeypatch.setattr(RecordingBackend, "cancelled", [])
+
+
+def generate(prompt: str, **config: Any) -> Dict[str, Any]:
+    return {
+        "type": "llm_generate",
+        "config": {"prompt": prompt, "model": "openai/gpt-4o", "output_format": "text", "output_key": "item", **config},
+    }
+
+
+def batch_loop(items: str, substeps: List[Dict[str, Any]], **config: Any) -> Dict[str, Any]:
+    return {"items": items, "item_key": "item", "batch": True, "result_key": "results", "substeps": substeps, **config}
+
+
+async def run_loop(artifacts: Dict[str, Any], config: Dict[str, Any]) -> Context:
+    context = Context(artifacts=artifacts, config={"llm_batch_backend": "fake", "llm_batch_poll_interval": 0.01})
+    step = LoopStep(logging.getLogger("test_batch"), config)
+    await asyncio.wait_for(step.execute(context), timeout=10)
+    return context
+
+
+@pytest.mark.asyncio
+async def test_calls_wait_for_every_item_and_results_fan_out():
+    substeps = [
+        {"type": "test_wait", "config": {"seconds": "{{ item.wait }}"}},
+        generate("first {{ item.name }}"),
+        generate("second: {{ item }}"),
+    ]
+    items = [{"name": "a", "wait": 0}, {"name": "b", "wait": 0.05}, {"name": "c", "wait": 0}]
+
+    context = await run_loop({"items": items}, batch_loop("items", substeps))
+
+    # The slow item holds back the first round; each item's second call forms the next round
+    assert RecordingBackend.submitted == [3, 3]
+    assert context["results"] == ["second: first a", "second: first b", "second: first c"]
+    assert context["results__errors"] == []
+
+
+@pytest.mark.asyncio
+async def test_nested_batch_loop_joins_the_outer_batch():
+    inner = {"type": "loop", "config": batch_loop("item.children", [generate("{{ item }}")])}
+    sections = [{"children": ["a", "b"]}, {"children": ["c", "d", "e"]}]
+
+    context = await run_loop({"sections": sections}, batch_loop("sections", [inner, generate("done")]))
+
+    assert RecordingBackend.submitted == [5, 2]
+    assert context["results"] == ["done", "done"]
+
+
+@pytest.mark.asyncio
+async def test_structured_output_is_parsed(monkeypatch: pytest.MonkeyPatch):
+    def respond(request: BatchRequest) -> Any:
+        if request.prompt == "a":
+            return json.dumps({"title": "Alpha", "count": 1})
+        return {"title": request.prompt.upper(), "count": 2}
+
+    monkeypatch.setattr(RecordingBackend, "responder", staticmethod(respond))
+    output_format = {"type": "object", "properties": {"title": {"type": "string"}, "count": {"type": "integer"}}}
+
+    context = await run_loop(
+        {"items": ["a", "b"]}, batch_loop("items", [generate("{{ item }}", output_format=output_format)])
+    )
+
+    assert context["results"] == [{"title": "Alpha", "count": 1}, {"title": "B", "count": 2}]
+
+
+@pytest.mark.asyncio
+async def test_error_result_fails_only_its_item(monkeypatch: pytest.MonkeyPatch):
+    def respond(request: BatchRequest) -> Any:
+        if request.prompt == "b":
+            raise ValueError("rejected by the provider")
+        return request.prompt.upper()
+
+    monkeypatch.setattr(RecordingBackend, "responder", staticmethod(respond))
+
+    context = await run_loop({"items": ["a", "b", "c"]}, batch_loop("items", [generate("{{ item }}")], fail_fast=False))
+
+    assert RecordingBackend.submitted == [3]
+    assert context["results"] == ["A", "C"]
+    [error] = context["results__errors"]
+    assert error["key"] == 1
+    assert "rejected by the provider" in error["error"]
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_abort_cancels_batches_in_flight(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(RecordingBackend, "delay", 60.0)
+    substeps = [
+        {"type": "test_wait", "config": {"fail": "{% if item == 'b' %}true{% endif %}"}},
+        generate("{{ item }}"),
+    ]
+
+    started = time.monotonic()
+    context = await run_loop({"items": ["a", "b", "c"]}, batch_loop("items", substeps))
+
+    assert time.monotonic() - started < 5
+    assert RecordingBackend.submitted == [2]
+    assert len(RecordingBackend.cancelled) == 1
+    assert context["results"] == []
+    assert [error["key"] for error in context["results__errors"]] == [1]
@@ -0,0 +1,127 @@
+"""Tests for fitting prompts into a token budget."""
+
+import logging
+from typing import List, Optional, Tuple
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.llm_utils.budget import PromptBudget
+from recipe_executor.protocols import ContextProtocol
+
+# Estimated at 3.5 characters per token, independent of tiktoken
+MODEL = "anthropic/claude-3-5-sonnet-latest"
+
+logger = logging.getLogger("test_budget")
+
+
+def render(context: ContextProtocol) -> Tuple[Optional[str], str]:
+    chunks = context.get("chunks") or []
+    notes = context.get("notes") or ""
+    return "Write the section.", "Notes:\n" + "\n".join(chunk["text"] for chunk in chunks) + notes
+
+
+def chunk_context(count: int = 10) -> Context:
+    # About 100 tokens per chunk
+    return Context(artifacts={"chunks": [{"key": f"c{i}", "text": f"{i} " + "w" * 347} for i in range(count)]})
+
+
+def budget(limit: int, strategy: str = "truncate", keys: Optional[List[str]] = None) -> PromptBudget:
+    return PromptBudget(logger, MODEL, limit, strategy, ["chunks", "notes"] if keys is None else keys)
+
+
+@pytest.mark.asyncio
+async def test_prompt_within_budget_is_sent_as_is():
+    context = chunk_context(2)
+    fitted = budget(1000, strategy="error")
+
+    prompts = await fitted.fit(render, context)
+
+    assert prompts == [render(context)]
+    assert fitted.applied is None
+    assert fitted.sent_tokens == [fitted.prompt_tokens]
+    assert fitted.prompt_tokens == fitted.count(*render(context))
+
+
+@pytest.mark.asyncio
+async def test_error_strategy_rejects_an_oversized_prompt():
+    with pytest.raises(ValueError, match="over its budget of 300"):
+        await budget(300, strategy="error").fit(render, chunk_context())
+
+
+@pytest.mark.asyncio
+async def test_oversized_prompt_without_shrinkable_keys_is_rejected():
+    with pytest.raises(ValueError, match="none of"):
+        await budget(300, keys=["missing"]).fit(render, chunk_context())
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported budget strategy"):
+        budget(300, strategy="compress")
+
+
+@pytest.mark.asyncio
+async def test_truncate_drops_trailing_list_items():
+    context = chunk_context()
+    fitted = budget(450)
+
+    [(system, prompt)] = await fitted.fit(render, context)
+
+    assert fitted.applied == "truncate"
+    assert fitted.prompt_tokens > 450
+    assert fitted.sent_tokens[0] <= 450
+    assert system == "Write the section."
+    assert prompt.startswith("Notes:\n0 ")
+    assert "\n9 " not in prompt
+    # The step's context keeps the full material
+    assert len(context["chunks"]) == 10
+
+
+@pytest.mark.asyncio
+async def test_truncate_cuts_text():
+    context = Context(artifacts={"notes": "\n".join("line " + "x" * 60 for _ in range(100))})
+    fitted = budget(400)
+
+    [(_, prompt)] = await fitted.fit(render, context)
+
+    assert fitted.sent_tokens[0] <= 400
+    assert prompt.endswith("[truncated]")
+
+
+@pytest.mark.asyncio
+async def test_split_covers_every_item_within_budget():
+    context = chunk_context()
+    fitted = budget(350, strategy="split")
+
+    prompts = await fitted.fit(render, context)
+
+    assert len(prompts) > 1
+    assert all(tokens <= 350 for tokens in fitted.sent_tokens)
+    sent = "".join(prompt for _, prompt in prompts)
+    assert all(f"{i} " + "w" * 347 in sent for i in range(10))
+
+
+@pytest.mark.asyncio
+async def test_split_rejects_a_budget_smaller_than_the_prompt_without_material():
+    context = chunk_context()
+    context["notes"] = "n" * 700
+
+    with pytest.raises(ValueError, match="without 'chunks'"):
+        await budget(150, strategy="split", keys=["chunks"]).fit(render, context)
+
+
+@pytest.mark.asyncio
+async def test_summarize_replaces_material_with_summaries():
+    requested: List[int] = []
+
+    async def summarize(text: str, tokens: int) -> str:
+        requested.append(tokens)
+        return "summary"
+
+    fitted = budget(450, strategy="summarize")
+    [(_, prompt)] = await fitted.fit(render, chunk_context(), summarize)
+
+    assert fitted.applied == "summarize"
+    assert fitted.sent_tokens[0] <= 450
+    assert "summary" in prompt and "w" * 347 not in prompt
+    assert requested and all(tokens >= 32 for tokens in requested)
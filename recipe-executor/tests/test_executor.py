@@ -0,0 +1,128 @@
+"""Tests for the step events the executor reports while running a recipe."""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.executor import Executor, StepEvent
+from recipe_executor.protocols import ContextProtocol
+from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.steps.registry import STEP_REGISTRY
+
+logger = logging.getLogger("test_executor")
+
+
+class FailStep(BaseStep[StepConfig]):
+    """Always fails."""
+
+    def __init__(self, logger: logging.Logger, config: Dict[str, Any]) -> None:
+        super().__init__(logger, StepConfig.model_validate(config))
+
+    async def execute(self, context: ContextProtocol) -> None:
+        raise RuntimeError("step broke")
+
+
+def recorder() -> Tuple[List[Tuple[Any, ...]], Any]:
+    events: List[Tuple[Any, ...]] = []
+
+    def record(event: StepEvent) -> None:
+        name = Path(event.recipe_path).name if event.recipe_path else None
+        events.append((event.kind, name, event.step_index, event.step_type))
+
+    return events, record
+
+
+def write_recipe(path: Path, steps: List[Dict[str, Any]]) -> str:
+    path.write_text(json.dumps({"steps": steps}))
+    return str(path)
+
+
+def set_value(key: str, value: str) -> Dict[str, Any]:
+    return {"type": "set_context", "config": {"key": key, "value": value}}
+
+
+@pytest.mark.asyncio
+async def test_events_cover_nested_recipes_and_loops(tmp_path: Path):
+    child = write_recipe(tmp_path / "child_recipe.json", [set_value("child", "done")])
+    parent = write_recipe(
+        tmp_path / "parent.json",
+        [
+            set_value("parent", "done"),
+            {"type": "execute_recipe", "config": {"recipe_path": child}},
+            {
+                "type": "loop",
+                "config": {
+                    "items": "letters",
+                    "item_key": "letter",
+                    "result_key": "results",
+                    "substeps": [set_value("seen", "{{ letter }}")],
+                },
+            },
+        ],
+    )
+    events, record = recorder()
+    context = Context(artifacts={"letters": ["a"]})
+
+    await Executor(logger, on_step=record).execute(parent, context)
+
+    assert events == [
+        ("recipe_started", "parent.json", None, None),
+        ("step_started", None, 0, "set_context"),
+        ("step_completed", None, 0, "set_context"),
+        ("step_started", None, 1, "execute_recipe"),
+        ("recipe_started", "child_recipe.json", None, None),
+        ("step_started", None, 0, "set_context"),
+        ("step_completed", None, 0, "set_context"),
+        ("step_completed", None, 1, "execute_recipe"),
+        ("step_started", None, 2, "loop"),
+        ("recipe_started", None, None, None),
+        ("step_started", None, 0, "set_context"),
+        ("step_completed", None, 0, "set_context"),
+        ("step_completed", None, 2, "loop"),
+    ]
+    assert context["child"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_failing_step_reports_its_error(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(STEP_REGISTRY, "test_fail", FailStep)
+    failures: List[StepEvent] = []
+
+    def record(event: StepEvent) -> None:
+        if event.kind == "step_failed":
+            failures.append(event)
+
+    with pytest.raises(ValueError, match="Error executing step 1 \\('test_fail'\\)"):
+        await Executor(logger, on_step=record).execute(
+            {"steps": [set_value("a", "1"), {"type": "test_fail", "config": {}}]}, Context()
+        )
+
+    [failure] = failures
+    assert (failure.step_index, failure.step_type) == (1, "test_fail")
+    assert isinstance(failure.error, RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_callback_errors_do_not_fail_the_run():
+    def broken(event: StepEvent) -> None:
+        raise RuntimeError("observer broke")
+
+    context = Context()
+    await Executor(logger, on_step=broken).execute({"steps": [set_value("a", "1")]}, context)
+
+    assert context["a"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_callbacks_end_with_their_run():
+    events, record = recorder()
+    await Executor(logger, on_step=record).execute({"steps": [set_value("a", "1")]}, Context())
+    count = len(events)
+
+    await Executor(logger).execute({"steps": [set_value("a", "2")]}, Context())
+
+    assert len(events) == count
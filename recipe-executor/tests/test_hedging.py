@@ -0,0 +1,146 @@
+"""Tests for hedged LLM requests and the latency histograms that time them."""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+import pytest
+
+from recipe_executor.llm_utils.hedging import HedgePolicy, HedgeTracker, LatencyHistogram, run_hedged
+
+logger = logging.getLogger("test_hedging")
+
+
+class FakeModels:
+    """Fake model calls with a fixed delay and optional error per model, recording how each ended."""
+
+    def __init__(self, delays: Dict[str, float], errors: Optional[Dict[str, Exception]] = None) -> None:
+        self.delays = delays
+        self.errors = errors or {}
+        self.started: List[str] = []
+        self.cancelled: List[str] = []
+
+    async def call(self, model_id: str) -> str:
+        self.started.append(model_id)
+        try:
+            await asyncio.sleep(self.delays[model_id])
+        except asyncio.CancelledError:
+            self.cancelled.append(model_id)
+            raise
+        if model_id in self.errors:
+            raise self.errors[model_id]
+        return f"answer from {model_id}"
+
+
+def warmed_tracker(model_id: str = "openai/a", seconds: float = 0.05) -> HedgeTracker:
+    """A tracker whose histogram for model_id puts the hedge threshold at about `seconds`."""
+    tracker = HedgeTracker()
+    for _ in range(5):
+        tracker.histogram(model_id).record(seconds)
+    return tracker
+
+
+def policy(**overrides) -> HedgePolicy:
+    settings = {"percentile": 95.0, "budget": 1.0, "fallback_model": "openai/b", "min_samples": 5, "min_delay": 0.0}
+    settings.update(overrides)
+    return HedgePolicy(**settings)
+
+
+@pytest.mark.asyncio
+async def test_primary_wins_without_hedging():
+    models = FakeModels({"openai/a": 0.0, "openai/b": 0.0})
+    tracker = warmed_tracker()
+
+    result = await run_hedged(models.call, "openai/a", policy(), logger, tracker)
+
+    assert result == ("answer from openai/a", "openai/a")
+    assert models.started == ["openai/a"]
+    assert (tracker.requests, tracker.hedges, tracker.hedge_wins) == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_and_the_loser_is_cancelled():
+    models = FakeModels({"openai/a": 10.0, "openai/b": 0.0})
+    tracker = warmed_tracker()
+
+    result = await asyncio.wait_for(run_hedged(models.call, "openai/a", policy(), logger, tracker), timeout=5)
+    await asyncio.sleep(0)
+
+    assert result == ("answer from openai/b", "openai/b")
+    assert models.started == ["openai/a", "openai/b"]
+    assert models.cancelled == ["openai/a"]
+    assert (tracker.hedges, tracker.hedge_wins) == (1, 1)
+    # The cancelled primary still counts towards its model's latency
+    assert tracker.histogram("openai/a").count == 6
+
+
+@pytest.mark.asyncio
+async def test_budget_refuses_a_hedge():
+    models = FakeModels({"openai/a": 0.2, "openai/b": 0.0})
+    tracker = warmed_tracker()
+
+    result = await run_hedged(models.call, "openai/a", policy(budget=0.0), logger, tracker)
+
+    assert result == ("answer from openai/a", "openai/a")
+    assert models.started == ["openai/a"]
+    assert tracker.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_every_attempt_failing_raises_the_primary_error():
+    models = FakeModels(
+        {"openai/a": 0.2, "openai/b": 0.0},
+        errors={"openai/a": ValueError("primary failed"), "openai/b": RuntimeError("hedge failed")},
+    )
+
+    with pytest.raises(ValueError, match="primary failed"):
+        await run_hedged(models.call, "openai/a", policy(), logger, warmed_tracker())
+
+    assert models.started == ["openai/a", "openai/b"]
+    assert models.cancelled == []
+
+
+@pytest.mark.asyncio
+async def test_outer_cancellation_cancels_every_attempt():
+    models = FakeModels({"openai/a": 10.0, "openai/b": 10.0})
+    task = asyncio.create_task(run_hedged(models.call, "openai/a", policy(), logger, warmed_tracker()))
+    while len(models.started) < 2:
+        await asyncio.sleep(0.01)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)
+
+    assert sorted(models.cancelled) == ["openai/a", "openai/b"]
+
+
+def test_percentile_is_within_one_bucket():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+
+    for _ in range(90):
+        histogram.record(0.4)
+    for _ in range(10):
+        histogram.record(3.0)
+
+    p50 = histogram.percentile(50)
+    p99 = histogram.percentile(99)
+    assert p50 is not None and 0.4 <= p50 < 0.4 * histogram.growth
+    assert p99 is not None and 3.0 <= p99 < 3.0 * histogram.growth
+    assert histogram.percentile(0) == p50
+
+
+def test_decay_lets_recent_latency_take_over():
+    histogram = LatencyHistogram(window=10)
+    for _ in range(10):
+        histogram.record(0.4)
+    # Reaching the window halves every count
+    assert histogram.count == 5
+
+    for _ in range(8):
+        histogram.record(3.0)
+
+    # Without decay the ten fast samples would still outnumber the eight slow ones
+    p50 = histogram.percentile(50)
+    assert p50 is not None and p50 >= 3.0
@@ -0,0 +1,108 @@
+"""Tests for materializing lazily registered files."""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.steps.read_files import ReadFilesStep
+from recipe_executor.utils.lazy_files import ensure_file, is_lazy_file, register_lazy_file
+
+
+def writer(path: Path, text: str, before: Callable[[], object] = lambda: None) -> Callable[[], None]:
+    def materialize() -> None:
+        before()
+        path.write_text(text)
+
+    return materialize
+
+
+def test_different_files_are_materialized_concurrently(tmp_path: Path):
+    # Each materializer waits for the other, which only works if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+    register_lazy_file(str(first), writer(first, "a", barrier.wait))
+    register_lazy_file(str(second), writer(second, "b", barrier.wait))
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(ensure_file, [str(first), str(second)]))
+
+    assert results == [True, True]
+    assert (first.read_text(), second.read_text()) == ("a", "b")
+
+
+def test_readers_of_one_file_wait_for_a_single_materialization(tmp_path: Path):
+    target = tmp_path / "a.txt"
+    started = threading.Event()
+    calls: List[int] = []
+
+    def slow() -> None:
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+
+    register_lazy_file(str(target), writer(target, "a", slow))
+
+    with ThreadPoolExecutor(2) as pool:
+        owner = pool.submit(ensure_file, str(target))
+        started.wait(5)
+        assert is_lazy_file(str(target))
+        waiter = pool.submit(lambda: (ensure_file(str(target)), target.exists()))
+
+        assert owner.result() is True
+        # The second reader returns only once the file is written
+        assert waiter.result() == (False, True)
+
+    assert calls == [1]
+    assert not is_lazy_file(str(target))
+
+
+def test_failed_materialization_can_be_retried(tmp_path: Path):
+    target = tmp_path / "a.txt"
+    attempts: List[int] = []
+
+    def flaky() -> None:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("archive busy")
+
+    register_lazy_file(str(target), writer(target, "a", flaky))
+
+    with pytest.raises(OSError):
+        ensure_file(str(target))
+    assert is_lazy_file(str(target))
+
+    assert ensure_file(str(target)) is True
+    assert target.read_text() == "a"
+
+
+@pytest.mark.asyncio
+async def test_read_files_materializes_off_the_event_loop(tmp_path: Path):
+    target = tmp_path / "a.txt"
+    finished: List[float] = []
+
+    def slow() -> None:
+        time.sleep(0.2)
+        finished.append(time.monotonic())
+
+    register_lazy_file(str(target), writer(target, "lazy text", slow))
+    ticks: List[float] = []
+
+    async def tick() -> None:
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    context = Context()
+    step = ReadFilesStep(logging.getLogger("test_lazy_files"), {"path": str(target), "content_key": "text"})
+    await asyncio.gather(step.execute(context), tick())
+
+    assert context["text"] == "lazy text"
+    # The ticker kept running while the file was extracted
+    assert len(ticks) == 5 and ticks[-1] < finished[0]
@@ -0,0 +1,73 @@
+"""Tests for the concurrency limits of nested loop steps."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.protocols import ContextProtocol
+from recipe_executor.steps.base import BaseStep, StepConfig
+from recipe_executor.steps.loop import LoopStep
+from recipe_executor.steps.registry import STEP_REGISTRY
+
+in_flight = {"active": 0, "peak": 0}
+
+
+class SleepStep(BaseStep[StepConfig]):
+    """Counts how many items are working at once."""
+
+    def __init__(self, logger: logging.Logger, config: Dict[str, Any]) -> None:
+        super().__init__(logger, StepConfig.model_validate(config))
+
+    async def execute(self, context: ContextProtocol) -> None:
+        in_flight["active"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["active"])
+        await asyncio.sleep(0.01)
+        in_flight["active"] -= 1
+
+
+def tree(depth: int) -> List[Dict[str, Any]]:
+    return [{"children": tree(depth - 1) if depth else []} for _ in range(3)]
+
+
+def loop_config(items: str, depth: int, shared: bool) -> Dict[str, Any]:
+    substeps: List[Dict[str, Any]] = [{"type": "test_sleep", "config": {}}]
+    if depth:
+        substeps.append({"type": "loop", "config": loop_config("node.children", depth - 1, shared)})
+    return {
+        "items": items,
+        "item_key": "node",
+        "max_concurrency": 3,
+        "shared_concurrency": shared,
+        "result_key": "written",
+        "substeps": substeps,
+    }
+
+
+async def run_tree(monkeypatch: pytest.MonkeyPatch, shared: bool) -> Context:
+    monkeypatch.setitem(STEP_REGISTRY, "test_sleep", SleepStep)
+    in_flight.update(active=0, peak=0)
+    context = Context(artifacts={"root": {"children": tree(3)}})
+    step = LoopStep(logging.getLogger("test_loop"), loop_config("root.children", 3, shared))
+    await asyncio.wait_for(step.execute(context), timeout=30)
+    return context
+
+
+@pytest.mark.asyncio
+async def test_shared_concurrency_caps_the_whole_tree(monkeypatch: pytest.MonkeyPatch):
+    context = await run_tree(monkeypatch, shared=True)
+
+    assert in_flight["peak"] == 3
+    assert context["written__peak_concurrency"] == 3
+    assert len(context["written"]) == 3
+    assert context["written__errors"] == []
+
+
+@pytest.mark.asyncio
+async def test_unshared_nested_loops_each_get_the_full_width(monkeypatch: pytest.MonkeyPatch):
+    context = await run_tree(monkeypatch, shared=False)
+
+    assert in_flight["peak"] > 3
+    assert context["written__peak_concurrency"] == 3
@@ -0,0 +1,123 @@
+"""Tests for the BM25 chunk index and the retrieve_chunks step."""
+
+import logging
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.steps.retrieve_chunks import RetrieveChunksStep
+from recipe_executor.utils.retrieval import ChunkIndex, estimate_tokens, tokenize
+
+
+def words(prefix: str, count: int) -> str:
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+RESOURCES = [
+    {"key": "pricing", "description": "Pricing strategy", "content": "Enterprise tier costs more. " + words("p", 40)},
+    {"key": "roadmap", "description": "Product roadmap", "content": words("r", 20) + " enterprise launch in spring"},
+    {"key": "team", "description": "Team overview", "content": {"a.md": "Alice leads design.", "b.md": "Bob ships."}},
+]
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Quick-Brown fox, and THE dog's 42") == ["quick", "brown", "fox", "dog", "s", "42"]
+
+
+def test_chunks_overlap_and_keep_formatting():
+    index = ChunkIndex(chunk_size=4, chunk_overlap=1)
+    index.add("doc", "one  two\nthree four five six seven")
+
+    assert [chunk["text"] for chunk in index.chunks] == ["one  two\nthree four", "four five six seven"]
+    assert [chunk["position"] for chunk in index.chunks] == [0, 1]
+
+
+@pytest.mark.parametrize("size,overlap", [(0, 0), (4, 4), (4, -1)])
+def test_invalid_chunk_settings_raise(size: int, overlap: int):
+    with pytest.raises(ValueError):
+        ChunkIndex(chunk_size=size, chunk_overlap=overlap)
+
+
+def test_from_resources_flattens_content_and_indexes_descriptions():
+    index = ChunkIndex.from_resources(RESOURCES, chunk_size=20, chunk_overlap=5)
+
+    assert index.keys() == ["pricing", "roadmap", "team"]
+    assert "Alice leads design.\n\nBob ships." in index.chunks[-1]["text"]
+    # "overview" only appears in the team description
+    assert {chunk["key"] for chunk in index.search("overview", top_k=10)} == {"team"}
+
+
+def test_search_ranks_by_bm25_and_returns_document_order():
+    index = ChunkIndex.from_resources(RESOURCES, chunk_size=20, chunk_overlap=5)
+
+    ranked = index.score("enterprise pricing")
+    assert index.chunks[ranked[0][0]]["key"] == "pricing"
+    assert all(first[1] >= second[1] for first, second in zip(ranked, ranked[1:]))
+
+    chunks = index.search("enterprise", top_k=2)
+    assert [chunk["key"] for chunk in chunks] == ["pricing", "roadmap"]
+    assert [chunk["id"] for chunk in chunks] == sorted(chunk["id"] for chunk in chunks)
+    assert all(chunk["score"] > 0 for chunk in chunks)
+
+
+def test_search_restricts_to_keys():
+    index = ChunkIndex.from_resources(RESOURCES, chunk_size=20, chunk_overlap=5)
+
+    chunks = index.search("enterprise", top_k=5, keys=["roadmap"])
+
+    assert chunks and {chunk["key"] for chunk in chunks} == {"roadmap"}
+    assert index.search("alice", keys=["pricing"]) == []
+
+
+def test_search_respects_token_budget():
+    index = ChunkIndex.from_resources(RESOURCES, chunk_size=20, chunk_overlap=5)
+    everything = index.search("enterprise", top_k=10)
+    budget = max(chunk["tokens"] for chunk in everything)
+
+    chunks = index.search("enterprise", top_k=10, max_tokens=budget)
+
+    assert 0 < len(chunks) < len(everything)
+    assert sum(chunk["tokens"] for chunk in chunks) <= budget
+    assert all(chunk["tokens"] == estimate_tokens(chunk["text"]) for chunk in chunks)
+
+
+def test_leading_takes_first_chunks_of_each_resource_first():
+    index = ChunkIndex.from_resources(RESOURCES, chunk_size=20, chunk_overlap=5)
+
+    chunks = index.leading(top_k=3)
+
+    assert [(chunk["key"], chunk["position"]) for chunk in chunks] == [("pricing", 0), ("roadmap", 0), ("team", 0)]
+    assert all(chunk["score"] == 0 for chunk in chunks)
+    assert [chunk["key"] for chunk in index.leading(top_k=5, keys=["pricing"])] == ["pricing"] * 3
+
+
+@pytest.mark.asyncio
+async def test_step_falls_back_to_leading_chunks_within_budget():
+    context = Context(artifacts={"resources": RESOURCES})
+    config = {
+        "query": "zeppelin",
+        "keys": "pricing,roadmap",
+        "top_k": 5,
+        "max_tokens": 45,
+        "chunk_size": 20,
+        "chunk_overlap": 5,
+    }
+
+    await RetrieveChunksStep(logging.getLogger("test_retrieval"), config).execute(context)
+
+    chunks = context["retrieved_chunks"]
+    assert [(chunk["key"], chunk["position"]) for chunk in chunks] == [("pricing", 0), ("roadmap", 0)]
+    assert sum(chunk["tokens"] for chunk in chunks) <= 45
+
+
+@pytest.mark.asyncio
+async def test_step_reuses_index_and_selects_nothing_for_empty_keys():
+    context = Context(artifacts={"resources": RESOURCES, "refs": ""})
+    logger = logging.getLogger("test_retrieval")
+
+    await RetrieveChunksStep(logger, {"chunk_size": 20, "chunk_overlap": 5}).execute(context)
+    index = context.get_raw("resource_index")
+    await RetrieveChunksStep(logger, {"query": "enterprise", "keys": "{{ refs }}"}).execute(context)
+
+    assert context.get_raw("resource_index") is index
+    assert context["retrieved_chunks"] == []
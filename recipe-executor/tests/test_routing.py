@@ -0,0 +1,195 @@
+"""Tests for circuit breakers, quota claims and fallback routing across models."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+import pytest
+
+from recipe_executor.llm_utils.hedging import HedgeTracker
+from recipe_executor.llm_utils.routing import CircuitBreaker, ModelRouter, is_transient_error
+
+logger = logging.getLogger("test_routing")
+
+
+class StatusError(Exception):
+    """Stands in for a provider SDK error carrying an HTTP status."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def make_router(**kwargs) -> ModelRouter:
+    return ModelRouter(latency=HedgeTracker(), **kwargs)
+
+
+def scripted(outcomes: Dict[str, List[object]], calls: List[str]):
+    """A call that returns or raises the next scripted outcome for each model."""
+
+    async def call(model_id: str) -> str:
+        calls.append(model_id)
+        outcome = outcomes[model_id].pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return str(outcome)
+
+    return call
+
+
+def test_breaker_opens_after_threshold_and_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.trial_in_flight
+
+
+@pytest.mark.parametrize(
+    "error,transient",
+    [
+        (StatusError(429), True),
+        (StatusError(503), True),
+        (StatusError(400), False),
+        (StatusError(401), False),
+        (asyncio.TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (APIConnectionError(), True),
+        (ValueError("Invalid model_id"), False),
+        (RuntimeError("wrapped"), False),
+    ],
+)
+def test_is_transient_error(error: Exception, transient: bool):
+    assert is_transient_error(error) is transient
+
+
+def test_is_transient_error_follows_the_cause():
+    try:
+        try:
+            raise StatusError(502)
+        except StatusError as err:
+            raise RuntimeError("model request failed") from err
+    except RuntimeError as wrapped:
+        assert is_transient_error(wrapped)
+
+
+def test_quota_claims_are_given_back_on_release():
+    router = make_router(quotas={"openai": 2})
+    first = router.acquire("openai/gpt-4o")
+    second = router.acquire("openai/gpt-4o-mini")
+    assert first is not None and second is not None
+    assert router.acquire("openai/gpt-4o") is None
+    assert router.acquire("anthropic/claude") is not None
+
+    router.release(first)
+
+    assert router.acquire("openai/gpt-4o") is not None
+    assert router.stats()["quota_usage"] == {"openai": 2}
+
+
+def test_released_trial_lets_the_next_call_probe():
+    router = make_router(failure_threshold=1, cooldown=0.05)
+    router.record("openai/gpt-4o", ok=False)
+    assert router.acquire("openai/gpt-4o") is None
+
+    time.sleep(0.06)
+    trial = router.acquire("openai/gpt-4o")
+    assert trial is not None and trial.trial
+    assert router.acquire("openai/gpt-4o") is None
+
+    router.release(trial)
+
+    assert router.acquire("openai/gpt-4o") is not None
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_counted_and_falls_back():
+    router = make_router(failure_threshold=2)
+    calls: List[str] = []
+    call = scripted({"openai/a": [StatusError(429)], "anthropic/b": ["ok"]}, calls)
+
+    result, model_id = await router.route(["openai/a", "anthropic/b"], call, logger)
+
+    assert (result, model_id) == ("ok", "anthropic/b")
+    assert calls == ["openai/a", "anthropic/b"]
+    assert router.stats()["error_rates"] == {"openai/a": 0.2, "anthropic/b": 0.0}
+    assert router._breaker("openai/a").failures == 1
+
+
+@pytest.mark.asyncio
+async def test_request_error_propagates_without_being_counted():
+    router = make_router(failure_threshold=1, quotas={"openai": 5})
+    calls: List[str] = []
+    call = scripted({"openai/a": [StatusError(400)], "anthropic/b": ["ok"]}, calls)
+
+    with pytest.raises(StatusError):
+        await router.route(["openai/a", "anthropic/b"], call, logger)
+
+    assert calls == ["openai/a"]
+    assert router.stats()["error_rates"] == {}
+    assert router._breaker("openai/a").failures == 0
+    assert router.stats()["quota_usage"] == {"openai": 0}
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_is_skipped_until_every_candidate_fails():
+    router = make_router(failure_threshold=1)
+    calls: List[str] = []
+    call = scripted({"openai/a": [TimeoutError()], "anthropic/b": [StatusError(500), StatusError(500)]}, calls)
+
+    with pytest.raises(StatusError):
+        await router.route(["openai/a", "anthropic/b"], call, logger)
+    assert router.stats()["breakers"] == {"openai": "open", "anthropic": "open"}
+
+    with pytest.raises(RuntimeError, match="No model available"):
+        await router.route(["openai/a", "anthropic/b"], call, logger)
+    assert calls == ["openai/a", "anthropic/b"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_gives_back_its_claim():
+    router = make_router(failure_threshold=1, cooldown=0.05)
+    router.record("openai/a", ok=False)
+    await asyncio.sleep(0.06)
+    started = asyncio.Event()
+
+    async def hang(model_id: str) -> str:
+        started.set()
+        await asyncio.sleep(10)
+        return "late"
+
+    task = asyncio.create_task(router.route(["openai/a"], hang, logger))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert not router._breaker("openai/a").trial_in_flight
+    assert router.acquire("openai/a") is not None
@@ -0,0 +1,42 @@
+"""Tests for rendering templates over merged (accumulated) context values."""
+
+import logging
+from typing import Any
+
+import pytest
+
+from recipe_executor.context import Context
+from recipe_executor.steps.set_context import SetContextStep
+from recipe_executor.utils.accumulator import Accumulator
+from recipe_executor.utils.templates import render_template
+
+
+async def merge(context: Context, key: str, value: Any) -> None:
+    step = SetContextStep(logging.getLogger("test_templates"), {"key": key, "value": value, "if_exists": "merge"})
+    await step.execute(context)
+
+
+@pytest.mark.asyncio
+async def test_merged_values_render_with_filters_and_loops():
+    context = Context(artifacts={"doc": "Hello", "items": ["a"]})
+    await merge(context, "doc", " world")
+    await merge(context, "items", ["b", "c"])
+    assert isinstance(context.get_raw("doc"), Accumulator)
+    assert isinstance(context.get_raw("items"), Accumulator)
+
+    assert render_template("{{ doc }}", context) == "Hello world"
+    assert render_template("{{ doc | json }}", context) == '"Hello world"'
+    assert render_template("{% for i in items %}[{{ i }}]{% endfor %}", context) == "[a][b][c]"
+    assert render_template("{{ items | first }}{{ items[1] }}{{ items | last }}", context) == "abc"
+    assert render_template("{{ items | join: ',' }}", context) == "a,b,c"
+    assert render_template("{{ items | size }}", context) == "3"
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_accumulators_are_not_joined():
+    context = Context(artifacts={"doc": "a", "title": "T"})
+    await merge(context, "doc", "b")
+    await merge(context, "doc", "c")
+
+    assert render_template("{{ title }}", context) == "T"
+    assert repr(context.get_raw("doc")).startswith("Accumulator(kind=str, chunks=3")
@@ -0,0 +1,59 @@
+"""Tests for local token counting and model context windows."""
+
+import pytest
+
+from recipe_executor.llm_utils.tokens import context_window, count_tokens, parse_context_windows, tokenizer_name
+
+
+@pytest.mark.parametrize(
+    "model_id,window",
+    [
+        ("openai/gpt-4", 8_192),
+        ("openai/gpt-4-0613", 8_192),
+        ("openai/gpt-4-32k", 32_768),
+        ("azure/gpt-4-32k-0613", 32_768),
+        ("openai/gpt-4.5-preview", 128_000),
+        ("openai/gpt-4-1106-preview", 128_000),
+        ("openai/gpt-4-turbo-2024-04-09", 128_000),
+        ("openai/gpt-4o-mini", 128_000),
+        ("openai/gpt-4.1-mini", 1_047_576),
+        ("openai/gpt-3.5-turbo", 16_385),
+        ("openai/gpt-5-mini", 400_000),
+        ("openai/o1-mini", 128_000),
+        ("openai/o3", 200_000),
+        ("anthropic/claude-3-5-sonnet-latest", 200_000),
+        # Names the table does not know get the default, not a smaller sibling's window
+        ("openai/gpt-4.2", 128_000),
+        ("openai/gpt-4x", 128_000),
+        ("ollama/phi4", 128_000),
+    ],
+)
+def test_context_window_by_model_name(model_id: str, window: int):
+    assert context_window(model_id) == window
+
+
+def test_context_window_overrides_by_id_or_name():
+    config = {"llm_context_windows": "ollama/phi4=16384,gpt-4o=64000"}
+
+    assert context_window("ollama/phi4", config) == 16_384
+    assert context_window("azure/gpt-4o", config) == 64_000
+    assert context_window("openai/gpt-4o-mini", config) == 128_000
+
+
+def test_parse_context_windows():
+    assert parse_context_windows(None) == {}
+    assert parse_context_windows({"a": "10"}) == {"a": 10}
+    assert parse_context_windows(" a = 10 , b=20,junk") == {"a": 10, "b": 20}
+    with pytest.raises(ValueError):
+        parse_context_windows("a=ten")
+
+
+def test_estimates_for_models_without_a_tokenizer():
+    assert tokenizer_name("anthropic/claude-3-5-sonnet-latest") == "anthropic-estimate"
+    assert tokenizer_name("ollama/phi4") == "ollama-estimate"
+
+    assert count_tokens("", "anthropic/claude") == 0
+    assert count_tokens("x" * 35, "anthropic/claude") == 11
+    assert count_tokens("x" * 40, "ollama/phi4") == 11
+    # Cached counts are keyed by tokenizer, not shared across families
+    assert count_tokens("x" * 35, "ollama/phi4") == 9